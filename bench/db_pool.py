@@ -0,0 +1,153 @@
+"""
+Database okuma havuzu benchmark'ı: karışık okuma/yazma yükünde throughput
+ve gecikme. "single" eski davranıştır (tek bağlantı, SQLite varsayılan
+cache, mmap yok); "pool" ayrı read-only bağlantılar + ayarlı pragma'lar.
+
+  python -m bench.db_pool --rows 100000 --concurrency 32 --write-ratio 0.3
+
+Okumalar: son konuşma (get_recent_conversation), FTS arama
+(search_conversations), hafıza listesi (list_memories). Yazmalar group
+commit'li add_conversation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sqlite3
+import tempfile
+import time
+
+from src.memory.database import Database
+
+
+COMMON = (
+    "bugün hava çok güzel ama akşam yağmur yağacakmış ben de şemsiye almayı unuttum "
+    "maçı izledin mi dün gece fenerbahçe yine kaybetti kahve içmeye gidelim mi "
+    "yarın sınavım var çalışmam lazım ama canım hiç istemiyor ödev teslim tarihi cuma"
+).split()
+# Gerçek sohbete yakın dağılım: birkaç sık kelime + Zipf dağılımlı geniş kelime hazinesi.
+# Küçük bir kelime listesiyle her satır her sorguyla eşleşir ve FTS'i olduğundan yavaş gösterir.
+WORDS = COMMON + [f"kelime{i}" for i in range(20_000)]
+CUM_WEIGHTS: list[float] = []
+_total = 0.0
+for _rank in range(len(WORDS)):
+    _total += 1.0 / (_rank + 1)
+    CUM_WEIGHTS.append(_total)
+
+CONFIGS = {
+    "single": {"read_connections": 0, "cache_mb": 2, "mmap_mb": 0},
+    "pool": {"read_connections": 4, "cache_mb": 16, "mmap_mb": 256},
+}
+
+
+def _sentence(rng: random.Random, words: tuple[int, int] = (5, 25)) -> str:
+    return " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=rng.randint(*words)))
+
+
+async def _seed(path: Path, *, users: int, rows: int, rng: random.Random) -> None:
+    db = Database(path=path, durability="relaxed")
+    await db.connect()
+    await db.close()
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO users(discord_id, username, display_name, message_count) VALUES(?, ?, ?, 0)",
+        [(f"u{i}", f"u{i}", f"u{i}") for i in range(users)],
+    )
+    conn.executemany(
+        "INSERT INTO conversations(discord_id, channel_id, message_id, role, content) VALUES(?, ?, ?, ?, ?)",
+        (
+            (f"u{rng.randrange(users)}", f"c{rng.randrange(20)}", str(i), rng.choice(("user", "assistant")), _sentence(rng))
+            for i in range(rows)
+        ),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO memories(discord_id, memory_type, content, confidence) VALUES(?, 'fact', ?, 0.8)",
+        ((f"u{rng.randrange(users)}", _sentence(rng)) for _ in range(rows // 20)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def _run(path: Path, name: str, args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    db = Database(path=path, durability="group", **CONFIGS[name])
+    await db.connect()
+    latencies: dict[str, list[float]] = {"recent": [], "search": [], "memories": [], "write": []}
+    deadline = time.perf_counter() + args.seconds
+
+    async def worker(worker_id: int) -> None:
+        n = 0
+        while time.perf_counter() < deadline:
+            user = f"u{rng.randrange(args.users)}"
+            started = time.perf_counter()
+            if rng.random() < args.write_ratio:
+                await db.add_conversation(
+                    discord_id=user,
+                    channel_id="c0",
+                    message_id=f"w{worker_id}-{n}",
+                    role="user",
+                    content=_sentence(rng),
+                )
+                kind = "write"
+            else:
+                roll = rng.random()
+                if roll < 0.5:
+                    kind = "recent"
+                    await db.get_recent_conversation(discord_id=user, limit=20)
+                elif roll < 0.8:
+                    kind = "search"
+                    await db.search_conversations(query=_sentence(rng, (3, 8)), discord_id=user, limit=3)
+                else:
+                    kind = "memories"
+                    await db.list_memories(discord_id=user, limit=50)
+            latencies[kind].append(time.perf_counter() - started)
+            n += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    await db.close()
+    total = sum(len(v) for v in latencies.values())
+    print(f"{name}: {total / elapsed:,.0f} ops/s")
+    for kind, values in latencies.items():
+        print(
+            f"  {kind:9s} n={len(values):6d}  p50={_pct(values, 0.5) * 1000:7.2f} ms  "
+            f"p99={_pct(values, 0.99) * 1000:8.2f} ms"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        started = time.perf_counter()
+        await _seed(path, users=args.users, rows=args.rows, rng=random.Random(args.seed))
+        print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s; {args.concurrency} workers, "
+              f"write ratio {args.write_ratio:.0%}, {args.seconds}s each")
+        for name in ("single", "pool"):
+            await _run(path, name, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
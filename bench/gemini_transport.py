@@ -0,0 +1,167 @@
+"""
+Gemini transport benchmark'ı: yerel bir stand-in HTTP sunucusuna karşı
+eşzamanlı istek ölçeklenmesi (offline, API anahtarı gerekmez).
+
+  python -m bench.gemini_transport --concurrency 4,16,64 --latency-ms 200
+
+İki yol karşılaştırılır:
+- async: GeminiClient (HttpPool üstünde, thread yok)
+- to_thread: senkron istek + asyncio.to_thread (eski SDK yolunun modeli;
+  varsayılan executor'un thread sayısıyla sınırlıdır)
+
+Sonda iptal edilen bir isteğin sunucu tarafında gerçekten kesildiği de
+kontrol edilir. Not: sunucu ve istemci aynı event loop'ta çalışır; çok
+yüksek eşzamanlılıkta httpcore havuzunun atama maliyeti (bağlantı x kuyruk)
+CPU'yu doyurur. Botta GeminiScheduler eşzamanlılığı bunun çok altında tutar.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from src.ai.gemini_client import GeminiClient
+from src.http_pool import HttpPool, ProviderLimits
+
+
+RESPONSE_BODY = json.dumps(
+    {"candidates": [{"content": {"role": "model", "parts": [{"text": "Selam, buradayım."}]}}]}
+).encode("utf-8")
+
+
+class StandInServer:
+    """generateContent'i latency kadar bekleyip sabit cevapla yanıtlayan minimal HTTP/1.1 sunucu."""
+
+    def __init__(self, *, latency: float) -> None:
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.aborted = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=4096)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1beta"
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def reset(self) -> None:
+        self.in_flight = self.peak = self.aborted = 0
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+                try:
+                    # İstemci beklerken bağlantıyı kapatırsa read EOF döner.
+                    eof = asyncio.ensure_future(reader.read(1))
+                    done, _ = await asyncio.wait({eof}, timeout=self.latency)
+                    if done:
+                        self.aborted += 1
+                        return
+                    eof.cancel()
+                    await asyncio.gather(eof, return_exceptions=True)
+                finally:
+                    self.in_flight -= 1
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(RESPONSE_BODY)}\r\n\r\n".encode("ascii")
+                    + RESPONSE_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def bench_async(base_url: str, server: StandInServer, *, concurrency: int, total: int) -> None:
+    pool = HttpPool(limits={"gemini": ProviderLimits(max_connections=concurrency, max_keepalive=concurrency, timeout=30.0)})
+    client = GeminiClient(api_key="bench", model_name="bench-model", http=pool, base_url=base_url)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await client.generate_text(prompt="merhaba")
+
+    server.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    await pool.aclose()
+    print(f"  async     c={concurrency:4d}: {total / elapsed:8.1f} req/s  wall={elapsed:6.2f}s  peak in-flight={server.peak}")
+
+
+async def bench_to_thread(base_url: str, server: StandInServer, *, concurrency: int, total: int) -> None:
+    url = f"{base_url}/models/bench-model:generateContent"
+    body = {"contents": [{"role": "user", "parts": [{"text": "merhaba"}]}]}
+    sync_client = httpx.Client(limits=httpx.Limits(max_connections=concurrency), timeout=30.0)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with sem:
+            await asyncio.to_thread(sync_client.post, url, json=body)
+
+    server.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    sync_client.close()
+    print(f"  to_thread c={concurrency:4d}: {total / elapsed:8.1f} req/s  wall={elapsed:6.2f}s  peak in-flight={server.peak}")
+
+
+async def check_cancellation(base_url: str, server: StandInServer) -> None:
+    pool = HttpPool()
+    client = GeminiClient(api_key="bench", model_name="bench-model", http=pool, base_url=base_url)
+    server.reset()
+    task = asyncio.create_task(client.generate_text(prompt="iptal"))
+    await asyncio.sleep(0.1)
+    started = time.perf_counter()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    cancel_ms = (time.perf_counter() - started) * 1000
+    await asyncio.sleep(0.1)
+    await pool.aclose()
+    print(f"cancel: task done in {cancel_ms:.1f}ms, server saw abort={bool(server.aborted)}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="4,16,64")
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=4, help="eşzamanlılık başına toplam istek = c * rounds")
+    args = parser.parse_args()
+
+    server = StandInServer(latency=args.latency_ms / 1000.0)
+    base_url = await server.start()
+    print(f"stand-in server {base_url}, latency={args.latency_ms}ms")
+    try:
+        for c in (int(x) for x in args.concurrency.split(",") if x.strip()):
+            total = c * args.rounds
+            await bench_async(base_url, server, concurrency=c, total=total)
+            await bench_to_thread(base_url, server, concurrency=c, total=total)
+        server.latency = 5.0
+        await check_cancellation(base_url, server)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,563 @@
+"""
+Uçtan uca offline yük testi: handle_message sahte Discord mesajlarıyla
+sürülür; Gemini, Brave/Serper/Tavily ve ElevenLabs istekleri
+httpx.MockTransport üstündeki stand-in'lere gider (ağ yok, API anahtarı
+gerekmez). Gerçek DiscordAIBot kurulur; DB, hafıza çıkarma, özet,
+scheduler, rate limit ve cache'ler üretimdeki gibi bağlanır. Sahte olan
+yalnız Discord gateway'i ve HTTP sağlayıcılarıdır.
+
+  python -m bench.load_test --messages 500 --rate 20 --users 200
+  python -m bench.load_test --messages 300 --rate 0 --concurrency 16 --gemini-error-rate 0.05
+  python -m bench.load_test --web-ratio 0.3 --tts-ratio 0.2 --stream
+  python -m bench.load_test --max-p99-ms 3000    # aşılırsa çıkış kodu 1
+
+--rate > 0: açık döngü, mesajlar Poisson aralıklarla gelir (kuyruklanma
+görünür). --rate 0: kapalı döngü, --concurrency kadar mesaj aynı anda işlenir.
+Her mesaj discord.py'deki gibi kendi task'ında çalışır; burst birleştirme
+eski task'ı iptal edebilir.
+
+Ölçümden sonra kuyrukta kalan hafıza çıkarma ve özet işleri beklenir;
+ikisinden biri hiç çalışmadıysa test başarısız sayılır (çıkış kodu 1).
+
+Harness'in kontrol etmediği ayarlar .env'den / varsayılanlardan gelir;
+veriler geçici bir dizindeki data/ altına yazılır.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator
+
+import discord
+import httpx
+
+from src.bot.client import DiscordAIBot
+from src.bot.events import handle_message
+from src.config import load_settings
+from src.voice.tts import ElevenLabsTTS
+
+
+BOT_ID = 900_000_000_000_000_001
+OWNER_ID = 900_000_000_000_000_002
+PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+
+WORDS = (
+    "bugün hava çok güzel ama akşam yağmur yağacakmış ben de şemsiye almayı unuttum "
+    "maçı izledin mi dün gece fenerbahçe yine kaybetti kahve içmeye gidelim mi "
+    "yarın sınavım var çalışmam lazım ama canım hiç istemiyor ödev teslim tarihi cuma "
+    "kedim yine masadan bardak düşürdü yeni oyun çıktı fiyatı çok pahalı"
+).split()
+
+SEARCH_HOSTS = {
+    "api.search.brave.com": "brave",
+    "google.serper.dev": "serper",
+    "api.tavily.com": "tavily",
+}
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Log-normal gecikme (median, sigma) ve hata oranı."""
+
+    median_ms: float
+    sigma: float = 0.35
+    error_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        return self.median_ms / 1000.0 * math.exp(rng.gauss(0.0, self.sigma))
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _prompt_head(name: str) -> str:
+    return (PROMPTS_DIR / name).read_text(encoding="utf-8")[:60]
+
+
+class StandIns:
+    """Tüm sağlayıcılar için tek MockTransport handler'ı; çağrı ve hata sayar."""
+
+    def __init__(
+        self,
+        *,
+        gemini: Latency,
+        search: Latency,
+        tts: Latency,
+        web_ratio: float,
+        reply_words: int,
+        seed: int,
+    ) -> None:
+        self.gemini = gemini
+        self.search = search
+        self.tts = tts
+        self.web_ratio = web_ratio
+        self.reply_words = reply_words
+        self.rng = random.Random(seed)
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self._extraction_head = _prompt_head("memory_extraction.txt")
+        self._summary_head = _prompt_head("conversation_summary.txt")
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if host == "generativelanguage.googleapis.com":
+            return await self._gemini(request)
+        if host in SEARCH_HOSTS:
+            return await self._search(SEARCH_HOSTS[host])
+        if host == "api.elevenlabs.io":
+            return await self._tts(request)
+        return httpx.Response(404, json={"error": {"message": f"no stand-in for {host}"}})
+
+    def _answer(self, prompt: str) -> tuple[str, str]:
+        if prompt.startswith(self._extraction_head):
+            labels = re.findall(r"KONUŞMA (K\d+):", prompt) or [""]
+            items = [
+                {"user": label, "type": "preference", "content": f"{_words(self.rng, 4)} seviyor", "confidence": 0.8}
+                for label in labels
+            ]
+            return "extract", json.dumps(items, ensure_ascii=False)
+        if prompt.startswith(self._summary_head):
+            return "summary", f"Kullanıcı {_words(self.rng, 20)} hakkında konuştu."
+        if '{"tool":"web_search"' in prompt and self.rng.random() < self.web_ratio:
+            return "tool", json.dumps({"tool": "web_search", "query": _words(self.rng, 3)}, ensure_ascii=False)
+        return "reply", _words(self.rng, self.reply_words)
+
+    async def _gemini(self, request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["contents"][0]["parts"][0]["text"]
+        kind, text = self._answer(prompt)
+        self.calls[f"gemini:{kind}"] += 1
+        delay = self.gemini.sample(self.rng)
+        if self.rng.random() < self.gemini.error_rate:
+            self.errors["gemini"] += 1
+            await asyncio.sleep(delay * 0.2)
+            return httpx.Response(503, json={"error": {"message": "stand-in overloaded"}})
+
+        usage = {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+        if request.url.path.endswith(":streamGenerateContent"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=self._sse(text, usage, delay),
+            )
+        await asyncio.sleep(delay)
+        return httpx.Response(
+            200,
+            json={"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}], "usageMetadata": usage},
+        )
+
+    @staticmethod
+    async def _sse(text: str, usage: dict[str, int], delay: float) -> AsyncIterator[bytes]:
+        # İlk parça gecikmenin %40'ında, kalanı eşit aralıklarla.
+        words = text.split(" ")
+        step = max(1, len(words) // 6)
+        chunks = [" ".join(words[i : i + step]) + " " for i in range(0, len(words), step)]
+        await asyncio.sleep(delay * 0.4)
+        for i, chunk in enumerate(chunks):
+            event: dict[str, object] = {"candidates": [{"content": {"role": "model", "parts": [{"text": chunk}]}}]}
+            if i == len(chunks) - 1:
+                event["usageMetadata"] = usage
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode("utf-8")
+            if i < len(chunks) - 1:
+                await asyncio.sleep(delay * 0.6 / len(chunks))
+
+    async def _search(self, provider: str) -> httpx.Response:
+        self.calls[f"search:{provider}"] += 1
+        await asyncio.sleep(self.search.sample(self.rng))
+        if self.rng.random() < self.search.error_rate:
+            self.errors[provider] += 1
+            return httpx.Response(500, json={"error": "stand-in failure"})
+        items = [
+            {"title": f"Sonuç {i}", "url": f"https://example.com/{i}", "snippet": _words(self.rng, 12)}
+            for i in range(5)
+        ]
+        if provider == "brave":
+            body: dict[str, object] = {
+                "web": {"results": [{"title": r["title"], "url": r["url"], "description": r["snippet"]} for r in items]}
+            }
+        elif provider == "serper":
+            body = {"organic": [{"title": r["title"], "link": r["url"], "snippet": r["snippet"]} for r in items]}
+        else:
+            body = {"results": [{"title": r["title"], "url": r["url"], "content": r["snippet"]} for r in items]}
+        return httpx.Response(200, json=body)
+
+    async def _tts(self, request: httpx.Request) -> httpx.Response:
+        self.calls["tts"] += 1
+        text = str(json.loads(request.content).get("text", ""))
+        await asyncio.sleep(self.tts.sample(self.rng))
+        if self.rng.random() < self.tts.error_rate:
+            self.errors["tts"] += 1
+            return httpx.Response(500)
+        # Kabaca 1 sn ses / 15 karakter, 16 KB/sn mp3.
+        return httpx.Response(200, content=b"\xff\xf3" * (len(text) * 550), headers={"content-type": "audio/mpeg"})
+
+
+class FakeDiscord:
+    """Discord REST gecikmesi (reply/edit) ve çağrı sayısı."""
+
+    def __init__(self, latency: Latency, rng: random.Random) -> None:
+        self.latency = latency
+        self.rng = rng
+        self.replies = 0
+        self.edits = 0
+
+    async def call(self) -> None:
+        await asyncio.sleep(self.latency.sample(self.rng))
+
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str) -> None:
+        self.id = user_id
+        self.name = name
+        self.display_name = name
+        self.bot = False
+
+    def __str__(self) -> str:
+        return self.name
+
+    def mentioned_in(self, message: FakeMessage) -> bool:
+        return f"<@{self.id}>" in (message.content or "")
+
+
+class FakeSnowflake:
+    def __init__(self, object_id: int) -> None:
+        self.id = object_id
+
+
+class FakeSent:
+    def __init__(self, api: FakeDiscord) -> None:
+        self._api = api
+
+    async def edit(self, *, content: str) -> None:
+        await self._api.call()
+        self._api.edits += 1
+
+
+class FakeMessage:
+    """handle_message'ın okuduğu alanlar kadar discord.Message."""
+
+    def __init__(
+        self,
+        *,
+        message_id: int,
+        author: FakeUser,
+        channel: FakeSnowflake,
+        guild: FakeSnowflake | None,
+        content: str,
+        api: FakeDiscord,
+    ) -> None:
+        self.id = message_id
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.content = content
+        self.reference = None
+        self._api = api
+        self.replies: list[str] = []
+        self.first_reply_at: float | None = None
+
+    async def reply(self, content: str, *, mention_author: bool = True) -> FakeSent:
+        await self._api.call()
+        self._api.replies += 1
+        if self.first_reply_at is None:
+            self.first_reply_at = time.perf_counter()
+        self.replies.append(content)
+        return FakeSent(self._api)
+
+
+@dataclass
+class Sample:
+    total: float
+    first_reply: float | None
+    replied: bool
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # load_settings .env'i override=False ile okur; burada verilenler kazanır.
+    os.environ.update(
+        {
+            "DISCORD_TOKEN": "offline",
+            "DISCORD_OWNER_ID": str(OWNER_ID),
+            "SHARD_COUNT": "0",
+            "SHARD_PROCESSES": "1",
+            "GOOGLE_API_KEY": "offline",
+            "GEMINI_BASE_URL": "",
+            "GEMINI_MAX_CONCURRENCY": str(args.gemini_concurrency),
+            "ENABLE_WEB_SEARCH": "true" if args.web_ratio > 0 else "false",
+            "ENABLE_VOICE": "false",
+            "STREAM_REPLIES": "true" if args.stream else "false",
+            "REPLY_DEBOUNCE_MS": str(args.debounce_ms),
+            "MEMORY_EXTRACT_EVERY_N_MESSAGES": str(args.extract_every),
+            "SUMMARY_ENABLED": "true",
+            "DB_DURABILITY": args.durability,
+            "RATE_LIMIT_MAX": str(args.rate_limit),
+            "RATE_LIMIT_SHARED": "false",
+            "METRICS_PORT": "0",
+            "BRAVE_API_KEY": "offline",
+            "SERPER_API_KEY": "offline",
+            "TAVILY_API_KEY": "offline",
+            "ELEVENLABS_API_KEY": "offline",
+            "ELEVENLABS_VOICE_ID": "offline-voice",
+        }
+    )
+
+
+def _messages(args: argparse.Namespace, rng: random.Random, api: FakeDiscord) -> list[FakeMessage]:
+    users = [FakeUser(1_000_000 + i, f"kullanici{i}") for i in range(args.users)]
+    # skew > 0: Zipf benzeri, birkaç kullanıcı trafiğin çoğunu üretir. Aynı
+    # kullanıcının cevap beklerken attığı mesaj önceki cevabı iptal eder.
+    weights = [1.0 / (i + 1) ** args.skew for i in range(args.users)]
+    guilds = [FakeSnowflake(2_000_000 + i) for i in range(max(1, args.guilds))]
+    home = {u.id: (guilds[i % len(guilds)], FakeSnowflake(3_000_000 + i % args.channels)) for i, u in enumerate(users)}
+    out: list[FakeMessage] = []
+    for n in range(args.messages):
+        user = rng.choices(users, weights)[0]
+        guild, channel = home[user.id]
+        out.append(
+            FakeMessage(
+                message_id=10_000_000 + n,
+                author=user,
+                channel=channel,
+                guild=guild,
+                content=f"<@{BOT_ID}> {_words(rng, rng.randint(3, 30))}",
+                api=api,
+            )
+        )
+    return out
+
+
+async def _drain_background(bot: DiscordAIBot, timeout: float) -> None:
+    """Kuyrukta kalan hafıza çıkarma ve özet işleri bitene kadar bekler; close() bunları düşürür."""
+    deadline = time.perf_counter() + timeout
+    worker = bot.extraction_worker
+    if worker is not None:
+        st = worker.stats
+        # Katlanan gönderimler ayrı iş oluşturmaz; her iş bir kullanıcı olarak işlenir.
+        while st.users_processed < st.submitted - st.coalesced and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+    if bot.summarizer is not None:
+        try:
+            await asyncio.wait_for(bot.summarizer.wait_idle(), timeout=max(0.0, deadline - time.perf_counter()))
+        except asyncio.TimeoutError:
+            pass
+
+
+def _background_failures(bot: DiscordAIBot, stand_ins: StandIns) -> list[str]:
+    """Arka plan işleri yük altında gerçekten çalıştı mı; boş liste = evet."""
+    problems: list[str] = []
+    worker = bot.extraction_worker
+    if worker is None:
+        problems.append("memory extraction worker not started")
+    else:
+        st = worker.stats
+        if st.submitted == 0:
+            problems.append("no memory extraction jobs submitted (raise --messages or lower --extract-every)")
+        elif st.batches == 0 or stand_ins.calls["gemini:extract"] == 0:
+            problems.append(f"memory extraction never ran ({worker.summary()})")
+        elif st.memories_saved == 0:
+            problems.append(f"memory extraction saved nothing ({worker.summary()})")
+    if bot.summarizer is None:
+        problems.append("conversation summarizer not started")
+    elif stand_ins.calls["gemini:summary"] == 0:
+        problems.append("conversation summary never ran")
+    return problems
+
+
+def _pct(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    stand_ins = StandIns(
+        gemini=Latency(args.gemini_latency_ms, args.jitter, args.gemini_error_rate),
+        search=Latency(args.search_latency_ms, args.jitter, args.search_error_rate),
+        tts=Latency(args.tts_latency_ms, args.jitter, args.tts_error_rate),
+        web_ratio=args.web_ratio,
+        reply_words=args.reply_words,
+        seed=args.seed,
+    )
+    api = FakeDiscord(Latency(args.discord_latency_ms, args.jitter), rng)
+    messages = _messages(args, rng, api)
+
+    _configure_env(args)
+    settings = load_settings()
+    bot = DiscordAIBot(intents=discord.Intents.none(), settings=settings, http_transport=stand_ins.transport())
+    # Gateway'e bağlanılmadığı için bot.user elle verilir.
+    bot._connection.user = FakeUser(BOT_ID, settings.bot_name)  # type: ignore[assignment]
+    # login() ile aynı sıra: discord.py'nin iç kurulumu (shard kuyruğu dahil) setup_hook'tan önce.
+    # Böylece close() gerçek yolundan geçer, kapanış hataları gizlenmez.
+    await bot._async_setup_hook()
+    await bot.setup_hook()
+    await bot.on_ready()
+    tts = ElevenLabsTTS(api_key="offline", voice_id="offline-voice", http=bot.http_pool)
+
+    samples: list[Sample] = []
+    outcome: Counter[str] = Counter()
+
+    async def one(message: FakeMessage) -> None:
+        started = time.perf_counter()
+        try:
+            await handle_message(bot, message)
+            if message.replies and rng.random() < args.tts_ratio:
+                with bot.metrics.time("tts"):
+                    await tts.synthesize(text=message.replies[-1][:400])
+        except asyncio.CancelledError:
+            # Aynı kullanıcının yeni mesajı burst'ü devraldı.
+            outcome["superseded"] += 1
+            return
+        except Exception:
+            outcome["failed"] += 1
+            logging.getLogger(__name__).exception("handle_message failed")
+            return
+        end = time.perf_counter()
+        first = message.first_reply_at - started if message.first_reply_at else None
+        samples.append(Sample(total=end - started, first_reply=first, replied=bool(message.replies)))
+        outcome["replied" if message.replies else "merged"] += 1
+
+    started = time.perf_counter()
+    tasks: list[asyncio.Task[None]] = []
+    if args.rate > 0:
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        for message in messages:
+            next_at += rng.expovariate(args.rate)
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(message)))
+    else:
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def gated(message: FakeMessage) -> None:
+            async with gate:
+                # İç task: burst iptali yalnız bu mesajı etkilesin.
+                await asyncio.wait([asyncio.create_task(one(message))])
+
+        tasks = [asyncio.create_task(gated(m)) for m in messages]
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - started
+    # Cevap gecikmesi ölçüldü; arka plan işleri bitsin ki çalıştıkları doğrulanabilsin.
+    await _drain_background(bot, timeout=args.drain_timeout)
+    background_problems = _background_failures(bot, stand_ins)
+
+    stage_report = bot.metrics.render_text()
+    http_report = bot.http_pool.summary()
+    extraction = bot.extraction_worker.summary() if bot.extraction_worker else "kapalı"
+    # close() bot.db'yi None yapar; istatistikler flush'tan sonra okunur.
+    db = bot.db
+    await bot.close()
+
+    data_dir = Path("data")
+    db_bytes = sum(p.stat().st_size for p in data_dir.glob("bot.db*") if p.is_file())
+
+    totals = [s.total * 1000 for s in samples if s.replied]
+    firsts = [s.first_reply * 1000 for s in samples if s.first_reply is not None]
+    print(
+        f"messages: {len(messages)} sent, {outcome['replied']} replied, "
+        f"{outcome['merged']} merged + {outcome['superseded']} superseded by a newer message in the burst, "
+        f"{outcome['failed']} failed"
+    )
+    print(f"throughput: {outcome['replied'] / wall:,.1f} replies/s (wall {wall:.1f} s)")
+    print(
+        f"end-to-end ms: p50={_pct(totals, 0.5):.0f} p95={_pct(totals, 0.95):.0f} "
+        f"p99={_pct(totals, 0.99):.0f} max={max(totals, default=0):.0f}"
+    )
+    print(f"first reply ms: p50={_pct(firsts, 0.5):.0f} p99={_pct(firsts, 0.99):.0f}")
+    if db:
+        print(f"db writes ({db.durability}): {db.write_stats.summary()}")
+    print(f"db file: {db_bytes / 1024:,.0f} KB (WAL dahil)")
+    print(f"discord api: replies={api.replies} edits={api.edits}")
+    print(f"stand-in calls: {dict(sorted(stand_ins.calls.items()))}")
+    print(f"stand-in errors: {dict(sorted(stand_ins.errors.items()))}")
+    print(f"memory extraction: {extraction}")
+    print(f"http: {http_report}")
+    print("\nstages (ms):")
+    print(stage_report)
+
+    code = 0
+    for problem in background_problems:
+        print(f"\nFAIL: {problem}")
+        code = 1
+    if args.max_p99_ms and _pct(totals, 0.99) > args.max_p99_ms:
+        print(f"\nFAIL: p99 {_pct(totals, 0.99):.0f} ms > {args.max_p99_ms} ms")
+        code = 1
+    return code
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=5.0, help="mesaj/sn; 0 = kapalı döngü")
+    parser.add_argument("--concurrency", type=int, default=16, help="kapalı döngüde eşzamanlı mesaj")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--skew", type=float, default=0.0, help="kullanıcı dağılımı Zipf üssü (0 = eşit)")
+    parser.add_argument("--guilds", type=int, default=3)
+    parser.add_argument("--channels", type=int, default=6)
+    parser.add_argument("--gemini-latency-ms", type=float, default=400)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-concurrency", type=int, default=4)
+    parser.add_argument("--search-latency-ms", type=float, default=300)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--tts-latency-ms", type=float, default=500)
+    parser.add_argument("--tts-error-rate", type=float, default=0.0)
+    parser.add_argument("--discord-latency-ms", type=float, default=80)
+    parser.add_argument("--jitter", type=float, default=0.35, help="log-normal sigma")
+    parser.add_argument("--web-ratio", type=float, default=0.1, help="tool call dönen cevap oranı")
+    parser.add_argument("--tts-ratio", type=float, default=0.0, help="cevabı TTS'e gönderilen mesaj oranı")
+    parser.add_argument("--reply-words", type=int, default=40)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--debounce-ms", type=int, default=0)
+    parser.add_argument("--rate-limit", type=int, default=0, help="kullanıcı başına limit (0 = kapalı)")
+    parser.add_argument(
+        "--extract-every",
+        type=int,
+        default=2,
+        help="kullanıcının her N mesajında hafıza çıkarma (üretim varsayılanı 10; kısa koşuda hiç tetiklenmez)",
+    )
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="arka plan işlerini bekleme süresi (sn)")
+    parser.add_argument("--durability", choices=("strict", "group", "relaxed"), default="group")
+    parser.add_argument("--max-p99-ms", type=float, default=0, help="aşılırsa çıkış kodu 1")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--log-level", default="ERROR")
+    parser.add_argument("--keep", action="store_true", help="geçici data/ dizinini silme")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.ERROR))
+    cwd = Path.cwd()
+    workdir = Path(tempfile.mkdtemp(prefix="bot-load-"))
+    # DiscordAIBot data/ altına yazar; gerçek veriye dokunulmasın.
+    os.chdir(workdir)
+    try:
+        code = asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"data: {workdir / 'data'}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
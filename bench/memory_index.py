@@ -0,0 +1,121 @@
+"""
+Yerel hafıza embedding/index benchmark'ı (offline, CPU).
+
+  python -m bench.memory_index --sizes 10000,100000,1000000
+
+Büyük boyutlarda embedding üretmek yerine rastgele birim vektör kullanılır;
+top-k arama maliyeti vektör içeriğinden bağımsızdır. Embedding hızı ve
+SQLite blob round-trip'i ayrıca küçük bir gerçek metin kümesiyle ölçülür.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from src.memory.database import Database
+from src.memory.embeddings import EMBEDDING_DIM, EMBEDDING_MODEL, HashingEmbedder, MemoryIndex, top_k_scores
+
+
+WORDS = (
+    "kedi köpek futbol fenerbahçe galatasaray kahve çay pizza istanbul ankara izmir python rust oyun "
+    "müzik gitar piyano kitap film dizi yazılım mühendis öğrenci doktor sabah gece deniz dağ kış yaz"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def bench_embedding(n: int) -> None:
+    rng = random.Random(1)
+    texts = [_sentence(rng) for _ in range(n)]
+    embedder = HashingEmbedder()
+    started = time.perf_counter()
+    embedder.embed_many(texts)
+    elapsed = time.perf_counter() - started
+    print(f"embed_many: {n} texts in {elapsed:.2f}s ({n / elapsed:,.0f} texts/s)")
+
+
+def bench_topk(n: int, *, queries: int, k: int) -> None:
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal((n, EMBEDDING_DIM), dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    bias = rng.random(n, dtype=np.float32) * 0.1
+    qs = rng.standard_normal((queries, EMBEDDING_DIM), dtype=np.float32)
+
+    samples = []
+    for q in qs:
+        started = time.perf_counter()
+        top_k_scores(matrix, q, k, bias=bias)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    print(
+        f"top-{k} n={n:>9,}: matrix={matrix.nbytes / 1_048_576:7.1f}MB "
+        f"p50={statistics.median(samples):7.2f}ms p99={_percentile(samples, 0.99):7.2f}ms"
+    )
+
+
+async def bench_sqlite_roundtrip(n: int) -> None:
+    rng = random.Random(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(path=Path(tmp) / "bench.db", durability="relaxed", batch_max=512)
+        await db.connect()
+        embedder = HashingEmbedder()
+        await db.touch_user(discord_id="u", username="u", display_name="u")
+        texts = [f"{_sentence(rng)} #{i}" for i in range(n)]
+        vectors = embedder.embed_many(texts)
+        started = time.perf_counter()
+        for text, vec in zip(texts, vectors):
+            await db.add_memory(
+                discord_id="u",
+                memory_type="fact",
+                content=text,
+                confidence=0.8,
+                source_message_id=None,
+                embedding=(EMBEDDING_MODEL, HashingEmbedder.to_blob(vec)),
+            )
+        await db.flush()
+        write_s = time.perf_counter() - started
+
+        index = MemoryIndex(db=db)
+        started = time.perf_counter()
+        await index.search(discord_id="u", query="fenerbahçe maçı", k=5)
+        cold_ms = (time.perf_counter() - started) * 1000.0
+        started = time.perf_counter()
+        hits = await index.search(discord_id="u", query="fenerbahçe maçı", k=5)
+        warm_ms = (time.perf_counter() - started) * 1000.0
+        await db.close()
+    print(
+        f"sqlite n={n:,}: write={write_s:.2f}s cold_load+search={cold_ms:.1f}ms warm_search={warm_ms:.2f}ms "
+        f"top1={hits[0][1]['content'][:40]!r}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--embed-n", type=int, default=10000)
+    args = parser.parse_args()
+
+    bench_embedding(args.embed_n)
+    asyncio.run(bench_sqlite_roundtrip(args.embed_n))
+    for n in (int(s) for s in args.sizes.split(",") if s.strip()):
+        bench_topk(n, queries=args.queries, k=args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+RateLimiter mikro benchmark'ı: çok sayıda farklı anahtarla allow() hızı,
+bellek ve idle sweep maliyeti. Eski deque tabanlı limiter referans olarak
+aşağıda kopyalanmıştır.
+
+  python -m bench.rate_limiter --keys 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+from src.bot.rate_limiter import RateLimit, RateLimiter, SQLiteRateStore
+
+
+class DequeLimiter:
+    """Önceki implementasyon: anahtar başına zaman damgası deque'u, hiç silinmez."""
+
+    def __init__(self, max_calls: int, window_seconds: float) -> None:
+        self.max_calls = max_calls
+        self.window_seconds = window_seconds
+        self._calls: dict[str, deque[float]] = {}
+
+    def allow(self, key: str, *, guild_id: str | None = None) -> bool:
+        now = time.monotonic()
+        q = self._calls.setdefault(key, deque())
+        cutoff = now - self.window_seconds
+        while q and q[0] < cutoff:
+            q.popleft()
+        if len(q) >= self.max_calls:
+            return False
+        q.append(now)
+        return True
+
+
+def _run(name: str, limiter: object, keys: list[str], calls_per_key: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    allowed = 0
+    for _ in range(calls_per_key):
+        for i, key in enumerate(keys):
+            allowed += limiter.allow(key, guild_id=f"g{i % 50}")  # type: ignore[attr-defined]
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = len(keys) * calls_per_key
+    print(
+        f"{name:10s} {total:,} calls: {elapsed / total * 1e6:6.2f} µs/call  "
+        f"allowed={allowed:,}  mem={current / 1_048_576:6.1f}MB (peak {peak / 1_048_576:.1f}MB)"
+    )
+
+
+def bench_local(n: int, calls_per_key: int) -> None:
+    keys = [str(100_000_000_000_000_000 + i) for i in range(n)]
+    _run("deque", DequeLimiter(3, 10.0), keys, calls_per_key)
+    gcra = RateLimiter(max_calls=3, window_seconds=10.0, guild=RateLimit(10**9, 60.0), sweep_interval_seconds=3600)
+    _run("gcra", gcra, keys, calls_per_key)
+
+    started = time.perf_counter()
+    evicted = gcra.sweep(time.monotonic() + 3600)
+    print(f"sweep: evicted {evicted:,} idle keys in {(time.perf_counter() - started) * 1000:.1f}ms, left={len(gcra)}")
+
+
+def bench_shared(n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteRateStore(Path(tmp) / "rate_limits.db")
+        limit = RateLimit(3, 10.0)
+        started = time.perf_counter()
+        now = time.time()
+        for i in range(n):
+            store.hit([(f"u:{i}", limit), (f"g:{i % 50}", RateLimit(10**9, 60.0))], now)
+        elapsed = time.perf_counter() - started
+        print(f"shared     {n:,} calls: {elapsed / n * 1e6:6.1f} µs/call")
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--calls-per-key", type=int, default=3)
+    parser.add_argument("--shared-calls", type=int, default=10_000)
+    args = parser.parse_args()
+    bench_local(args.keys, args.calls_per_key)
+    bench_shared(args.shared_calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,23 @@ def _parse_on_off(arg: str) -> bool | None:
     return None
 
 
+def _split_lines(lines: list[str], limit: int = 1900) -> list[str]:
+    """Satırları bölmeden, her biri limit'i aşmayan mesajlara gruplar (uzun tek satır kırpılır)."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in lines:
+        line = line[:limit]
+        if current and size + 1 + len(line) > limit:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        size += len(line) + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
 def _extract_id(text: str) -> str | None:
     m = re.search(r"(\d{15,25})", text)
     return m.group(1) if m else None
@@ -28,17 +45,59 @@ async def handle_owner_command(bot: discord.Client, message: discord.Message) ->
     if cmd == "/status":
         settings = getattr(bot, "settings", None)
         features = getattr(bot, "features", {})
-        await message.reply(
-            "\n".join(
-                [
-                    f"Bot: {getattr(bot.user, 'name', '?')} ({getattr(bot.user, 'id', '?')})",
-                    f"Guilds: {len(getattr(bot, 'guilds', []))}",
-                    f"Web search: {features.get('web_search', False)}",
-                    f"Voice: {features.get('voice', False)}",
-                    f"Memory every N msgs: {getattr(settings, 'memory_extract_every_n_messages', '?')}",
-                ]
-            )
+        db = getattr(bot, "db", None)
+        http_pool = getattr(bot, "http_pool", None)
+        web = getattr(bot, "web_search", None)
+        memory_index = getattr(getattr(bot, "memory", None), "index", None)
+        extraction = getattr(bot, "extraction_worker", None)
+        coalescer = getattr(bot, "coalescer", None)
+        scheduler = getattr(getattr(bot, "ai", None), "scheduler", None)
+        limiter = getattr(bot, "rate_limiter", None)
+        retention = getattr(bot, "retention", None)
+        profiles = getattr(bot, "profiles", None)
+        consolidator = getattr(bot, "consolidator", None)
+        storage = await db.storage_stats() if db else None
+        # Alt sistem özetleri büyüdükçe 2000 karakter sınırını aşar; satır sınırında bölünür.
+        chunks = _split_lines(
+            [
+                f"Bot: {getattr(bot.user, 'name', '?')} ({getattr(bot.user, 'id', '?')})",
+                f"Guilds: {len(getattr(bot, 'guilds', []))}",
+                f"Shards: {getattr(bot, 'shard_ids', None) or 'auto'} / {getattr(bot, 'shard_count', '?')} "
+                f"(process {getattr(bot, 'process_index', 0)})",
+                f"Web search: {features.get('web_search', False)}",
+                f"Voice: {features.get('voice', False)}",
+                f"Memory every N msgs: {getattr(settings, 'memory_extract_every_n_messages', '?')}",
+                f"Memory index: {memory_index.summary() if memory_index else 'kapalı'}",
+                f"Memory extraction: {extraction.summary() if extraction else 'kapalı'}",
+                f"Memory consolidation: {consolidator.summary() if consolidator else 'kapalı'}",
+                f"Reply bursts: {coalescer.summary() if coalescer else 'kapalı'}",
+                f"Gemini queue: {scheduler.summary() if scheduler else 'kapalı'}",
+                f"Rate limit: {limiter.summary() if limiter else 'kapalı'}",
+                f"DB ({getattr(db, 'durability', '?')}): {db.write_stats.summary() if db else 'hazır değil'}",
+                f"DB storage: {storage.summary() if storage else '?'}",
+                f"Retention: {retention.summary() if retention else 'kapalı'}",
+                f"User cache: {profiles.summary() if profiles else 'kapalı'}",
+                f"History cache: {db.history.summary() if db and db.history else 'kapalı'}",
+                f"HTTP: {http_pool.summary() if http_pool else '?'}",
+                f"Web search providers: {web.summary() if web else '?'}",
+                f"Search cache: {web.cache.summary() if web and web.cache else 'kapalı'}",
+            ]
         )
+        await message.reply(chunks[0])
+        for chunk in chunks[1:]:
+            await message.channel.send(chunk)
+        return
+
+    if cmd == "/metrics":
+        registry = getattr(bot, "metrics", None)
+        if not registry:
+            await message.reply("Metrikler hazır değil.")
+            return
+        if args and args[0].lower() == "reset":
+            registry.reset()
+            await message.reply("Metrikler sıfırlandı.")
+            return
+        await message.reply(f"```\n{registry.render_text()[:1900]}\n```")
         return
 
     if cmd in {"/search", "/voice"}:
@@ -74,6 +133,31 @@ async def handle_owner_command(bot: discord.Client, message: discord.Message) ->
         await message.reply("\n".join(lines)[:1900])
         return
 
+    if cmd == "/find":
+        if not args:
+            await message.reply("Kullanım: /find [@user|user_id] kelimeler")
+            return
+        target_id = _extract_id(args[0])
+        terms = " ".join(args[1:] if target_id else args)
+        db = getattr(bot, "db", None)
+        if not db:
+            await message.reply("DB hazır değil.")
+            return
+        memory_hits = await db.search_memories(query=terms, discord_id=target_id, limit=5)
+        convo_hits = await db.search_conversations(query=terms, discord_id=target_id, limit=8)
+        if not memory_hits and not convo_hits:
+            await message.reply("Sonuç yok.")
+            return
+        lines = []
+        if memory_hits:
+            lines.append("Hafıza:")
+            lines.extend(f"- <@{h.discord_id}> ({h.label}) {h.snippet}" for h in memory_hits)
+        if convo_hits:
+            lines.append("Konuşma:")
+            lines.extend(f"- <@{h.discord_id}> {h.label}: {h.snippet}" for h in convo_hits)
+        await message.reply("\n".join(lines)[:1900])
+        return
+
     if cmd == "/say":
         if len(args) < 2:
             await message.reply("Kullanım: /say #channel mesaj")
@@ -104,4 +188,4 @@ async def handle_owner_command(bot: discord.Client, message: discord.Message) ->
         await message.reply("DM gönderildi.")
         return
 
-    await message.reply("Bilinmeyen komut. (/status, /memories, /search, /voice, /say, /dm)")
+    await message.reply("Bilinmeyen komut. (/status, /metrics, /memories, /find, /search, /voice, /say, /dm)")
@@ -1,28 +1,149 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager, nullcontext
+import json
 import logging
+from typing import Any
 
-import google.generativeai as genai
+import httpx
+
+from src.ai.prompt_builder import estimate_tokens
+from src.ai.scheduler import GeminiScheduler, Priority, SchedulerOverloaded
+from src.http_pool import HttpPool
+from src.metrics import metrics
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# TPM kovası için cevap tarafına ayrılan tahmini token.
+OUTPUT_TOKEN_RESERVE = 512
+
+
+class GeminiError(Exception):
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(f"Gemini HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+def _response_text(payload: dict[str, Any]) -> str:
+    # Güvenlik filtresine takılan cevaplarda candidates/parts boş gelebiliyor.
+    candidates = payload.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(str(p.get("text", "")) for p in parts if isinstance(p, dict))
+
+
+def _record_usage(payload: dict[str, Any]) -> None:
+    usage = payload.get("usageMetadata") or {}
+    metrics.inc("gemini_prompt_tokens_total", float(usage.get("promptTokenCount") or 0))
+    metrics.inc("gemini_output_tokens_total", float(usage.get("candidatesTokenCount") or 0))
+
+
+def _error_message(response: httpx.Response) -> str:
+    try:
+        return str(response.json().get("error", {}).get("message") or response.text[:200])
+    except ValueError:
+        return response.text[:200]
+
 
 class GeminiClient:
-    def __init__(self, *, api_key: str, model_name: str):
-        genai.configure(api_key=api_key)
+    """
+    Gemini REST API'si üzerinde tamamen async client. İstekler HttpPool'un
+    "gemini" client'ından geçer; thread kullanılmaz. Çağıran task iptal
+    edilirse (ör. mesaj burst'ü devralındı) HTTP isteği de bağlantı
+    kapatılarak gerçekten kesilir.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        model_name: str,
+        http: HttpPool,
+        scheduler: GeminiScheduler | None = None,
+        timeout_seconds: float = 60.0,
+        base_url: str = DEFAULT_BASE_URL,
+    ):
+        self._api_key = api_key
         self._model_name = model_name
-        self._model = genai.GenerativeModel(model_name=model_name)
+        self._http = http
+        self._timeout = timeout_seconds
+        self._base_url = base_url.rstrip("/")
+        self.scheduler = scheduler
 
-    async def generate_text(self, *, prompt: str) -> str:
+    def _slot(self, prompt: str, priority: Priority) -> AbstractAsyncContextManager[None]:
+        if self.scheduler is None:
+            return nullcontext()
+        return self.scheduler.slot(priority=priority, tokens=estimate_tokens(prompt) + OUTPUT_TOKEN_RESERVE)
+
+    def _request(self, method: str, prompt: str, params: dict[str, str] | None = None) -> httpx.Request:
+        client = self._http.client("gemini")
+        return client.build_request(
+            "POST",
+            f"{self._base_url}/models/{self._model_name}:{method}",
+            params=params,
+            headers={"x-goog-api-key": self._api_key},
+            json={"contents": [{"role": "user", "parts": [{"text": prompt}]}]},
+        )
+
+    async def generate_text(self, *, prompt: str, priority: Priority = Priority.REPLY) -> str:
         try:
-            response = await asyncio.to_thread(self._model.generate_content, prompt)
+            async with self._slot(prompt, priority):
+                # Kuyrukta beklenen süre deadline'a dahil değil; yalnız istek süresi.
+                async with asyncio.timeout(self._timeout):
+                    response = await self._http.client("gemini").send(self._request("generateContent", prompt))
+        except SchedulerOverloaded:
+            raise
         except Exception:
-            logger.exception("Gemini generate_content failed")
+            metrics.inc("gemini_errors_total")
+            logger.exception("Gemini generateContent failed")
             raise
 
-        text = getattr(response, "text", None)
-        if not text:
-            return ""
-        return text.strip()
+        if response.status_code >= 400:
+            metrics.inc("gemini_errors_total")
+            raise GeminiError(response.status_code, _error_message(response))
+        payload = response.json()
+        _record_usage(payload)
+        return _response_text(payload).strip()
+
+    async def stream_text(self, *, prompt: str, priority: Priority = Priority.REPLY) -> AsyncIterator[str]:
+        """
+        Cevabı geldikçe parça parça döndürür (SSE). Iterator erken kapatılırsa
+        (aclose / break) HTTP stream'i de kapanır. Scheduler slot'u stream
+        bitene kadar tutulur. Deadline ilk cevaba kadar uygulanır; sonrasında
+        parçalar arası bekleme HttpPool'daki read timeout ile sınırlıdır.
+        """
+        async with self._slot(prompt, priority):
+            client = self._http.client("gemini")
+            request = self._request("streamGenerateContent", prompt, params={"alt": "sse"})
+            async with asyncio.timeout(self._timeout):
+                response = await client.send(request, stream=True)
+            # usageMetadata her olayda kümülatif gelir; sonuncusu sayılır.
+            last_event: dict[str, Any] = {}
+            try:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise GeminiError(response.status_code, _error_message(response))
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    try:
+                        last_event = json.loads(line[5:])
+                        text = _response_text(last_event)
+                    except ValueError:
+                        logger.warning("Gemini stream: undecodable event skipped")
+                        continue
+                    if text:
+                        yield text
+            except Exception as exc:
+                metrics.inc("gemini_errors_total")
+                logger.error("Gemini stream failed: %s", exc)
+                raise
+            finally:
+                _record_usage(last_event)
+                await response.aclose()
@@ -1,43 +1,232 @@
 from __future__ import annotations
 
-import re
 from dataclasses import dataclass
+import re
+import string
+import unicodedata
+
+from src.text_normalize import fold_text
 
 
 @dataclass(frozen=True)
 class FilterResult:
     allowed: bool
     text_or_reason: str
+    rule: str | None = None
+
+
+# Görünmez karakterler: yalnız eşleştirme formundan silinir; kullanıcının metnine
+# dokunulmaz (emoji ZWJ dizileri, ZWNJ kullanan yazılar bozulmasın).
+_INVISIBLE_RE = re.compile(
+    "[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u00ad\u034f\u061c\u180e"
+    "\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufeff]"
+)
+
+# Sık kullanılan Kiril/Yunan benzerleri ve Türkçe/Latin aksanlı harfler;
+# yalnız eşleştirme formunda. Tablo dışında kalan aksanlar NFD ile atılır.
+_FOLD_CHARS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+    "ş": "s", "ğ": "g", "ç": "c", "ö": "o", "ü": "u", "â": "a", "î": "i", "û": "u",
+}
+_FOLD_KEYS = frozenset(_FOLD_CHARS)
+
+# Leetspeak; ASCII metinde bytes.translate ile (C tablosu) uygulanır.
+_LEET_FROM, _LEET_TO = "013457@$", "oieastas"
+_LEET_BYTES = bytes.maketrans(_LEET_FROM.encode(), _LEET_TO.encode())
+_LEET_STR = str.maketrans(_LEET_FROM, _LEET_TO)
+
+
+def match_form(text: str) -> str:
+    """
+    Kuralların çalıştığı form: fold_text (NFKC + Türkçe i + casefold),
+    görünmez karakterler ve aksanlar silinmiş (ş->s, ğ->g...), benzer
+    harfler ASCII'ye indirilmiş, boşluklar tek boşluk.
+
+    Metin çoğunlukla ASCII/Türkçe olduğundan pahalı karakter başına
+    Python döngüsü yalnız tablo dışı bir karakter kaldığında çalışır.
+    """
+    text = fold_text(_INVISIBLE_RE.sub("", text))
+    if not text.isascii():
+        for ch in _FOLD_KEYS.intersection(text):
+            text = text.replace(ch, _FOLD_CHARS[ch])
+        if not text.isascii():
+            decomposed = unicodedata.normalize("NFD", text)
+            text = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    if text.isascii():
+        text = text.encode("ascii").translate(_LEET_BYTES).decode("ascii")
+    else:
+        text = text.translate(_LEET_STR)
+    return " ".join(text.split())
+
+
+# Ön filtre anahtarı: bir kelimenin ilk KEY_LEN karakteri. Noktalama boşluğa
+# çevrilip split edilir (tek C geçişi); kelimeler ve tetikleyiciler aynı yolla
+# anahtara iner.
+KEY_LEN = 4
+_PUNCT = string.punctuation.replace("_", "")
+_PUNCT_BYTES = bytes.maketrans(_PUNCT.encode(), b" " * len(_PUNCT))
+_PUNCT_STR = str.maketrans(_PUNCT, " " * len(_PUNCT))
+
+
+def _words(text: str) -> list[str]:
+    if text.isascii():
+        return text.encode("ascii").translate(_PUNCT_BYTES).decode("ascii").split()
+    return text.translate(_PUNCT_STR).split()
+
+
+@dataclass(frozen=True)
+class _Rule:
+    name: str
+    # Eşleşmenin mutlaka içerdiği ifadeler. Ön filtre yalnız ilk kelimelerinin
+    # başına (KEY_LEN karakter) bakar; hiçbiri metinde bir kelime başında yoksa
+    # regex çalışmaz. Kelime içermeyen tetikleyiciler ("<|") doğrudan `in` ile aranır.
+    triggers: tuple[str, ...]
+    pattern: re.Pattern[str]
+
+
+def _rule(name: str, triggers: tuple[str, ...], pattern: str) -> _Rule:
+    return _Rule(name=name, triggers=triggers, pattern=re.compile(pattern))
+
+
+# Desenler match_form çıktısına göre yazılır (ASCII, küçük harf, tek boşluk).
+_S = r"[\s\W_]*"
+
+
+def _possessed(*words: str) -> str:
+    """
+    "kurallarını"/"talimatlarını" iyelik ekiyle gelir; botun değil başka bir şeyin
+    kuralları tamlayanla söylenir ("oyunun kurallarını"). Tamlayan çoğunlukla "n"
+    ile biter: öncesi "...n " ise eşleşmez ("sen"/"senin" hariç). Kelime önce
+    yazılır ki regex sabit önekle hızlı arasın.
+    """
+    return "(?:" + "|".join(rf"{w}(?:(?<!n {w})|(?<=sen {w})|(?<=senin {w}))" for w in words) + ")"
+
+
+RULES: tuple[_Rule, ...] = (
+    _rule(
+        "ignore_instructions",
+        ("ignore", "disregard", "override"),
+        r"(?:ignore|disregard|override) (?:(?:all|any|previous|prior|your|the above) )*(?:instructions|prompts?|rules)",
+    ),
+    _rule(
+        "role_override",
+        ("you are now", "new role", "new persona", "new identity", "pretend", "act as if"),
+        r"you are now|new (?:role|persona|identity)|pretend (?:to be|you\W?re)|act as if",
+    ),
+    # "forget your keys?" geçmesin: unutulacak şey botun talimatları ya da önceki bağlam olmalı.
+    _rule(
+        "forget",
+        ("forget",),
+        r"forget (?:all |about )?(?:your|the|previous|prior) (?:(?:previous|prior|above|earlier|original) )*"
+        r"(?:instructions|prompts?|rules|guidelines)"
+        r"|forget (?:everything|all) (?:above|before|previous|you(?:ve| have)? (?:been told|learned|know))",
+    ),
+    # "show me the instructions for this lego set" geçmesin: "your" ya da "system" şart.
+    _rule(
+        "system_prompt",
+        ("system", "reveal", "show", "print", "repeat"),
+        rf"system{_S}prompt"
+        r"|(?:reveal|show|print|repeat) (?:me )?(?:your (?:system |initial |hidden )?|the (?:system|initial|hidden) )"
+        r"(?:prompt|instructions|rules)",
+    ),
+    _rule(
+        "jailbreak",
+        ("developer mode", "jailbreak", "do anything now"),
+        r"developer mode|jailbreak|do anything now",
+    ),
+    _rule("chat_tokens", ("<|", "[inst]", "[/inst]"), r"<\|.*?\|>|\[/?inst\]"),
+    _rule(
+        "tr_ignore_instructions",
+        ("talimat", "kural", "komut", "yonerge", "yonlendirme"),
+        r"(?:onceki|yukaridaki|tum|butun|verilen|sana verilen) (?:\w+ )?"
+        r"(?:talimat|kural|komut|yonerge|yonlendirme)\w* "
+        r"(?:unut|yoksay|yok say|gormezden gel|dikkate alma|iptal et|gecersiz)",
+    ),
+    # "her şeyi unut gitsin" geçmesin: botun kimliği/kuralları ya da ona söylenenler hedeflenmeli.
+    _rule(
+        "tr_forget",
+        # "unut" değil: "unuttum" sık geçer; eşleşme hep bu kelimelerden biriyle başlar.
+        ("kimligini", "kurallarini", "talimatlarini", "promptunu", "sana", "bildigin", "ogrendigin"),
+        rf"{_possessed('kimligini', 'kurallarini', 'talimatlarini', 'promptunu')} unut"
+        r"|(?:sana (?:soylenen|verilen)|bildigin|ogrendigin) (?:her seyi|hersey\w*) unut",
+    ),
+    # "yeni rolün ne işte" geçmesin: rol değişikliği buyrukla ya da "artık/bundan sonra" ile verilmeli.
+    _rule(
+        "tr_role_override",
+        (
+            "rolundesin", "rolunu oyna", "olarak davran", "rolunden cik",
+            "karakterinden cik", "rolun", "kimligin", "kisiligin",
+        ),
+        r"(?:artik|bundan sonra) (?:sen )?(?:bir )?\w+ (?:rolundesin|rolunu oyna|olarak davran)"
+        r"|rolunden cik|karakterinden cik"
+        r"|(?:artik|bundan sonra) (?:senin )?yeni (?:rolun|kimligin|kisiligin)"
+        r"|yeni (?:rolun|kimligin|kisiligin) (?:su|bu)\b",
+    ),
+    # "sistem mesajı geldi telefonuma" ve "oyunun kurallarını göster" geçmesin.
+    _rule(
+        "tr_system_prompt",
+        ("sistem", "kurallarini", "talimatlarini", "promptunu"),
+        rf"sistem{_S}prompt\w*"
+        r"|sistem (?:mesaj|talimat)\w* (?:goster|yaz|soyle|acikla|ver|paylas)"
+        rf"|{_possessed('kurallarini', 'talimatlarini', 'promptunu')} (?:goster|yaz|soyle|acikla|ver|paylas)",
+    ),
+    _rule(
+        "tr_jailbreak",
+        ("gelistirici modu", "kisitlamasiz mod", "filtresiz mod"),
+        r"gelistirici modu|kisitlamasiz mod|filtresiz mod",
+    ),
+)
+
+BLOCKED_REASON = "Şüpheli prompt-injection denemesi tespit edildi."
 
 
 class InjectionFilter:
-    DANGEROUS_PATTERNS: list[str] = [
-        r"ignore (all |previous |your )?(instructions|prompt|rules)",
-        r"you are now",
-        r"new (role|persona|identity)",
-        r"forget (everything|all|your)",
-        r"pretend (to be|you're)",
-        r"act as if",
-        r"system:?\s*prompt",
-        r"<\|.*?\|>",
-        r"\[INST\]|\[/INST\]",
-    ]
-
-    def __init__(self) -> None:
-        self._compiled = [re.compile(p, re.IGNORECASE) for p in self.DANGEROUS_PATTERNS]
+    """
+    Metin bir kez normalize edilir ve tek geçişte kelime anahtarlarına
+    (kelimenin ilk KEY_LEN karakteri) bölünür; tüm kuralların tetikleyicileri
+    tek bir dict'te bu anahtarlarla aranır. Regex yalnız anahtarı metinde
+    geçen kurallarda çalışır. Eşleşen kuralın adı FilterResult.rule'da döner.
+    """
+
+    def __init__(self, rules: tuple[_Rule, ...] = RULES) -> None:
+        self._rules = rules
+        # anahtar -> kural indeksleri; kelime içermeyen tetikleyiciler ayrı listede.
+        self._by_key: dict[str, set[int]] = {}
+        self._literals: list[tuple[str, int]] = []
+        for i, rule in enumerate(rules):
+            for trigger in rule.triggers:
+                words = _words(trigger)
+                if words:
+                    self._by_key.setdefault(words[0][:KEY_LEN], set()).add(i)
+                else:
+                    self._literals.append((trigger, i))
+
+    def match(self, message: str) -> str | None:
+        text = match_form(message)
+        keys = self._by_key.keys() & {w[:KEY_LEN] for w in _words(text)}
+        candidates = {i for literal, i in self._literals if literal in text}
+        for key in keys:
+            candidates |= self._by_key[key]
+        # Kural sırası korunur: birden fazla kural eşleşirse ilki döner.
+        for i in sorted(candidates):
+            rule = self._rules[i]
+            if rule.pattern.search(text):
+                return rule.name
+        return None
 
     def filter(self, message: str) -> FilterResult:
         if not message:
             return FilterResult(allowed=True, text_or_reason="")
 
-        for pattern in self._compiled:
-            if pattern.search(message):
-                return FilterResult(allowed=False, text_or_reason="Şüpheli prompt-injection denemesi tespit edildi.")
+        rule = self.match(message)
+        if rule:
+            return FilterResult(allowed=False, text_or_reason=BLOCKED_REASON, rule=rule)
 
-        cleaned = self._sanitize(message)
-        return FilterResult(allowed=True, text_or_reason=cleaned)
+        return FilterResult(allowed=True, text_or_reason=self._sanitize(message))
 
     def _sanitize(self, message: str) -> str:
-        message = message.replace("\x00", "")
-        message = re.sub(r"\s+", " ", message).strip()
-        return message
+        # Eski davranış: NUL silinir, boşluk dizileri tek boşluk; split() re.sub'dan hızlı.
+        return " ".join(message.replace("\x00", "").split())
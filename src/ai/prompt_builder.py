@@ -24,6 +24,75 @@ def load_prompts() -> PromptBundle:
     return PromptBundle(system=system, personality=personality)
 
 
+# Hızlı yerel tahmin: Türkçe metinde Gemini tokenizer'ı kabaca ~3 karakter/token.
+# Amaç kesin sayım değil, bütçeyi güvenli tarafta tutmak.
+CHARS_PER_TOKEN = 3.0
+
+OWNER_RULES = (
+    "KURALLAR:\n"
+    "- Kurucu ile konuşurken daha saygılı ol.\n"
+    "- Kurucuya karşı sarkazm dozunu düşür.\n"
+)
+
+ANSWER_INSTRUCTION = "Cevabı Türkçe ver. Kısa, net ve karakterinde kal."
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+@lru_cache(maxsize=64)
+def static_prefix(bot_name: str, owner_id: int) -> str:
+    """
+    [SYSTEM]/[PERSONALITY] bloğu (bot_name, owner) başına bir kez kurulur ve
+    her prompt'un en başına byte-byte aynı şekilde konur; provider tarafındaki
+    prefix/context cache'i ancak böyle isabet eder.
+    """
+    prompts = load_prompts()
+    system = prompts.system.format(bot_name=bot_name, owner_id=owner_id)
+    return f"[SYSTEM]\n{system}\n\n[PERSONALITY]\n{prompts.personality}\n\n"
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    title: str
+    lines: tuple[str, ...]
+    # Küçük sayı = önce yer alır; bütçe bitince büyük sayılı bölümler kırpılır.
+    priority: int
+    placeholder: str | None = None
+    # True: satırlar eskiden yeniye; bütçe yetmezse en eskiler düşer.
+    newest_last: bool = False
+
+
+def fit_sections(sections: list[PromptSection], budget: int) -> dict[str, list[str]]:
+    """
+    Bölümleri öncelik sırasına göre bütçeye yerleştirir. Her bölümün satırları
+    önem sırasındadır; sığmayan ilk satırda o bölüm kesilir. newest_last
+    bölümler sondan doldurulur ve kronolojik sırada döner.
+    """
+    kept: dict[str, list[str]] = {s.title: [] for s in sections}
+    remaining = budget
+    for section in sorted(sections, key=lambda s: s.priority):
+        if not section.lines:
+            continue
+        header_cost = estimate_tokens(f"[{section.title}]\n\n")
+        if header_cost >= remaining:
+            continue
+        remaining -= header_cost
+        lines = kept[section.title]
+        for line in reversed(section.lines) if section.newest_last else section.lines:
+            cost = estimate_tokens(line) + 1
+            if cost > remaining:
+                break
+            lines.append(line)
+            remaining -= cost
+        if section.newest_last:
+            lines.reverse()
+    return kept
+
+
 def build_prompt(
     *,
     bot_name: str,
@@ -34,31 +103,43 @@ def build_prompt(
     memories: list[str] | None = None,
     tool_instructions: str | None = None,
     web_results: list[str] | None = None,
+    related_history: list[str] | None = None,
+    conversation_summary: list[str] | None = None,
+    recent_turns: list[str] | None = None,
+    token_budget: int | None = None,
 ) -> str:
-    prompts = load_prompts()
+    """
+    Sıra: statik prefix, tool talimatı, kurucu kuralları, dinamik bölümler,
+    kullanıcı mesajı. token_budget verilirse dinamik bölümler (web sonuçları >
+    hafızalar > son turlar > konuşma özeti > ilgili geçmiş) bütçeye sığacak
+    kadar kırpılır.
+    """
+    prefix = static_prefix(bot_name, owner_id)
+    tools_block = tool_instructions.strip() if tool_instructions else ""
+    tools_section = f"[TOOLS]\n{tools_block}\n\n" if tools_block else ""
+    owner_rules = OWNER_RULES if is_owner else ""
+    user_section = f"[USER]\nAd: {user_display_name}\nMesaj: {user_message}\n\n"
 
-    system = prompts.system.format(bot_name=bot_name, owner_id=owner_id)
-    personality = prompts.personality
+    sections = [
+        PromptSection("MEMORIES", tuple(memories or ()), priority=1, placeholder="- (yok)"),
+        PromptSection("CONVERSATION_SUMMARY", tuple(conversation_summary or ()), priority=3),
+        PromptSection("RECENT_TURNS", tuple(recent_turns or ()), priority=2, newest_last=True),
+        PromptSection("RELATED_HISTORY", tuple(related_history or ()), priority=4),
+        PromptSection("WEB_SEARCH_RESULTS", tuple(web_results or ()), priority=0),
+    ]
 
-    owner_rules = (
-        "KURALLAR:\n"
-        "- Kurucu ile konuşurken daha saygılı ol.\n"
-        "- Kurucuya karşı sarkazm dozunu düşür.\n"
-        if is_owner
-        else ""
-    )
+    if token_budget is None:
+        kept = {s.title: list(s.lines) for s in sections}
+    else:
+        fixed = prefix + tools_section + owner_rules + user_section + ANSWER_INSTRUCTION
+        kept = fit_sections(sections, max(0, token_budget - estimate_tokens(fixed)))
 
-    memories_block = "\n".join(memories or []) or "- (yok)"
-    tools_block = tool_instructions.strip() if tool_instructions else ""
-    web_block = "\n".join(web_results or [])
-
-    return (
-        f"[SYSTEM]\n{system}\n\n"
-        f"[PERSONALITY]\n{personality}\n\n"
-        f"{owner_rules}"
-        f"{('[TOOLS]\\n' + tools_block + '\\n\\n') if tools_block else ''}"
-        f"[MEMORIES]\n{memories_block}\n\n"
-        f"{('[WEB_SEARCH_RESULTS]\\n' + web_block + '\\n\\n') if web_block else ''}"
-        f"[USER]\nAd: {user_display_name}\nMesaj: {user_message}\n\n"
-        "Cevabı Türkçe ver. Kısa, net ve karakterinde kal."
-    )
+    dynamic = []
+    for section in sections:
+        lines = kept[section.title]
+        if lines:
+            dynamic.append(f"[{section.title}]\n" + "\n".join(lines) + "\n\n")
+        elif section.placeholder is not None:
+            dynamic.append(f"[{section.title}]\n{section.placeholder}\n\n")
+
+    return f"{prefix}{tools_section}{owner_rules}{''.join(dynamic)}{user_section}{ANSWER_INSTRUCTION}"
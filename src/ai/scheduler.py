@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import enum
+import heapq
+import itertools
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    # Küçük değer önce çalışır.
+    OWNER = 0
+    REPLY = 1
+    FOLLOW_UP = 2
+    BACKGROUND = 3
+
+
+class SchedulerOverloaded(Exception):
+    """İstek kuyrukta queue timeout'tan uzun bekledi ve düşürüldü."""
+
+
+class TokenBucket:
+    """Dakikalık limit için sürekli dolan kova. rate_per_minute <= 0 ise sınırsız."""
+
+    def __init__(self, rate_per_minute: int) -> None:
+        self.capacity = float(max(0, rate_per_minute))
+        self._rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount kadar token için beklenecek süre (0 = hemen)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        # Tek istek kovadan büyükse kova dolunca geçsin, sonsuza kadar beklemesin.
+        amount = min(amount, self.capacity)
+        if self._tokens >= amount:
+            return 0.0
+        return (amount - self._tokens) / self._rate
+
+    def take(self, amount: float, now: float) -> None:
+        if not self.capacity:
+            return
+        self._refill(now)
+        self._tokens -= min(amount, self.capacity)
+
+
+@dataclass
+class PriorityStats:
+    granted: int = 0
+    shed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def record(self, wait: float) -> None:
+        self.granted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: float = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class GeminiScheduler:
+    """
+    Tüm Gemini çağrıları buradan geçer: aynı anda en fazla max_concurrency
+    çağrı, dakikalık istek (RPM) ve token (TPM) kovaları, öncelik sırası
+    (owner > reply > follow-up > background). Kuyrukta queue_timeout'tan
+    uzun bekleyen istek SchedulerOverloaded ile düşürülür; çağıran hızlı bir
+    yedek cevap döner.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        queue_timeout_seconds: float = 20.0,
+        background_timeout_seconds: float = 300.0,
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._rpm = TokenBucket(requests_per_minute)
+        self._tpm = TokenBucket(tokens_per_minute)
+        self._timeouts = {
+            Priority.OWNER: None,
+            Priority.REPLY: queue_timeout_seconds,
+            Priority.FOLLOW_UP: queue_timeout_seconds,
+            Priority.BACKGROUND: background_timeout_seconds,
+        }
+        self._heap: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self.stats = {p: PriorityStats() for p in Priority}
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for w in self._heap if not w.future.done())
+
+    @asynccontextmanager
+    async def slot(self, *, priority: Priority, tokens: int) -> AsyncIterator[None]:
+        await self._acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self._dispatch()
+
+    async def _acquire(self, priority: Priority, tokens: int) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=int(priority),
+            seq=next(self._seq),
+            tokens=float(max(1, tokens)),
+            enqueued_at=time.monotonic(),
+            future=loop.create_future(),
+        )
+        heapq.heappush(self._heap, waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self._timeouts[priority])
+        except asyncio.TimeoutError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Zaman aşımıyla aynı anda slot verildi; kullan.
+                return
+            waiter.future.cancel()
+            self.stats[priority].shed += 1
+            raise SchedulerOverloaded(f"Gemini queue timeout ({priority.name})") from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Slot verilmişti ama kimse kullanmayacak; geri bırak.
+                self._running -= 1
+                self._dispatch()
+            else:
+                waiter.future.cancel()
+            raise
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._heap:
+            head = self._heap[0]
+            if head.future.done():
+                heapq.heappop(self._heap)
+                continue
+            if self._running >= self._max_concurrency:
+                return
+            now = time.monotonic()
+            delay = max(self._rpm.wait_time(1, now), self._tpm.wait_time(head.tokens, now))
+            if delay > 0:
+                # Kova dolunca tekrar dene; daha düşük öncelikli iş öne geçmez.
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self._rpm.take(1, now)
+            self._tpm.take(head.tokens, now)
+            self._running += 1
+            self.stats[Priority(head.priority)].record(now - head.enqueued_at)
+            head.future.set_result(None)
+
+    def summary(self) -> str:
+        parts = [f"running={self._running}/{self._max_concurrency} queued={self.depth}"]
+        for p, st in self.stats.items():
+            if not st.granted and not st.shed:
+                continue
+            avg = st.total_wait / st.granted if st.granted else 0.0
+            parts.append(
+                f"{p.name.lower()}: n={st.granted} wait avg={avg * 1000:.0f}ms max={st.max_wait * 1000:.0f}ms shed={st.shed}"
+            )
+        return " | ".join(parts)
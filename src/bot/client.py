@@ -1,64 +1,318 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 
 import discord
+import httpx
 
+from src.bot.debounce import BurstCoalescer
 from src.bot.events import handle_message, handle_voice_state_update
 from src.ai.gemini_client import GeminiClient
+from src.ai.scheduler import GeminiScheduler
 from src.ai.injection_filter import InjectionFilter
 from src.config import Settings
-from src.bot.rate_limiter import RateLimiter
+from src.http_pool import HttpPool
+from src.bot.rate_limiter import RateLimit, RateLimiter, SQLiteRateStore
 from src.memory.database import Database
+from src.memory.embeddings import MemoryIndex
+from src.memory.extraction_worker import ExtractionWorker
+from src.memory.consolidation import MemoryConsolidator
+from src.memory.profiles import UserProfileCache
+from src.memory.retention import RetentionWorker
+from src.memory.summarizer import ConversationSummarizer
 from src.memory.user_memory import UserMemoryManager
+from src.metrics import MetricsServer, metrics
+from src.shared_state import SharedFeatureFlags, SharedFlagStore, SharedInvalidations, SharedInvalidationStore
+from src.tools.search_cache import SearchCache
 from src.tools.web_search import WebSearch
-from src.voice.voice_client import VoiceManager
+from src.voice.tts_cache import TTSCache
+from src.voice.voice_client import GREETING_TEMPLATE, VoiceManager
 
 
 logger = logging.getLogger(__name__)
 
 
-class DiscordAIBot(discord.Client):
-    def __init__(self, *, intents: discord.Intents, settings: Settings):
-        super().__init__(intents=intents)
+class DiscordAIBot(discord.AutoShardedClient):
+    def __init__(
+        self,
+        *,
+        intents: discord.Intents,
+        settings: Settings,
+        shard_ids: list[int] | None = None,
+        shard_count: int | None = None,
+        process_index: int = 0,
+        http_transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        # shard_count None ise Discord'un önerdiği sayı kullanılır (küçük botta 1).
+        super().__init__(intents=intents, shard_ids=shard_ids, shard_count=shard_count)
         self.settings = settings
+        self.process_index = process_index
+        # Birden fazla process aynı host'ta çalışıyorsa durum SQLite üzerinden paylaşılır.
+        multi_process = settings.shard_processes > 1
         self.started_at = datetime.now(tz=timezone.utc)
         self.ai: GeminiClient | None = None
         self.db: Database | None = None
         self.memory: UserMemoryManager | None = None
+        self.summarizer: ConversationSummarizer | None = None
+        self.extraction_worker: ExtractionWorker | None = None
+        self.retention: RetentionWorker | None = None
+        self.profiles: UserProfileCache | None = None
+        self.consolidator: MemoryConsolidator | None = None
+        self.invalidations: SharedInvalidations | None = None
+        self._tts_warm_task: asyncio.Task[None] | None = None
+        self._fts_backfill_task: asyncio.Task[None] | None = None
         self.injection_filter = InjectionFilter()
         self.rate_limiter = RateLimiter(
             max_calls=settings.rate_limit_max,
             window_seconds=float(settings.rate_limit_window_seconds),
+            guild=RateLimit(settings.rate_limit_guild_max, float(settings.rate_limit_guild_window_seconds)),
+            global_limit=RateLimit(settings.rate_limit_global_max, float(settings.rate_limit_global_window_seconds)),
+            store=(
+                SQLiteRateStore(Path("data") / "rate_limits.db")
+                if settings.rate_limit_shared or multi_process
+                else None
+            ),
+        )
+        self.coalescer = BurstCoalescer(
+            window_ms=settings.reply_debounce_ms,
+            max_messages=settings.reply_burst_max_messages,
+        )
+        default_features = {"web_search": settings.enable_web_search, "voice": settings.enable_voice}
+        self.features: dict[str, bool] = (
+            SharedFeatureFlags(SharedFlagStore(Path("data") / "shared_state.db"), default_features)
+            if multi_process
+            else default_features
+        )
+        # discord.Client.http zaten Discord'un kendi HTTP client'ı; isim çakışmasın.
+        # http_transport yalnız offline yük testi içindir (bench/load_test.py).
+        self.http_pool = HttpPool(http2=settings.http2_enabled, transport=http_transport)
+        self.search_cache = SearchCache(
+            ttl_seconds=settings.search_cache_ttl_seconds,
+            volatile_ttl_seconds=settings.search_cache_volatile_ttl_seconds,
+            max_entries=settings.search_cache_max_entries,
+            db_path=Path("data") / "search_cache.db" if settings.search_cache_persist else None,
         )
-        self.features = {"web_search": settings.enable_web_search, "voice": settings.enable_voice}
         self.web_search = WebSearch(
             brave_api_key=settings.brave_api_key,
             serper_api_key=settings.serper_api_key,
             tavily_api_key=settings.tavily_api_key,
+            http=self.http_pool,
+            mode=settings.web_search_mode,
+            hedge_delay_ms=settings.web_search_hedge_delay_ms,
+            cache=self.search_cache,
         )
         self.voice_manager = VoiceManager(
             bot=self,
             elevenlabs_api_key=settings.elevenlabs_api_key,
             elevenlabs_voice_id=settings.elevenlabs_voice_id,
+            http=self.http_pool,
+            elevenlabs_model_id=settings.elevenlabs_model_id,
+            cache=(
+                TTSCache(root=Path("data") / "tts_cache", max_bytes=settings.tts_cache_max_mb * 1_048_576)
+                if settings.tts_cache_max_mb > 0
+                else None
+            ),
+            streaming=settings.tts_streaming,
         )
 
         if settings.google_api_key:
-            self.ai = GeminiClient(api_key=settings.google_api_key, model_name=settings.gemini_model)
+            self.ai = GeminiClient(
+                api_key=settings.google_api_key,
+                model_name=settings.gemini_model,
+                http=self.http_pool,
+                timeout_seconds=settings.gemini_timeout_ms / 1000.0,
+                base_url=settings.gemini_base_url,
+                scheduler=GeminiScheduler(
+                    max_concurrency=settings.gemini_max_concurrency,
+                    requests_per_minute=settings.gemini_rpm,
+                    tokens_per_minute=settings.gemini_tpm,
+                    queue_timeout_seconds=settings.gemini_queue_timeout_ms / 1000.0,
+                ),
+            )
+
+        self.metrics = metrics
+        self.metrics.add_collector(self._collect_metrics)
+        self.metrics_server: MetricsServer | None = None
+        if settings.metrics_port > 0:
+            self.metrics_server = MetricsServer(
+                metrics,
+                host=settings.metrics_host,
+                # Her shard process'i kendi portunda.
+                port=settings.metrics_port + process_index,
+            )
+
+    def _collect_metrics(self) -> dict[str, float]:
+        # Bileşenlerin kendi sayaçları; yalnız /metrics okunurken toplanır.
+        values: dict[str, float] = {
+            "search_cache_hits_total": self.search_cache.stats.memory_hits + self.search_cache.stats.disk_hits,
+            "search_cache_misses_total": self.search_cache.stats.misses,
+            "rate_limited_total": self.rate_limiter.rejected,
+        }
+        history = self.db.history if self.db else None
+        if history is not None:
+            values["history_cache_hits_total"] = history.stats.hits
+            values["history_cache_misses_total"] = history.stats.misses
+        if self.profiles is not None:
+            values["user_cache_hits_total"] = self.profiles.stats.hits
+            values["user_cache_misses_total"] = self.profiles.stats.misses
+        tts_cache = self.voice_manager.cache
+        if tts_cache is not None:
+            values["tts_cache_hits_total"] = tts_cache.stats.hits
+            values["tts_cache_misses_total"] = tts_cache.stats.misses
+        return values
+
+    async def setup_hook(self) -> None:
+        self.http_pool.open()
+        if self.metrics_server:
+            try:
+                await self.metrics_server.start()
+            except OSError:
+                # Port doluysa bot yine çalışır; /metrics DM komutu kalır.
+                logger.exception("metrics endpoint failed to start")
+                self.metrics_server = None
+        if isinstance(self.features, SharedFeatureFlags):
+            self.features.start()
+        try:
+            await self.search_cache.open()
+        except Exception:
+            # Disk katmanı olmadan da bellek cache'i çalışır.
+            logger.exception("search cache disk tier failed to open")
+
+        if self.settings.enable_voice:
+            phrases = [GREETING_TEMPLATE.format(bot_name=self.settings.bot_name), *self.settings.tts_warm_phrases]
+            self._tts_warm_task = asyncio.create_task(self.voice_manager.warm_cache(phrases))
 
     async def on_ready(self) -> None:
         user = self.user
         logger.info("Logged in as %s", f"{user} ({user.id})" if user else "unknown")
 
         if not self.db:
-            self.db = Database(path=Path("data") / "bot.db")
+            self.db = Database(
+                path=Path("data") / "bot.db",
+                durability=self.settings.db_durability,
+                flush_interval_ms=self.settings.db_flush_interval_ms,
+                batch_max=self.settings.db_batch_max,
+                read_connections=self.settings.db_read_connections,
+                cache_mb=self.settings.db_cache_mb,
+                mmap_mb=self.settings.db_mmap_mb,
+                history_turns=self.settings.history_turns,
+                # Diğer process'lerin yazdığı turlar buffer'a düşmez; çok process'te kapalı.
+                history_cache_mb=0 if self.settings.shard_processes > 1 else self.settings.history_cache_mb,
+            )
             await self.db.connect()
             logger.info("SQLite ready: %s", Path("data") / "bot.db")
+            if self.settings.user_cache_size > 0:
+                self.profiles = UserProfileCache(
+                    db=self.db,
+                    max_users=self.settings.user_cache_size,
+                    flush_interval_seconds=float(self.settings.user_cache_flush_seconds),
+                )
+                self.profiles.start()
+            if self.process_index == 0:
+                # Backfill'i tek process yapar; aynı satırlar iki kez index'lenmesin.
+                self._fts_backfill_task = asyncio.create_task(self._backfill_fts())
+                if self.settings.conversation_retention_days > 0:
+                    # Arşivleme de tek process'te; diğerleri yalnız ana tabloyu görür.
+                    self.retention = RetentionWorker(
+                        db=self.db,
+                        archive_path=Path("data") / "archive.db",
+                        retention_days=self.settings.conversation_retention_days,
+                        batch_rows=self.settings.archive_batch_rows,
+                    )
+                    self.retention.start()
 
         if self.ai and not self.memory:
-            self.memory = UserMemoryManager(db=self.db, ai=self.ai)
+            index = None
+            if self.settings.memory_vector_search:
+                publish = None
+                if self.settings.shard_processes > 1:
+                    # Hafıza ekleyen/birleştiren process diğerlerinin index cache'ini de düşürür.
+                    self.invalidations = SharedInvalidations(
+                        SharedInvalidationStore(Path("data") / "shared_state.db"), origin=self.process_index
+                    )
+                    publish = partial(self.invalidations.publish, "memory_index")
+                index = MemoryIndex(
+                    db=self.db, cache_bytes=self.settings.memory_index_cache_mb * 1_048_576, publish=publish
+                )
+                if self.invalidations is not None:
+                    self.invalidations.subscribe("memory_index", index.drop)
+                    self.invalidations.start()
+            self.memory = UserMemoryManager(db=self.db, ai=self.ai, index=index)
+            self.extraction_worker = ExtractionWorker(
+                memory=self.memory,
+                concurrency=self.settings.memory_extract_concurrency,
+                batch_users=self.settings.memory_extract_batch_users,
+                linger_ms=self.settings.memory_extract_linger_ms,
+            )
+            self.extraction_worker.start()
+            if self.process_index == 0 and (
+                self.settings.memory_dedup_similarity > 0
+                or self.settings.memory_decay_half_life_days > 0
+                or self.settings.memory_max_per_user > 0
+            ):
+                # Birleştirme tek process'te; diğerlerinin index cache'i SharedInvalidations ile düşer.
+                self.consolidator = MemoryConsolidator(
+                    db=self.db,
+                    index=index,
+                    similarity=self.settings.memory_dedup_similarity,
+                    half_life_days=self.settings.memory_decay_half_life_days,
+                    max_per_user=self.settings.memory_max_per_user,
+                )
+                self.consolidator.start()
+
+        if self.ai and self.settings.summary_enabled and not self.summarizer:
+            self.summarizer = ConversationSummarizer(
+                db=self.db,
+                ai=self.ai,
+                keep_recent=self.settings.summary_keep_recent_turns,
+                threshold=self.settings.summary_threshold_turns,
+            )
+
+    async def _backfill_fts(self) -> None:
+        if not self.db:
+            return
+        try:
+            await self.db.backfill_fts()
+        except Exception:
+            logger.exception("FTS backfill failed; will resume on next start")
+
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            # Önce HTTP'yi ve DB'yi kullanan arka plan işleri durur; havuzlar en son kapanır.
+            tasks = [t for t in (self._tts_warm_task, self._fts_backfill_task) if t is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.extraction_worker:
+                await self.extraction_worker.close()
+            if self.summarizer:
+                await self.summarizer.close()
+            if self.retention:
+                await self.retention.close()
+            if self.consolidator:
+                await self.consolidator.close()
+            if self.profiles:
+                # Birikmiş sayaçları DB kuyruğuna koyar; db.close() flush eder.
+                await self.profiles.close()
+            if self.invalidations is not None:
+                await self.invalidations.close()
+            if self.metrics_server:
+                await self.metrics_server.close()
+            self.rate_limiter.close()
+            if isinstance(self.features, SharedFeatureFlags):
+                await self.features.close()
+            await self.http_pool.aclose()
+            await self.search_cache.close()
+            if self.db:
+                # Kuyrukta bekleyen yazmaları flush eder.
+                await self.db.close()
+                self.db = None
 
     async def on_message(self, message: discord.Message) -> None:
         await handle_message(self, message)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CoalesceStats:
+    messages: int = 0
+    merged: int = 0
+    superseded: int = 0
+    expired: int = 0
+
+
+@dataclass
+class _Burst:
+    texts: list[str] = field(default_factory=list)
+    seq: int = 0
+    # Burst'ün cevabını üreten handler; cevap gönderilmeye başlayınca burst kapanır.
+    owner: asyncio.Task[object] | None = None
+    # Burst'teki mesajlardan biri hafıza çıkarmayı tetikledi; cevabı veren handler kuyruğa koyar.
+    extract_due: bool = False
+    touched: float = field(default_factory=time.monotonic)
+
+
+class BurstCoalescer:
+    """
+    Aynı kullanıcının aynı kanalda art arda attığı mesajları tek cevaba
+    toplar. Tek başına gelen mesaj beklemeden cevaplanır. Cevap üretimi
+    sürerken yeni mesaj gelirse üretim iptal edilir; yeni mesaj window kadar
+    bekler (arkasından gelenler de toplansın), sonra tüm burst'le baştan
+    üretir. Cevap gönderilmeye başladıktan sonra (commit) gelen mesajlar
+    yeni bir burst açar. Sahibi commit etmeden biten ve idle_seconds boyunca
+    mesaj gelmeyen burst'ler atılır.
+    """
+
+    def __init__(self, *, window_ms: int = 700, max_messages: int = 5, idle_seconds: float = 300.0) -> None:
+        self._window = max(0, window_ms) / 1000.0
+        self._max_messages = max(1, max_messages)
+        self._idle = max(idle_seconds, self._window * 2)
+        self._bursts: dict[tuple[str, str], _Burst] = {}
+        self._next_sweep = time.monotonic() + self._idle
+        self.stats = CoalesceStats()
+
+    async def collect(self, key: tuple[str, str], text: str, *, extract_due: bool = False) -> list[str] | None:
+        """
+        Döner: bu handler cevap verecekse burst'teki metinler (eskiden yeniye),
+        daha yeni bir mesaj devraldıysa None. extract_due burst'te saklanır;
+        devralınan ya da iptal edilen handler'ın tetiklediği hafıza çıkarma
+        commit() ile cevabı veren handler'a geçer.
+        """
+        self.stats.messages += 1
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._expire(now)
+        burst = self._bursts.setdefault(key, _Burst())
+        burst.touched = now
+        burst.extract_due = burst.extract_due or extract_due
+        owner, burst.owner = burst.owner, None
+        if owner is not None:
+            if owner.done():
+                # Önceki sahip commit etmeden bitti (hata vb.); eski metinler düşer.
+                burst.texts.clear()
+            else:
+                owner.cancel()
+                self.stats.superseded += 1
+
+        # Açık burst'e (bekleyen ya da üretimde) eklenen mesaj window kadar bekler;
+        # ilk mesajın cevabı gecikmez.
+        follow_up = bool(burst.texts)
+        burst.texts.append(text)
+        del burst.texts[: -self._max_messages]
+        burst.seq += 1
+        seq = burst.seq
+
+        if follow_up and self._window:
+            await asyncio.sleep(self._window)
+        if self._bursts.get(key) is not burst or burst.seq != seq:
+            self.stats.merged += 1
+            return None
+
+        burst.owner = asyncio.current_task()
+        return list(burst.texts)
+
+    def commit(self, key: tuple[str, str]) -> bool:
+        """
+        Cevap gönderilmeden hemen önce çağrılır; bundan sonra iptal edilmez.
+        Burst'teki bir mesaj hafıza çıkarmayı tetiklediyse True döner.
+        """
+        burst = self._bursts.get(key)
+        if burst is not None and burst.owner is asyncio.current_task():
+            del self._bursts[key]
+            return burst.extract_due
+        return False
+
+    def _expire(self, now: float) -> None:
+        # Sahibi yaşayan ya da window içinde mesaj almış burst'e dokunulmaz.
+        self._next_sweep = now + self._idle
+        stale = [
+            key
+            for key, burst in self._bursts.items()
+            if (burst.owner is None or burst.owner.done()) and now - burst.touched >= self._idle
+        ]
+        for key in stale:
+            del self._bursts[key]
+        self.stats.expired += len(stale)
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"messages={st.messages} merged={st.merged} superseded={st.superseded} "
+            f"expired={st.expired} open={len(self._bursts)}"
+        )
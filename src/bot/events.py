@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractContextManager, nullcontext
 import logging
 import re
+import time
 
 import discord
 
 from src.admin.commands import handle_owner_command
+from src.metrics import metrics
 from src.bot.permissions import is_owner
 from src.ai.prompt_builder import build_prompt
-from src.tools.tool_calls import parse_tool_call
+from src.ai.scheduler import Priority, SchedulerOverloaded
+from src.tools.tool_calls import ToolCall, parse_tool_call
+from src.voice.voice_client import GREETING_TEMPLATE
 
 
 logger = logging.getLogger(__name__)
@@ -37,6 +43,103 @@ def _extract_user_message(bot: discord.Client, message: discord.Message) -> str:
     return text[:2000]
 
 
+DISCORD_MESSAGE_LIMIT = 2000
+
+BUSY_REPLY = "Şu an çok yoğunum, birazdan tekrar yaz."
+
+
+def _clip(text: str) -> str:
+    return text[:DISCORD_MESSAGE_LIMIT]
+
+
+def _may_be_tool_call(text: str) -> bool:
+    # Tool call JSON'u ({...} veya ```json) ile başlar; normal cevap başlamaz.
+    head = text.lstrip()
+    return head.startswith("{") or head.startswith("`")
+
+
+async def _stream_reply(
+    message: discord.Message,
+    chunks: AsyncIterator[str],
+    *,
+    detect_tool: bool,
+    edit_interval: float,
+    on_send: Callable[[], None] | None = None,
+) -> tuple[str, discord.Message | None, ToolCall | None]:
+    """
+    Parçalar geldikçe erken bir cevap gönderir ve onu en fazla edit_interval
+    sıklıkla düzenler. Metin tool call gibi başlıyorsa hiçbir şey göndermeden
+    bekler; JSON tamamlanınca stream'i keser ve tool call'u döndürür.
+
+    Döner: (tam metin, gönderilen mesaj veya None, tool call veya None)
+    """
+    buffer = ""
+    sent: discord.Message | None = None
+    shown = ""
+    last_edit = 0.0
+    try:
+        async for chunk in chunks:
+            buffer += chunk
+            if sent is None:
+                if detect_tool and _may_be_tool_call(buffer):
+                    call = parse_tool_call(buffer)
+                    if call:
+                        return buffer.strip(), None, call
+                    continue
+                if not buffer.strip():
+                    continue
+                shown = _clip(buffer.strip())
+                if on_send:
+                    on_send()
+                sent = await message.reply(shown, mention_author=False)
+                last_edit = time.monotonic()
+                continue
+
+            now = time.monotonic()
+            if now - last_edit >= edit_interval and _clip(buffer.strip()) != shown:
+                shown = _clip(buffer.strip())
+                await sent.edit(content=shown)
+                last_edit = now
+    except Exception:
+        if sent is None:
+            raise
+        # Mesaj zaten görünüyor; elde olanla bitir.
+        logger.exception("Gemini stream interrupted")
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose:
+            await aclose()
+
+    text = buffer.strip()
+    if sent is None:
+        return text, None, (parse_tool_call(text) if detect_tool else None)
+
+    if _clip(text) != shown:
+        try:
+            await sent.edit(content=_clip(text))
+        except discord.HTTPException:
+            logger.exception("final stream edit failed")
+    return text, sent, None
+
+
+def _foreground(bot: discord.Client) -> AbstractContextManager[None]:
+    # Cevap üretilirken arka plan hafıza çıkarma batch'leri başlamasın.
+    worker = getattr(bot, "extraction_worker", None)
+    return worker.foreground() if worker else nullcontext()
+
+
+def _extraction_due(bot: discord.Client, message_count: int) -> bool:
+    settings = getattr(bot, "settings", None)
+    every_n = int(getattr(settings, "memory_extract_every_n_messages", 0) or 0)
+    return every_n > 0 and message_count > 0 and message_count % every_n == 0
+
+
+def _queue_extraction(bot: discord.Client, *, discord_id: str, message_id: str) -> None:
+    extraction = getattr(bot, "extraction_worker", None)
+    if extraction:
+        extraction.submit(discord_id=discord_id, source_message_id=message_id)
+
+
 async def handle_message(bot: discord.Client, message: discord.Message) -> None:
     if not bot.user or message.author.id == bot.user.id:
         return
@@ -58,6 +161,9 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
     if not settings:
         return
 
+    started = time.perf_counter()
+    metrics.inc("messages_total")
+
     db = getattr(bot, "db", None)
     if not db:
         await message.reply("DB hazır değil. Biraz sonra dene.", mention_author=False)
@@ -67,57 +173,130 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
     discord_id = str(message.author.id)
 
     limiter = getattr(bot, "rate_limiter", None)
-    if not user_is_owner and limiter and not limiter.allow(discord_id):
-        await message.reply("Yavaş. (Rate limit)", mention_author=False)
-        return
+    guild_id = str(message.guild.id) if message.guild else None
+    if not user_is_owner and limiter:
+        with metrics.time("rate_limit"):
+            try:
+                allowed = await limiter.hit(discord_id, guild_id=guild_id)
+            except Exception:
+                # Paylaşılan store kilitli/bozuksa mesaj düşmesin; limitsiz geçer.
+                logger.exception("rate limit check failed; allowing message")
+                allowed = True
+        if not allowed:
+            await message.reply("Yavaş. (Rate limit)", mention_author=False)
+            return
 
     if not user_text:
         user_text = "Selam"
 
     inj = getattr(bot, "injection_filter", None)
     if inj:
-        res = inj.filter(user_text)
+        with metrics.time("injection_filter"):
+            res = inj.filter(user_text)
         if not res.allowed:
+            metrics.inc("injection_blocked_total")
             await message.reply(res.text_or_reason, mention_author=False)
             return
         user_text = res.text_or_reason
 
-    try:
-        message_count = await db.touch_user(
-            discord_id=discord_id,
-            username=str(message.author),
-            display_name=getattr(message.author, "display_name", str(message.author)),
-        )
-    except Exception:
-        logger.exception("touch_user failed")
-        message_count = 0
+    profiles = getattr(bot, "profiles", None)
+    with metrics.time("db_touch"):
+        try:
+            # Profil cache'i varsa sayaç bellekte artar, DB'ye toplu yazılır.
+            touch = profiles.touch if profiles else db.touch_user
+            message_count = await touch(
+                discord_id=discord_id,
+                username=str(message.author),
+                display_name=getattr(message.author, "display_name", str(message.author)),
+            )
+        except Exception:
+            metrics.inc("db_errors_total")
+            logger.exception("touch_user failed")
+            message_count = 0
 
-    try:
-        await db.add_conversation(
-            discord_id=discord_id,
-            channel_id=str(message.channel.id) if message.channel else None,
-            message_id=str(message.id),
-            role="user",
-            content=user_text or "",
-        )
-    except Exception:
-        logger.exception("add_conversation(user) failed")
+        try:
+            await db.add_conversation(
+                discord_id=discord_id,
+                channel_id=str(message.channel.id) if message.channel else None,
+                message_id=str(message.id),
+                role="user",
+                content=user_text or "",
+            )
+        except Exception:
+            metrics.inc("db_errors_total")
+            logger.exception("add_conversation(user) failed")
 
     if not getattr(bot, "ai", None):
         reply = "GOOGLE_API_KEY ayarlı değil. Şimdilik konuşamıyorum."
         await message.reply(reply, mention_author=False)
         return
 
+    # Art arda gelen mesajlar tek cevapta toplanır; cevabı burst'ün son mesajı verir.
+    # Devralınan/iptal edilen mesajın tetiklediği hafıza çıkarma burst'te kalır,
+    # cevabı veren handler commit'te alıp kuyruğa koyar.
+    coalescer = getattr(bot, "coalescer", None)
+    burst_key = (discord_id, str(message.channel.id))
+    extract_due = _extraction_due(bot, message_count)
+    if coalescer:
+        with metrics.time("burst_wait"):
+            texts = await coalescer.collect(burst_key, user_text, extract_due=extract_due)
+        if texts is None:
+            return
+        user_text = "\n".join(texts)
+        extract_due = False
+
+    def _commit_reply() -> None:
+        nonlocal extract_due
+        if coalescer and coalescer.commit(burst_key):
+            extract_due = True
+
     memories: list[str] = []
     mem_mgr = getattr(bot, "memory", None)
     if mem_mgr:
         try:
-            memories = await mem_mgr.get_prompt_memories(discord_id=discord_id, limit=5)
+            with metrics.time("memory_fetch"):
+                memories = await mem_mgr.get_prompt_memories(discord_id=discord_id, limit=5, query=user_text)
         except Exception:
             logger.exception("get_prompt_memories failed")
 
+    related: list[str] = []
+    related_limit = int(getattr(settings, "prompt_related_history", 0) or 0)
+    if related_limit > 0:
+        try:
+            with metrics.time("related_history"):
+                hits = await db.search_conversations(
+                    query=user_text,
+                    discord_id=discord_id,
+                    limit=related_limit,
+                    exclude_message_id=str(message.id),
+                )
+            related = [f"- {h.label}: {h.content[:200]}" for h in hits]
+        except Exception:
+            logger.exception("search_conversations failed")
+
+    channel_id = None if is_dm else str(message.channel.id)
+    summary_lines: list[str] = []
+    recent_turns: list[str] = []
+    summarizer = getattr(bot, "summarizer", None)
+    if summarizer:
+        try:
+            with metrics.time("summary_context"):
+                ctx = await summarizer.context(
+                    discord_id=discord_id,
+                    channel_id=channel_id,
+                    exclude_message_id=str(message.id),
+                )
+            if ctx.user_summary:
+                summary_lines.append(f"Kullanıcı: {ctx.user_summary}")
+            if ctx.channel_summary:
+                summary_lines.append(f"Kanal: {ctx.channel_summary}")
+            recent_turns = ctx.recent_turns
+        except Exception:
+            logger.exception("conversation summary context failed")
+
     features = getattr(bot, "features", {})
     web_enabled = bool(features.get("web_search", False)) if isinstance(features, dict) else False
+    token_budget = int(getattr(settings, "prompt_token_budget", 0) or 0) or None
 
     prompt = build_prompt(
         bot_name=settings.bot_name,
@@ -126,6 +305,10 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
         user_message=user_text,
         is_owner=user_is_owner,
         memories=memories,
+        related_history=related,
+        conversation_summary=summary_lines,
+        recent_turns=recent_turns,
+        token_budget=token_budget,
         tool_instructions=(
             "Kullanabileceğin tek tool: web_search.\n"
             "Eğer güncel bilgi gerekiyorsa SADECE şu JSON'u döndür:\n"
@@ -136,22 +319,44 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
         else None,
     )
 
+    stream_replies = bool(getattr(settings, "stream_replies", False))
+    edit_interval = max(0.2, float(getattr(settings, "stream_edit_interval_ms", 1000)) / 1000.0)
+    sent: discord.Message | None = None
+    priority = Priority.OWNER if user_is_owner else Priority.REPLY
+
     try:
-        draft = await bot.ai.generate_text(prompt=prompt)  # type: ignore[union-attr]
+        with _foreground(bot), metrics.time("gemini"):
+            if stream_replies:
+                draft, sent, tool_call = await _stream_reply(
+                    message,
+                    bot.ai.stream_text(prompt=prompt, priority=priority),  # type: ignore[union-attr]
+                    detect_tool=web_enabled,
+                    edit_interval=edit_interval,
+                    on_send=_commit_reply,
+                )
+            else:
+                draft = await bot.ai.generate_text(prompt=prompt, priority=priority)  # type: ignore[union-attr]
+                tool_call = parse_tool_call(draft) if web_enabled else None
+    except SchedulerOverloaded:
+        _commit_reply()
+        await message.reply(BUSY_REPLY, mention_author=False)
+        return
     except Exception:
+        _commit_reply()
         await message.reply("Şu an kafam yandı. Biraz sonra dene.", mention_author=False)
         return
 
     reply = draft or "Cevap üretemedim. (Bence bu da bir cevap.)"
 
-    tool_call = parse_tool_call(draft) if web_enabled else None
     if tool_call and tool_call.tool == "web_search":
         query = tool_call.query[:200]
         web = getattr(bot, "web_search", None)
         if web:
             try:
-                results = await web.search(query=query, limit=5)
+                with metrics.time("web_search"):
+                    results = await web.search(query=query, limit=5)
             except Exception:
+                metrics.inc("web_search_errors_total")
                 logger.exception("web_search failed")
                 results = []
         else:
@@ -171,16 +376,37 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
                 user_message=f"{user_text}\n\nNot: WEB_SEARCH_RESULTS'e dayanarak cevapla.",
                 is_owner=user_is_owner,
                 memories=memories,
+                related_history=related,
+                conversation_summary=summary_lines,
+                recent_turns=recent_turns,
                 web_results=lines,
+                token_budget=token_budget,
             )
+            follow_up = Priority.OWNER if user_is_owner else Priority.FOLLOW_UP
             try:
-                reply2 = await bot.ai.generate_text(prompt=prompt2)  # type: ignore[union-attr]
+                with _foreground(bot), metrics.time("gemini_follow_up"):
+                    if stream_replies:
+                        reply2, sent, _ = await _stream_reply(
+                            message,
+                            bot.ai.stream_text(prompt=prompt2, priority=follow_up),  # type: ignore[union-attr]
+                            detect_tool=False,
+                            edit_interval=edit_interval,
+                            on_send=_commit_reply,
+                        )
+                    else:
+                        reply2 = await bot.ai.generate_text(prompt=prompt2, priority=follow_up)  # type: ignore[union-attr]
                 if reply2.strip():
                     reply = reply2.strip()
+            except SchedulerOverloaded:
+                reply = BUSY_REPLY
             except Exception:
                 logger.exception("Gemini answer after web search failed")
 
-    await message.reply(reply, mention_author=False)
+    if sent is None:
+        _commit_reply()
+        with metrics.time("discord_reply"):
+            await message.reply(_clip(reply), mention_author=False)
+    metrics.observe("reply_total", time.perf_counter() - started)
 
     # Owner DM -> optionally speak the reply in voice (costly, opt-in).
     voice_enabled = bool(features.get("voice", False)) if isinstance(features, dict) else False
@@ -204,19 +430,11 @@ async def handle_message(bot: discord.Client, message: discord.Message) -> None:
     except Exception:
         logger.exception("add_conversation(assistant) failed")
 
-    every_n = int(getattr(settings, "memory_extract_every_n_messages", 0) or 0)
-    if mem_mgr and every_n > 0 and message_count > 0 and message_count % every_n == 0:
-        task = asyncio.create_task(
-            mem_mgr.extract_and_store(discord_id=discord_id, source_message_id=str(message.id))
-        )
-
-        def _log_task_result(t: asyncio.Task[object]) -> None:
-            try:
-                t.result()
-            except Exception:
-                logger.exception("memory task failed")
+    if summarizer:
+        summarizer.note_turns(discord_id=discord_id, channel_id=channel_id)
 
-        task.add_done_callback(_log_task_result)
+    if extract_due:
+        _queue_extraction(bot, discord_id=discord_id, message_id=str(message.id))
 
 
 async def handle_voice_state_update(
@@ -246,7 +464,7 @@ async def handle_voice_state_update(
         try:
             await voice_manager.join(after.channel)
             if before.channel is None or before.channel.id != after.channel.id:
-                await voice_manager.speak(guild=after.channel.guild, text=f"Selam patron. {settings.bot_name} hatta.")
+                await voice_manager.speak(guild=after.channel.guild, text=GREETING_TEMPLATE.format(bot_name=settings.bot_name))
         except Exception:
             logger.exception("voice join/speak failed")
         return
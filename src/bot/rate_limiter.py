@@ -1,34 +1,199 @@
 from __future__ import annotations
 
-from collections import deque
+import asyncio
 from dataclasses import dataclass
+import logging
+from pathlib import Path
+import sqlite3
+import threading
 import time
 
 
-@dataclass
-class RateLimiter:
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
     max_calls: int
     window_seconds: float
 
-    def __post_init__(self) -> None:
-        self._calls: dict[str, deque[float]] = {}
+    @property
+    def enabled(self) -> bool:
+        return self.max_calls > 0 and self.window_seconds > 0
 
-    def allow(self, key: str) -> bool:
-        if self.max_calls <= 0:
-            return True
+    @property
+    def interval(self) -> float:
+        # GCRA emission interval: iki istek arasındaki "ideal" aralık.
+        return self.window_seconds / self.max_calls if self.enabled else 0.0
 
-        now = time.monotonic()
-        q = self._calls.get(key)
-        if q is None:
-            q = deque()
-            self._calls[key] = q
 
-        cutoff = now - self.window_seconds
-        while q and q[0] < cutoff:
-            q.popleft()
+def gcra_next(tat: float | None, now: float, limit: RateLimit) -> float | None:
+    """
+    GCRA: anahtar başına tek bir float (theoretical arrival time) tutulur.
+    İzin verilirse yeni TAT, verilmezse None döner. window içinde en fazla
+    max_calls istek geçer; boşta kalan anahtarın TAT'ı geçmişte kalır.
+    """
+    new_tat = max(tat or now, now) + limit.interval
+    if new_tat - now > limit.window_seconds + 1e-9:
+        return None
+    return new_tat
+
+
+class SQLiteRateStore:
+    """
+    Birden fazla bot process'inin aynı limitleri uygulaması için TAT'ları
+    paylaşılan bir SQLite dosyasında tutar. Kontrol + güncelleme tek
+    BEGIN IMMEDIATE transaction'ında yapılır; process'ler arası saat
+    olarak time.time() kullanılır.
+    """
+
+    def __init__(self, path: Path, *, busy_timeout_ms: int = 1000) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+        self._lock = threading.Lock()
+
+    def hit(self, checks: list[tuple[str, RateLimit]], now: float) -> bool:
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                updates: list[tuple[str, float]] = []
+                for key, limit in checks:
+                    row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                    new_tat = gcra_next(row[0] if row else None, now, limit)
+                    if new_tat is None:
+                        conn.execute("ROLLBACK")
+                        return False
+                    updates.append((key, new_tat))
+                conn.executemany(
+                    "INSERT INTO rate_limits(key, tat) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    updates,
+                )
+                conn.execute("COMMIT")
+                return True
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def sweep(self, now: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
 
-        if len(q) >= self.max_calls:
-            return False
+class RateLimiter:
+    """
+    Kullanıcı, sunucu (guild) ve global limitleri GCRA ile uygular. Bir
+    istek ancak tüm limitler izin verirse sayılır; reddedilen istek hiçbir
+    sayaçtan düşmez. TAT'ı geçmişte kalan (yani tamamen dolmuş) anahtarlar
+    periyodik sweep ile silinir, bellek yalnız aktif anahtar sayısıyla büyür.
+    store verilirse durum process'ler arası paylaşılır.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_calls: int,
+        window_seconds: float,
+        guild: RateLimit | None = None,
+        global_limit: RateLimit | None = None,
+        sweep_interval_seconds: float = 60.0,
+        store: SQLiteRateStore | None = None,
+    ) -> None:
+        self.user_limit = RateLimit(max_calls, window_seconds)
+        self.guild_limit = guild or RateLimit(0, 0)
+        self.global_limit = global_limit or RateLimit(0, 0)
+        self._sweep_interval = sweep_interval_seconds
+        self._store = store
+        # Kapsam başına ayrı dict: sıcak yolda anahtar string'i üretilmez.
+        self._users: dict[str, float] = {}
+        self._guilds: dict[str, float] = {}
+        self._global_tat = 0.0
+        self._next_sweep = time.monotonic() + sweep_interval_seconds
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._users) + len(self._guilds)
+
+    def _checks(self, key: str, guild_id: str | None) -> list[tuple[str, RateLimit]]:
+        checks: list[tuple[str, RateLimit]] = []
+        if self.user_limit.enabled:
+            checks.append((f"u:{key}", self.user_limit))
+        if guild_id and self.guild_limit.enabled:
+            checks.append((f"g:{guild_id}", self.guild_limit))
+        if self.global_limit.enabled:
+            checks.append(("*", self.global_limit))
+        return checks
+
+    def allow(self, key: str, *, guild_id: str | None = None) -> bool:
+        """Process içi kontrol (store kullanılmaz)."""
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.sweep(now)
 
-        q.append(now)
+        user_tat = guild_tat = global_tat = None
+        if self.user_limit.enabled:
+            user_tat = gcra_next(self._users.get(key), now, self.user_limit)
+            if user_tat is None:
+                self.rejected += 1
+                return False
+        if guild_id and self.guild_limit.enabled:
+            guild_tat = gcra_next(self._guilds.get(guild_id), now, self.guild_limit)
+            if guild_tat is None:
+                self.rejected += 1
+                return False
+        if self.global_limit.enabled:
+            global_tat = gcra_next(self._global_tat, now, self.global_limit)
+            if global_tat is None:
+                self.rejected += 1
+                return False
+
+        if user_tat is not None:
+            self._users[key] = user_tat
+        if guild_tat is not None:
+            self._guilds[guild_id] = guild_tat  # type: ignore[index]
+        if global_tat is not None:
+            self._global_tat = global_tat
         return True
+
+    async def hit(self, key: str, *, guild_id: str | None = None) -> bool:
+        """Store varsa paylaşılan, yoksa process içi kontrol."""
+        if self._store is None:
+            return self.allow(key, guild_id=guild_id)
+        checks = self._checks(key, guild_id)
+        if not checks:
+            return True
+        now = time.time()
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self._sweep_interval
+            await asyncio.to_thread(self._store.sweep, now)
+        allowed = await asyncio.to_thread(self._store.hit, checks, now)
+        if not allowed:
+            self.rejected += 1
+        return allowed
+
+    def sweep(self, now: float | None = None) -> int:
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self._sweep_interval
+        evicted = 0
+        for tats in (self._users, self._guilds):
+            idle = [k for k, tat in tats.items() if tat <= now]
+            for k in idle:
+                del tats[k]
+            evicted += len(idle)
+        return evicted
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
+
+    def summary(self) -> str:
+        mode = "shared" if self._store is not None else "local"
+        return f"{mode} keys={len(self)} rejected={self.rejected}"
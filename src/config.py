@@ -23,24 +23,97 @@ def _get_int(name: str, default: int) -> int:
         return default
 
 
+def _get_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return float(raw.strip())
+    except ValueError:
+        return default
+
+
+def _get_choice(name: str, default: str, choices: set[str]) -> str:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    value = raw.strip().lower()
+    return value if value in choices else default
+
+
 @dataclass(frozen=True)
 class Settings:
     discord_token: str
     discord_owner_id: int
+    shard_count: int
+    shard_processes: int
 
     bot_name: str
     log_level: str
+    metrics_host: str
+    metrics_port: int
 
     google_api_key: str | None
     gemini_model: str
+    gemini_timeout_ms: int
+    gemini_base_url: str
+    gemini_max_concurrency: int
+    gemini_rpm: int
+    gemini_tpm: int
+    gemini_queue_timeout_ms: int
 
     enable_web_search: bool
     enable_voice: bool
 
+    stream_replies: bool
+    stream_edit_interval_ms: int
+    reply_debounce_ms: int
+    reply_burst_max_messages: int
+
     memory_extract_every_n_messages: int
+    memory_extract_concurrency: int
+    memory_extract_batch_users: int
+    memory_extract_linger_ms: int
+    memory_vector_search: bool
+    memory_index_cache_mb: int
+    memory_dedup_similarity: float
+    memory_decay_half_life_days: float
+    memory_max_per_user: int
+    prompt_related_history: int
+    prompt_token_budget: int
+    summary_enabled: bool
+    summary_keep_recent_turns: int
+    summary_threshold_turns: int
+
+    db_durability: str
+    db_flush_interval_ms: int
+    db_batch_max: int
+    db_read_connections: int
+    db_cache_mb: int
+    db_mmap_mb: int
+    history_turns: int
+    history_cache_mb: int
+    conversation_retention_days: int
+    archive_batch_rows: int
+    user_cache_size: int
+    user_cache_flush_seconds: int
 
     rate_limit_max: int
     rate_limit_window_seconds: int
+    rate_limit_guild_max: int
+    rate_limit_guild_window_seconds: int
+    rate_limit_global_max: int
+    rate_limit_global_window_seconds: int
+    rate_limit_shared: bool
+
+    http2_enabled: bool
+
+    web_search_mode: str
+    web_search_hedge_delay_ms: int
+    search_cache_ttl_seconds: int
+    search_cache_volatile_ttl_seconds: int
+    search_cache_max_entries: int
+    search_cache_persist: bool
 
     brave_api_key: str | None
     serper_api_key: str | None
@@ -49,6 +122,10 @@ class Settings:
     deepgram_api_key: str | None
     elevenlabs_api_key: str | None
     elevenlabs_voice_id: str | None
+    elevenlabs_model_id: str | None
+    tts_streaming: bool
+    tts_cache_max_mb: int
+    tts_warm_phrases: tuple[str, ...]
 
 
 def load_settings() -> Settings:
@@ -70,19 +147,74 @@ def load_settings() -> Settings:
     return Settings(
         discord_token=discord_token,
         discord_owner_id=owner_id,
+        shard_count=_get_int("SHARD_COUNT", 0),
+        shard_processes=max(1, _get_int("SHARD_PROCESSES", 1)),
         bot_name=os.getenv("BOT_NAME", "ironik-bot").strip() or "ironik-bot",
         log_level=os.getenv("LOG_LEVEL", "INFO").strip() or "INFO",
+        metrics_host=os.getenv("METRICS_HOST", "127.0.0.1").strip() or "127.0.0.1",
+        metrics_port=_get_int("METRICS_PORT", 0),
         google_api_key=os.getenv("GOOGLE_API_KEY") or None,
         gemini_model=os.getenv("GEMINI_MODEL", "gemini-1.5-flash").strip() or "gemini-1.5-flash",
+        gemini_timeout_ms=_get_int("GEMINI_TIMEOUT_MS", 60000),
+        gemini_base_url=os.getenv("GEMINI_BASE_URL", "").strip() or "https://generativelanguage.googleapis.com/v1beta",
+        gemini_max_concurrency=_get_int("GEMINI_MAX_CONCURRENCY", 4),
+        gemini_rpm=_get_int("GEMINI_RPM", 0),
+        gemini_tpm=_get_int("GEMINI_TPM", 0),
+        gemini_queue_timeout_ms=_get_int("GEMINI_QUEUE_TIMEOUT_MS", 20000),
         enable_web_search=_get_bool("ENABLE_WEB_SEARCH", False),
         enable_voice=_get_bool("ENABLE_VOICE", False),
+        stream_replies=_get_bool("STREAM_REPLIES", True),
+        stream_edit_interval_ms=_get_int("STREAM_EDIT_INTERVAL_MS", 1000),
+        reply_debounce_ms=_get_int("REPLY_DEBOUNCE_MS", 700),
+        reply_burst_max_messages=_get_int("REPLY_BURST_MAX_MESSAGES", 5),
         memory_extract_every_n_messages=_get_int("MEMORY_EXTRACT_EVERY_N_MESSAGES", 10),
+        memory_extract_concurrency=_get_int("MEMORY_EXTRACT_CONCURRENCY", 1),
+        memory_extract_batch_users=_get_int("MEMORY_EXTRACT_BATCH_USERS", 4),
+        memory_extract_linger_ms=_get_int("MEMORY_EXTRACT_LINGER_MS", 2000),
+        memory_vector_search=_get_bool("MEMORY_VECTOR_SEARCH", True),
+        memory_index_cache_mb=_get_int("MEMORY_INDEX_CACHE_MB", 64),
+        memory_dedup_similarity=_get_float("MEMORY_DEDUP_SIMILARITY", 0.0),
+        memory_decay_half_life_days=_get_float("MEMORY_DECAY_HALF_LIFE_DAYS", 180.0),
+        memory_max_per_user=_get_int("MEMORY_MAX_PER_USER", 0),
+        prompt_related_history=_get_int("PROMPT_RELATED_HISTORY", 3),
+        prompt_token_budget=_get_int("PROMPT_TOKEN_BUDGET", 6000),
+        summary_enabled=_get_bool("SUMMARY_ENABLED", True),
+        summary_keep_recent_turns=_get_int("SUMMARY_KEEP_RECENT_TURNS", 6),
+        summary_threshold_turns=_get_int("SUMMARY_THRESHOLD_TURNS", 12),
+        db_durability=_get_choice("DB_DURABILITY", "group", {"strict", "group", "relaxed"}),
+        db_flush_interval_ms=_get_int("DB_FLUSH_INTERVAL_MS", 50),
+        db_batch_max=_get_int("DB_BATCH_MAX", 64),
+        db_read_connections=_get_int("DB_READ_CONNECTIONS", 2),
+        db_cache_mb=_get_int("DB_CACHE_MB", 16),
+        db_mmap_mb=_get_int("DB_MMAP_MB", 256),
+        history_turns=_get_int("HISTORY_TURNS", 20),
+        history_cache_mb=_get_int("HISTORY_CACHE_MB", 32),
+        conversation_retention_days=_get_int("CONVERSATION_RETENTION_DAYS", 0),
+        archive_batch_rows=_get_int("ARCHIVE_BATCH_ROWS", 500),
+        user_cache_size=_get_int("USER_CACHE_SIZE", 10000),
+        user_cache_flush_seconds=_get_int("USER_CACHE_FLUSH_SECONDS", 30),
         rate_limit_max=_get_int("RATE_LIMIT_MAX", 3),
         rate_limit_window_seconds=_get_int("RATE_LIMIT_WINDOW_SECONDS", 10),
+        rate_limit_guild_max=_get_int("RATE_LIMIT_GUILD_MAX", 0),
+        rate_limit_guild_window_seconds=_get_int("RATE_LIMIT_GUILD_WINDOW_SECONDS", 60),
+        rate_limit_global_max=_get_int("RATE_LIMIT_GLOBAL_MAX", 0),
+        rate_limit_global_window_seconds=_get_int("RATE_LIMIT_GLOBAL_WINDOW_SECONDS", 60),
+        rate_limit_shared=_get_bool("RATE_LIMIT_SHARED", False),
+        http2_enabled=_get_bool("HTTP2_ENABLED", False),
+        web_search_mode=_get_choice("WEB_SEARCH_MODE", "hedged", {"sequential", "hedged", "race"}),
+        web_search_hedge_delay_ms=_get_int("WEB_SEARCH_HEDGE_DELAY_MS", 1500),
+        search_cache_ttl_seconds=_get_int("SEARCH_CACHE_TTL_SECONDS", 1800),
+        search_cache_volatile_ttl_seconds=_get_int("SEARCH_CACHE_VOLATILE_TTL_SECONDS", 120),
+        search_cache_max_entries=_get_int("SEARCH_CACHE_MAX_ENTRIES", 512),
+        search_cache_persist=_get_bool("SEARCH_CACHE_PERSIST", True),
         brave_api_key=os.getenv("BRAVE_API_KEY") or None,
         serper_api_key=os.getenv("SERPER_API_KEY") or None,
         tavily_api_key=os.getenv("TAVILY_API_KEY") or None,
         deepgram_api_key=os.getenv("DEEPGRAM_API_KEY") or None,
         elevenlabs_api_key=os.getenv("ELEVENLABS_API_KEY") or None,
         elevenlabs_voice_id=os.getenv("ELEVENLABS_VOICE_ID") or None,
+        elevenlabs_model_id=os.getenv("ELEVENLABS_MODEL_ID") or None,
+        tts_streaming=_get_bool("TTS_STREAMING", True),
+        tts_cache_max_mb=_get_int("TTS_CACHE_MAX_MB", 200),
+        tts_warm_phrases=tuple(p.strip() for p in os.getenv("TTS_WARM_PHRASES", "").split("|") if p.strip()),
     )
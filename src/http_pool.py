@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import importlib.util
+import logging
+from typing import Any
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    max_connections: int
+    max_keepalive: int
+    timeout: float
+
+
+DEFAULT_PROVIDER_LIMITS: dict[str, ProviderLimits] = {
+    # Eşzamanlılığı asıl GeminiScheduler sınırlar; havuz onun üstünde kalmalı.
+    "gemini": ProviderLimits(max_connections=16, max_keepalive=8, timeout=60.0),
+    "brave": ProviderLimits(max_connections=10, max_keepalive=5, timeout=15.0),
+    "serper": ProviderLimits(max_connections=10, max_keepalive=5, timeout=15.0),
+    "tavily": ProviderLimits(max_connections=10, max_keepalive=5, timeout=20.0),
+    "elevenlabs": ProviderLimits(max_connections=4, max_keepalive=2, timeout=30.0),
+}
+
+FALLBACK_LIMITS = ProviderLimits(max_connections=10, max_keepalive=5, timeout=15.0)
+
+
+@dataclass
+class ConnectionStats:
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+
+class HttpPool:
+    """
+    Provider başına bir keep-alive httpx.AsyncClient tutar. Bot açılışta
+    open(), kapanışta aclose() çağırır; arama ve TTS sınıfları client()'ı
+    kullanır, kendi client'larını açmaz. aclose()'dan sonra client()
+    RuntimeError verir; kapanış sırasında süren işler kapatılmayacak yeni
+    bağlantılar açmaz.
+    """
+
+    def __init__(
+        self,
+        *,
+        http2: bool = False,
+        keepalive_expiry: float = 30.0,
+        limits: dict[str, ProviderLimits] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' is not installed; falling back to HTTP/1.1")
+            http2 = False
+        self._http2 = http2
+        self._keepalive_expiry = keepalive_expiry
+        self._limits = {**DEFAULT_PROVIDER_LIMITS, **(limits or {})}
+        self._transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._closed = False
+        self.stats: dict[str, ConnectionStats] = {}
+
+    def open(self) -> None:
+        for provider in self._limits:
+            self.client(provider)
+
+    def client(self, provider: str) -> httpx.AsyncClient:
+        if self._closed:
+            raise RuntimeError("HTTP pool is closed")
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._create_client(provider)
+            self._clients[provider] = client
+        return client
+
+    def _create_client(self, provider: str) -> httpx.AsyncClient:
+        limits = self._limits.get(provider, FALLBACK_LIMITS)
+        stats = self.stats.setdefault(provider, ConnectionStats())
+
+        async def _trace(event_name: str, info: dict[str, Any]) -> None:
+            # httpcore yalnızca yeni bir TCP bağlantısı açtığında bu olayı yayar.
+            if event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+
+        async def _on_request(request: httpx.Request) -> None:
+            stats.requests += 1
+            request.extensions["trace"] = _trace
+
+        return httpx.AsyncClient(
+            http2=self._http2,
+            timeout=httpx.Timeout(limits.timeout),
+            limits=httpx.Limits(
+                max_connections=limits.max_connections,
+                max_keepalive_connections=limits.max_keepalive,
+                keepalive_expiry=self._keepalive_expiry,
+            ),
+            transport=self._transport,
+            event_hooks={"request": [_on_request]},
+        )
+
+    async def aclose(self) -> None:
+        self._closed = True
+        clients, self._clients = self._clients, {}
+        for provider, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception:
+                logger.exception("Failed to close http client: %s", provider)
+
+    def summary(self) -> str:
+        active = sorted((name, s) for name, s in self.stats.items() if s.requests)
+        if not active:
+            return "istek yok"
+        return ", ".join(
+            f"{name}: req={s.requests} new_conn={s.new_connections} reused={s.reused}" for name, s in active
+        )
@@ -1,27 +1,116 @@
 from __future__ import annotations
 
 import logging
+import multiprocessing
+import signal
+import time
 
 import discord
 
 from src.bot.client import DiscordAIBot
-from src.config import load_settings
+from src.config import Settings, load_settings
 
 
-def main() -> None:
-    settings = load_settings()
+logger = logging.getLogger(__name__)
+
+# Discord gateway'i küçük botlarda 5 sn'de bir IDENTIFY kabul eder; process'ler sırayla bağlansın.
+IDENTIFY_STAGGER_SECONDS = 5.0
+RESTART_BACKOFF_SECONDS = 10.0
+
 
+def _configure_logging(settings: Settings, prefix: str = "") -> None:
     logging.basicConfig(
         level=getattr(logging, settings.log_level.upper(), logging.INFO),
-        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        format=f"%(asctime)s %(levelname)s {prefix}%(name)s: %(message)s",
     )
 
+
+def _intents() -> discord.Intents:
     intents = discord.Intents.default()
     intents.message_content = True
     intents.members = False
     intents.voice_states = True
+    return intents
+
+
+def shard_groups(shard_count: int, processes: int) -> list[list[int]]:
+    """Shard'ları process'lere round-robin dağıtır: 8 shard / 3 process -> [0,3,6] [1,4,7] [2,5]."""
+    return [list(range(i, shard_count, processes)) for i in range(min(processes, shard_count))]
+
+
+def _run_shard_group(shard_ids: list[int], shard_count: int, process_index: int, delay: float) -> None:
+    settings = load_settings()
+    _configure_logging(settings, prefix=f"[p{process_index}] ")
+    # terminate() -> SIGTERM; KeyboardInterrupt gibi ele alınsın ki close() DB kuyruğunu flush etsin.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    if delay:
+        time.sleep(delay)
+    logger.info("Starting shards %s of %s", shard_ids, shard_count)
+    bot = DiscordAIBot(
+        intents=_intents(),
+        settings=settings,
+        shard_ids=shard_ids,
+        shard_count=shard_count,
+        process_index=process_index,
+    )
+    bot.run(settings.discord_token, log_handler=None)
+
 
-    bot = DiscordAIBot(intents=intents, settings=settings)
+def _supervise(settings: Settings) -> None:
+    shard_count = settings.shard_count or settings.shard_processes
+    groups = shard_groups(shard_count, settings.shard_processes)
+    ctx = multiprocessing.get_context("spawn")
+    procs: dict[int, multiprocessing.process.BaseProcess] = {}
+    stopping = False
+
+    def _start(index: int, delay: float) -> None:
+        proc = ctx.Process(
+            target=_run_shard_group,
+            args=(groups[index], shard_count, index, delay),
+            name=f"shard-group-{index}",
+        )
+        proc.start()
+        procs[index] = proc
+
+    def _stop(*_: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    for index in range(len(groups)):
+        _start(index, index * IDENTIFY_STAGGER_SECONDS)
+    logger.info("Launched %s processes for %s shards", len(groups), shard_count)
+
+    while not stopping:
+        time.sleep(1.0)
+        for index, proc in list(procs.items()):
+            if proc.is_alive() or stopping:
+                continue
+            logger.error("Shard group %s exited with code %s; restarting", index, proc.exitcode)
+            _start(index, RESTART_BACKOFF_SECONDS)
+
+    for proc in procs.values():
+        if proc.is_alive():
+            proc.terminate()
+    for proc in procs.values():
+        proc.join(timeout=30)
+
+
+def main() -> None:
+    settings = load_settings()
+    _configure_logging(settings)
+
+    if settings.shard_processes > 1:
+        _supervise(settings)
+        return
+
+    bot = DiscordAIBot(
+        intents=_intents(),
+        settings=settings,
+        shard_count=settings.shard_count or None,
+    )
     bot.run(settings.discord_token, log_handler=None)
 
 
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+import time
+from typing import Any
+
+import numpy as np
+
+from src.memory.database import Database
+from src.memory.embeddings import EMBEDDING_MODEL, HashingEmbedder, MemoryIndex
+
+
+logger = logging.getLogger(__name__)
+
+# Yeni hafızası olmayan kullanıcılar da günde bir güven azaltımından geçer.
+DECAY_REFRESH_SECONDS = 86_400.0
+
+
+@dataclass(frozen=True)
+class ConsolidationPlan:
+    # (yeni confidence, id); executemany parametre sırası.
+    confidences: list[tuple[float, int]]
+    delete_ids: list[int]
+    merged: int
+    capped: int
+
+
+@dataclass
+class ConsolidationStats:
+    runs: int = 0
+    users: int = 0
+    merged: int = 0
+    capped: int = 0
+    decayed: int = 0
+    failures: int = 0
+
+
+def _created_ts(value: Any) -> float:
+    # created_at SQLite CURRENT_TIMESTAMP (UTC, "YYYY-MM-DD HH:MM:SS").
+    try:
+        return datetime.fromisoformat(str(value)).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def plan_consolidation(
+    rows: list[dict[str, Any]],
+    vectors: np.ndarray,
+    *,
+    now: float,
+    last_run: float | None,
+    half_life_days: float,
+    similarity: float,
+    max_per_user: int,
+) -> ConsolidationPlan:
+    """
+    Tek kullanıcının hafızaları için (eskiden yeniye `rows`, satır başına L2
+    normalize vektör) yapılacak güncellemeleri hesaplar:
+
+    1. Güven azaltımı: son çalıştırmadan (ya da oluşturulmadan) bu yana geçen
+       süre kadar yarılanma. Her çalıştırma yalnız aradaki süreyi uyguladığı
+       için çalıştırma sıklığından bağımsızdır.
+    2. Aynı türde kosinüs benzerliği >= similarity olan hafızalar tek
+       kayıtta birleşir; güveni en yüksek (eşitse en yeni) olan kalır.
+    3. Kalanlar max_per_user'ı aşarsa en düşük güvenliler silinir.
+    """
+    n = len(rows)
+    if n == 0:
+        return ConsolidationPlan(confidences=[], delete_ids=[], merged=0, capped=0)
+    ids = np.fromiter((int(r["id"]) for r in rows), dtype=np.int64, count=n)
+    confidence = np.fromiter((float(r["confidence"]) for r in rows), dtype=np.float64, count=n)
+    decayed = confidence.copy()
+    if half_life_days > 0:
+        created = np.fromiter((_created_ts(r["created_at"]) for r in rows), dtype=np.float64, count=n)
+        since = np.maximum(created, last_run) if last_run is not None else created
+        elapsed_days = np.clip(now - since, 0.0, None) / 86_400.0
+        decayed *= np.power(0.5, elapsed_days / half_life_days)
+
+    alive = np.ones(n, dtype=bool)
+    # Güvene göre azalan, eşitlikte yeni id önce.
+    order = np.lexsort((-ids, -decayed))
+    merged = 0
+    if similarity > 0 and n > 1:
+        types = np.array([str(r["memory_type"]) for r in rows])
+        for i in order:
+            if not alive[i]:
+                continue
+            # Satır satır: n x n matris yerine O(n) bellek.
+            dup = alive & (types == types[i]) & (vectors @ vectors[i] >= similarity)
+            dup[i] = False
+            if dup.any():
+                alive &= ~dup
+                merged += int(dup.sum())
+
+    capped = 0
+    if max_per_user > 0:
+        survivors = [i for i in order if alive[i]]
+        for i in survivors[max_per_user:]:
+            alive[i] = False
+            capped += 1
+
+    delete_ids = [int(ids[i]) for i in range(n) if not alive[i]]
+    # Yuvarlanmaz: sık çalıştırmada küçük adımlar kaybolursa azaltım çalıştırma sıklığına bağlı kalırdı.
+    confidences = [(float(decayed[i]), int(ids[i])) for i in range(n) if alive[i] and decayed[i] != confidence[i]]
+    return ConsolidationPlan(confidences=confidences, delete_ids=delete_ids, merged=merged, capped=capped)
+
+
+class MemoryConsolidator:
+    """
+    MemoryExtractor'ın tekrar tekrar çıkardığı, farklı yazılmış aynı
+    bilgileri birleştiren, güveni yaşa göre azaltan ve kullanıcı başına
+    hafıza sayısını sınırlayan arka plan işi. Kullanıcılar küçük gruplar
+    halinde işlenir; benzerlik hesabı thread'de, her kullanıcının yazması
+    kendi kısa transaction'ında yapılır, cevaplar beklemez.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        index: MemoryIndex | None = None,
+        similarity: float = 0.0,
+        half_life_days: float = 180.0,
+        max_per_user: int = 0,
+        batch_users: int = 50,
+        interval_seconds: float = 600.0,
+        pause_seconds: float = 0.05,
+    ) -> None:
+        self._db = db
+        self._index = index
+        self._embedder = index.embedder if index else HashingEmbedder()
+        self._similarity = similarity
+        self._half_life_days = half_life_days
+        self._max_per_user = max(0, max_per_user)
+        self._batch_users = max(1, batch_users)
+        self._interval = interval_seconds
+        self._pause = pause_seconds
+        self._task: asyncio.Task[None] | None = None
+        self.stats = ConsolidationStats()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.stats.failures += 1
+                logger.exception("Memory consolidation run failed")
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self) -> int:
+        """Bekleyen kullanıcılar bitene kadar grup grup işler; işlenen kullanıcı sayısını döner."""
+        self.stats.runs += 1
+        started = time.time()
+        done = 0
+        while True:
+            # Bu çalıştırmada işlenenler `started`tan sonra damgalanır, tekrar gelmez.
+            pending = await self._db.users_pending_consolidation(
+                stale_before=started - DECAY_REFRESH_SECONDS,
+                limit=self._batch_users,
+            )
+            pending = [(u, last) for u, last in pending if last is None or last < started]
+            if not pending:
+                break
+            for discord_id, last_run in pending:
+                try:
+                    await self.consolidate_user(discord_id, last_run=last_run)
+                except Exception:
+                    self.stats.failures += 1
+                    logger.exception("Memory consolidation failed for %s", discord_id)
+                    # Aynı kullanıcı bu çalıştırmada tekrar seçilmesin.
+                    await self._db.apply_memory_consolidation(
+                        discord_id=discord_id, confidences=[], delete_ids=[], max_memory_id=0, consolidated_at=time.time()
+                    )
+                done += 1
+                await asyncio.sleep(self._pause)
+        return done
+
+    async def consolidate_user(self, discord_id: str, *, last_run: float | None) -> ConsolidationPlan:
+        rows = await self._db.list_memories_with_embeddings(discord_id=discord_id, model=EMBEDDING_MODEL)
+        now = time.time()
+        plan = await asyncio.to_thread(self._plan, rows, now, last_run)
+        await self._db.apply_memory_consolidation(
+            discord_id=discord_id,
+            confidences=plan.confidences,
+            delete_ids=plan.delete_ids,
+            max_memory_id=max((int(r["id"]) for r in rows), default=0),
+            consolidated_at=now,
+        )
+        if self._index and (plan.confidences or plan.delete_ids):
+            self._index.invalidate(discord_id)
+        st = self.stats
+        st.users += 1
+        st.merged += plan.merged
+        st.capped += plan.capped
+        st.decayed += len(plan.confidences)
+        if plan.delete_ids:
+            logger.info(
+                "Consolidated memories for %s: merged=%s capped=%s",
+                discord_id,
+                plan.merged,
+                plan.capped,
+            )
+        return plan
+
+    def _plan(self, rows: list[dict[str, Any]], now: float, last_run: float | None) -> ConsolidationPlan:
+        dim = self._embedder.dim
+        vectors = np.zeros((len(rows), dim), dtype=np.float32)
+        missing: list[int] = []
+        for i, r in enumerate(rows):
+            blob = r.get("vector")
+            if blob and len(blob) == dim * 4:
+                vectors[i] = np.frombuffer(blob, dtype=np.float32)
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = self._embedder.embed_many([rows[i]["content"] for i in missing])
+        return plan_consolidation(
+            rows,
+            vectors,
+            now=now,
+            last_run=last_run,
+            half_life_days=self._half_life_days,
+            similarity=self._similarity,
+            max_per_user=self._max_per_user,
+        )
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"runs={st.runs} users={st.users} merged={st.merged} capped={st.capped} "
+            f"decayed={st.decayed} failures={st.failures}"
+        )
@@ -1,11 +1,35 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import logging
 from pathlib import Path
+import re
+import time
+import zlib
 from typing import Any
 
 import aiosqlite
 
+from src.memory.history import HistoryRow, RecentHistoryCache
+
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_MS = 5000
+# sqlite3'ün bağlantı başına prepared statement cache'i (SQL metnine göre).
+CACHED_STATEMENTS = 256
+
+# Durability modes:
+#   strict  -> her yazma kendi commit'ini yapar (eski davranış), synchronous=FULL
+#   group   -> yazmalar kuyrukta birleşir, çağıran kendi grubunun commit'ini bekler;
+#              kuyruk boştaysa hemen yazılır (zamanlayıcı beklenmez)
+#   relaxed -> write-behind; konuşma/hafıza yazmaları beklemeden döner,
+#              çökmede son flush penceresi kaybolabilir, synchronous=NORMAL
+DURABILITY_MODES = ("strict", "group", "relaxed")
+
 
 SCHEMA_SQL = """
 PRAGMA journal_mode=WAL;
@@ -35,6 +59,15 @@ CREATE TABLE IF NOT EXISTS conversations (
   FOREIGN KEY (discord_id) REFERENCES users(discord_id)
 );
 
+-- get_recent_conversation / özet (user) ve özet (channel) sorguları; id sırası
+-- index'ten okunur, tablo taranmaz. Arşivleme en eski id'lerden ilerlediği
+-- için timestamp index'i gerekmez.
+CREATE INDEX IF NOT EXISTS idx_conversations_user
+  ON conversations(discord_id, id);
+
+CREATE INDEX IF NOT EXISTS idx_conversations_channel
+  ON conversations(channel_id, id);
+
 CREATE TABLE IF NOT EXISTS memories (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   discord_id TEXT NOT NULL,
@@ -50,6 +83,143 @@ CREATE TABLE IF NOT EXISTS memories (
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_memories_unique
   ON memories(discord_id, memory_type, content);
+
+-- list_memories / list_memories_with_embeddings: kullanıcı + id sırası
+CREATE INDEX IF NOT EXISTS idx_memories_user
+  ON memories(discord_id, id);
+
+CREATE TABLE IF NOT EXISTS memory_embeddings (
+  memory_id INTEGER PRIMARY KEY,
+  discord_id TEXT NOT NULL,
+  model TEXT NOT NULL,
+  vector BLOB NOT NULL,
+  FOREIGN KEY (memory_id) REFERENCES memories(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_memory_embeddings_user
+  ON memory_embeddings(discord_id);
+
+-- MemoryConsolidator'ın kullanıcı başına kaldığı yer: o anki en büyük
+-- hafıza id'si ve çalıştığı zaman (epoch sn; güven azaltımı buradan sürer).
+CREATE TABLE IF NOT EXISTS memory_consolidation (
+  discord_id TEXT PRIMARY KEY,
+  max_memory_id INTEGER NOT NULL,
+  consolidated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+  scope TEXT NOT NULL,
+  scope_id TEXT NOT NULL,
+  summary TEXT NOT NULL,
+  covered_until_id INTEGER NOT NULL,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (scope, scope_id)
+);
+
+CREATE TABLE IF NOT EXISTS schema_meta (
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+"""
+
+# External-content FTS5 index'leri; trigger'lar yeni satırları senkron tutar,
+# mevcut satırlar backfill_fts() ile parça parça eklenir.
+FTS_TABLES = ("conversations", "memories")
+
+# Ayrı ifadeler: executescript önce COMMIT eder, transaction içinde çalışmaz.
+FTS_SCHEMA_STATEMENTS = (
+    """
+CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+  content,
+  content='{table}',
+  content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+)""",
+    """
+CREATE TRIGGER IF NOT EXISTS {table}_fts_ai AFTER INSERT ON {table} BEGIN
+  INSERT INTO {table}_fts(rowid, content) VALUES (new.id, new.content);
+END""",
+    """
+CREATE TRIGGER IF NOT EXISTS {table}_fts_ad AFTER DELETE ON {table} BEGIN
+  INSERT INTO {table}_fts({table}_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END""",
+    """
+CREATE TRIGGER IF NOT EXISTS {table}_fts_au AFTER UPDATE OF content ON {table} BEGIN
+  INSERT INTO {table}_fts({table}_fts, rowid, content) VALUES ('delete', old.id, old.content);
+  INSERT INTO {table}_fts(rowid, content) VALUES (new.id, new.content);
+END""",
+)
+
+
+TOUCH_USER_SQL = """
+INSERT INTO users(discord_id, username, display_name, first_seen, last_seen, message_count)
+VALUES(?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)
+ON CONFLICT(discord_id) DO UPDATE SET
+  username=excluded.username,
+  display_name=excluded.display_name,
+  last_seen=CURRENT_TIMESTAMP,
+  message_count=users.message_count + 1
+RETURNING message_count
+"""
+
+# Profil cache'inin biriktirdiği sayaç farkları; mutlak değer değil delta
+# yazılır ki aynı kullanıcıyı gören diğer shard process'lerinin artışları kaybolmasın.
+SAVE_USER_COUNTERS_SQL = """
+INSERT INTO users(discord_id, username, display_name, first_seen, last_seen, message_count)
+VALUES(?, ?, ?, ?, ?, ?)
+ON CONFLICT(discord_id) DO UPDATE SET
+  username=excluded.username,
+  display_name=excluded.display_name,
+  last_seen=MAX(COALESCE(users.last_seen, ''), excluded.last_seen),
+  message_count=users.message_count + excluded.message_count
+"""
+
+INSERT_CONVERSATION_SQL = """
+INSERT INTO conversations(discord_id, channel_id, message_id, role, content)
+VALUES(?, ?, ?, ?, ?)
+"""
+
+INSERT_MEMORY_SQL = """
+INSERT OR IGNORE INTO memories(discord_id, memory_type, content, confidence, source_message_id)
+VALUES(?, ?, ?, ?, ?)
+"""
+
+# Hafızanın id'sini bilmeden, aynı batch'te az önce eklenen satıra bağlanır.
+INSERT_MEMORY_EMBEDDING_SQL = """
+INSERT OR REPLACE INTO memory_embeddings(memory_id, discord_id, model, vector)
+SELECT id, discord_id, ?, ?
+FROM memories
+WHERE discord_id = ? AND memory_type = ? AND content = ?
+"""
+
+UPSERT_SUMMARY_SQL = """
+INSERT INTO conversation_summaries(scope, scope_id, summary, covered_until_id, updated_at)
+VALUES(?, ?, ?, ?, CURRENT_TIMESTAMP)
+ON CONFLICT(scope, scope_id) DO UPDATE SET
+  summary=excluded.summary,
+  covered_until_id=excluded.covered_until_id,
+  updated_at=CURRENT_TIMESTAMP
+"""
+
+# Özet kapsamı -> conversations filtresi
+SUMMARY_SCOPES = {"user": "discord_id", "channel": "channel_id"}
+
+# Ayrı dosyada (ATTACH ... AS archive) sıkıştırılmış eski konuşmalar.
+ARCHIVE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS archive.conversations (
+  id INTEGER PRIMARY KEY,
+  discord_id TEXT NOT NULL,
+  channel_id TEXT,
+  message_id TEXT,
+  role TEXT NOT NULL,
+  timestamp DATETIME NOT NULL,
+  content_z BLOB NOT NULL
+);
+"""
+
+UPSERT_EMBEDDING_SQL = """
+INSERT OR REPLACE INTO memory_embeddings(memory_id, discord_id, model, vector)
+VALUES(?, ?, ?, ?)
 """
 
 
@@ -59,19 +229,425 @@ class ConversationRow:
     content: str
 
 
+@dataclass(frozen=True)
+class ConversationTurn:
+    id: int
+    discord_id: str
+    role: str
+    content: str
+
+
+@dataclass(frozen=True)
+class ConversationSummary:
+    summary: str
+    covered_until_id: int
+
+
+@dataclass(frozen=True)
+class TextSearchHit:
+    row_id: int
+    discord_id: str
+    # conversations için role, memories için memory_type
+    label: str
+    content: str
+    snippet: str
+    score: float
+
+
+def build_match_query(text: str, *, max_terms: int = 12) -> str:
+    """
+    Kullanıcı metnini güvenli bir FTS5 MATCH ifadesine çevirir: her kelime
+    tırnaklı önek sorgusu olur (Türkçe ekler için "maç" -> "maçı"), OR ile bağlanır.
+    """
+    terms: list[str] = []
+    for word in re.findall(r"\w+", text or ""):
+        if len(word) < 2 or word.isdigit():
+            continue
+        term = '"' + word.replace('"', '""') + '"*'
+        if term not in terms:
+            terms.append(term)
+        if len(terms) >= max_terms:
+            break
+    return " OR ".join(terms)
+
+
+@dataclass
+class WriteStats:
+    flushes: int = 0
+    rows: int = 0
+    failed_flushes: int = 0
+    last_batch: int = 0
+    max_batch: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+
+    @property
+    def avg_batch(self) -> float:
+        return self.rows / self.flushes if self.flushes else 0.0
+
+    @property
+    def avg_flush_ms(self) -> float:
+        return self.total_flush_ms / self.flushes if self.flushes else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"flushes={self.flushes} rows={self.rows} failed={self.failed_flushes} "
+            f"batch(avg={self.avg_batch:.1f}, max={self.max_batch}) "
+            f"flush_ms(avg={self.avg_flush_ms:.1f}, max={self.max_flush_ms:.1f})"
+        )
+
+
+@dataclass(frozen=True)
+class StorageStats:
+    page_size: int
+    page_count: int
+    freelist_count: int
+    auto_vacuum: str
+
+    @property
+    def size_bytes(self) -> int:
+        return self.page_size * self.page_count
+
+    def summary(self) -> str:
+        return (
+            f"size={self.size_bytes / 1_048_576:.1f}MB free_pages={self.freelist_count} "
+            f"auto_vacuum={self.auto_vacuum}"
+        )
+
+
+def compress_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8"), 6)
+
+
+def decompress_text(blob: bytes) -> str:
+    return zlib.decompress(blob).decode("utf-8")
+
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+@dataclass
+class _PendingWrite:
+    table: str
+    sql: str
+    params: tuple[Any, ...]
+    returns_row: bool = False
+    future: asyncio.Future[Any] | None = field(default=None, repr=False)
+    # Okumaların yalnız kendi satırlarını etkileyen yazmaları flush etmesi için (discord_id vb.).
+    key: str | None = None
+    # Geçmiş buffer'ındaki karşılığı; insert commit'lenince DB id'si yazılır.
+    history_row: HistoryRow | None = field(default=None, repr=False)
+
+
 class Database:
-    def __init__(self, *, path: Path):
+    def __init__(
+        self,
+        *,
+        path: Path,
+        durability: str = "group",
+        flush_interval_ms: int = 50,
+        batch_max: int = 64,
+        read_connections: int = 2,
+        cache_mb: int = 16,
+        mmap_mb: int = 256,
+        history_turns: int = 20,
+        history_cache_mb: int = 32,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
         self._path = path
         self._conn: aiosqlite.Connection | None = None
+        self.durability = durability
+        self._flush_interval = max(0, flush_interval_ms) / 1000.0
+        self._batch_max = max(1, batch_max)
+        self._read_connections = max(0, read_connections)
+        self._cache_mb = max(1, cache_mb)
+        self._mmap_mb = max(0, mmap_mb)
+        self._readers: list[aiosqlite.Connection] = []
+        self._reader_pool: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._pending: list[_PendingWrite] = []
+        self._has_pending = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._writer_task: asyncio.Task[None] | None = None
+        self._closing = False
+        self._archive_attached = False
+        self.write_stats = WriteStats()
+        # Son konuşma turları bellekte; tek yazar process varsayar (history_cache_mb=0 kapatır).
+        self.history: RecentHistoryCache | None = (
+            RecentHistoryCache(turns=history_turns, max_bytes=history_cache_mb * 1_048_576)
+            if history_cache_mb > 0 and history_turns > 0
+            else None
+        )
+
+    async def _open(self, target: str, *, uri: bool = False) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(target, uri=uri, cached_statements=CACHED_STATEMENTS)
+        conn.row_factory = aiosqlite.Row
+        # Sharded modda birden fazla process aynı dosyaya yazar; kilitte hata yerine beklesin.
+        await conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        # mmap sayfaları process'ler ve bağlantılar arasında OS page cache'ten paylaşılır.
+        await conn.execute(f"PRAGMA cache_size={-self._cache_mb * 1024}")
+        await conn.execute(f"PRAGMA mmap_size={self._mmap_mb * 1_048_576}")
+        await conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
 
     async def connect(self) -> None:
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = await aiosqlite.connect(str(self._path))
-        self._conn.row_factory = aiosqlite.Row
+        self._conn = await self._open(str(self._path))
+        # Yeni dosyada tablolar oluşmadan önce ayarlanmalı; eski dosyada
+        # enable_incremental_vacuum() tek seferlik VACUUM ile geçirir.
+        await self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
         await self._conn.executescript(SCHEMA_SQL)
+        await self._create_fts()
+        synchronous = "NORMAL" if self.durability == "relaxed" else "FULL"
+        await self._conn.execute(f"PRAGMA synchronous={synchronous}")
         await self._conn.commit()
+        if self.durability != "strict":
+            self._writer_task = asyncio.create_task(self._writer_loop())
+        await self._open_readers()
+
+    async def _open_readers(self) -> None:
+        """
+        WAL'da okuyucular yazarı beklemez: sorgular ayrı read-only
+        bağlantılarda (her biri kendi thread'inde) çalışır, yazar bağlantısı
+        yalnız group commit'lerle meşgul olur. read_connections=0 iken okumalar
+        da yazar bağlantısından yapılır.
+        """
+        if not self._read_connections:
+            return
+        target = f"{self._path.resolve().as_uri()}?mode=ro"
+        pool: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        for _ in range(self._read_connections):
+            reader = await self._open(target, uri=True)
+            self._readers.append(reader)
+            pool.put_nowait(reader)
+        self._reader_pool = pool
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        # Okumadan önce _flush_table çağrılır; commit edilen veri okuyucudan görünür.
+        if self._reader_pool is None:
+            yield self._require_conn()
+            return
+        conn = await self._reader_pool.get()
+        try:
+            yield conn
+        finally:
+            self._reader_pool.put_nowait(conn)
+
+    async def _create_fts(self) -> None:
+        """
+        Sharded modda process'ler aynı anda açılır: varlık kontrolü, tablo ve
+        trigger'lar ile backfill sınırı tek BEGIN IMMEDIATE transaction'ında
+        yazılır. Böylece yalnız bir process backfill aralığını belirler ve
+        upto'dan sonraki satırlar trigger'la (bir kez) index'lenir.
+        """
+        conn = self._require_conn()
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in FTS_TABLES:
+                async with conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (f"{table}_fts",),
+                ) as cursor:
+                    existed = await cursor.fetchone() is not None
+                for statement in FTS_SCHEMA_STATEMENTS:
+                    await conn.execute(statement.format(table=table))
+                if existed:
+                    continue
+                # Trigger'lardan önceki satırlar: [0, upto] aralığı backfill edilecek.
+                async with conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}") as cursor:
+                    row = await cursor.fetchone()
+                upto = int(row[0]) if row else 0
+                await conn.executemany(
+                    "INSERT OR REPLACE INTO schema_meta(key, value) VALUES(?, ?)",
+                    [(f"{table}_fts_backfill_upto", str(upto)), (f"{table}_fts_backfill_cursor", "0")],
+                )
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+
+    async def _get_meta(self, key: str) -> str | None:
+        conn = self._require_conn()
+        async with conn.execute("SELECT value FROM schema_meta WHERE key = ?", (key,)) as cursor:
+            row = await cursor.fetchone()
+        return str(row[0]) if row else None
+
+    async def backfill_fts(self, *, chunk_size: int = 500, pause_seconds: float = 0.05) -> int:
+        """
+        FTS index'i eklenmeden önce var olan satırları küçük parçalar halinde
+        index'ler. Her parça kendi commit'i ile ve flush kilidi altında çalışır,
+        arada event loop'a nefes aldırır; bot bu sırada normal çalışır.
+        Kaldığı yeri schema_meta'da tutar, restart'ta devam eder; birden fazla
+        process aynı anda çalıştırsa da her satır bir kez index'lenir.
+        """
+        conn = self._require_conn()
+        total = 0
+        for table in FTS_TABLES:
+            while True:
+                async with self._flush_lock:
+                    # Cursor transaction içinde okunur: başka bir process aynı
+                    # parçayı index'lemişse kaldığı yerden devam edilir.
+                    await conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        upto_raw = await self._get_meta(f"{table}_fts_backfill_upto")
+                        cursor_raw = await self._get_meta(f"{table}_fts_backfill_cursor")
+                        if upto_raw is None or cursor_raw is None:
+                            await conn.rollback()
+                            break
+                        upto, position = int(upto_raw), int(cursor_raw)
+                        if position >= upto:
+                            await conn.execute(
+                                "DELETE FROM schema_meta WHERE key IN (?, ?)",
+                                (f"{table}_fts_backfill_upto", f"{table}_fts_backfill_cursor"),
+                            )
+                            await conn.commit()
+                            break
+                        async with conn.execute(
+                            f"SELECT MAX(id), COUNT(*) FROM (SELECT id FROM {table} WHERE id > ? AND id <= ? ORDER BY id LIMIT ?)",
+                            (position, upto, chunk_size),
+                        ) as cursor:
+                            row = await cursor.fetchone()
+                        last_id = int(row[0]) if row and row[0] is not None else upto
+                        await conn.execute(
+                            f"INSERT INTO {table}_fts(rowid, content) SELECT id, content FROM {table} WHERE id > ? AND id <= ?",
+                            (position, last_id),
+                        )
+                        await conn.execute(
+                            "UPDATE schema_meta SET value = ? WHERE key = ?",
+                            (str(last_id), f"{table}_fts_backfill_cursor"),
+                        )
+                        await conn.commit()
+                    except BaseException:
+                        await conn.rollback()
+                        raise
+                total += int(row[1]) if row else 0
+                await asyncio.sleep(pause_seconds)
+        if total:
+            logger.info("FTS backfill indexed %s rows", total)
+        return total
+
+    async def attach_archive(self, path: Path) -> None:
+        """Arşiv dosyasını `archive` şeması olarak bağlar (yoksa oluşturur)."""
+        conn = self._require_conn()
+        if self._archive_attached:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        async with self._flush_lock:
+            await conn.execute("ATTACH DATABASE ? AS archive", (str(path),))
+            await conn.execute("PRAGMA archive.journal_mode=WAL")
+            await conn.executescript(ARCHIVE_SCHEMA_SQL)
+            await conn.create_function("zcompress", 1, compress_text, deterministic=True)
+            await conn.commit()
+        self._archive_attached = True
+
+    async def archive_conversations(self, *, older_than_days: float, limit: int = 500) -> int:
+        """
+        older_than_days'ten eski en fazla `limit` konuşma satırını sıkıştırıp
+        arşive taşır ve ana tablodan siler. Satırlar id sırasıyla zaman
+        sırasında olduğundan yalnız tablonun başındaki `limit` satıra bakılır.
+        WAL'da iki dosya arası commit atomik değildir: arada çökme olursa
+        satır iki tarafta da kalır, sonraki batch INSERT OR IGNORE ile tamamlar.
+        """
+        if not self._archive_attached:
+            raise RuntimeError("Archive not attached")
+        conn = self._require_conn()
+        async with self._flush_lock:
+            async with conn.execute(
+                """
+                SELECT MAX(id), COUNT(*) FROM (
+                  SELECT id, timestamp FROM conversations ORDER BY id LIMIT ?
+                ) WHERE timestamp < datetime('now', ?)
+                """,
+                (limit, f"-{float(older_than_days)} days"),
+            ) as cursor:
+                row = await cursor.fetchone()
+            if not row or row[0] is None:
+                return 0
+            last_id, count = int(row[0]), int(row[1])
+            async with conn.execute(
+                "SELECT DISTINCT discord_id FROM conversations WHERE id <= ?", (last_id,)
+            ) as cursor:
+                moved_users = [r[0] for r in await cursor.fetchall()]
+            try:
+                await conn.execute(
+                    """
+                    INSERT OR IGNORE INTO archive.conversations(id, discord_id, channel_id, message_id, role, timestamp, content_z)
+                    SELECT id, discord_id, channel_id, message_id, role, timestamp, zcompress(content)
+                    FROM conversations WHERE id <= ?
+                    """,
+                    (last_id,),
+                )
+                await conn.execute("DELETE FROM conversations WHERE id <= ?", (last_id,))
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+        if self.history is not None:
+            # Taşınan satırlar buffer'da kalmış olabilir; yalnız o kullanıcılar baştan yüklenir.
+            for discord_id in moved_users:
+                self.history.invalidate(discord_id)
+        return count
+
+    async def enable_incremental_vacuum(self, *, max_bytes: int) -> bool:
+        """
+        auto_vacuum=INCREMENTAL olmadan oluşmuş dosyayı tek seferlik VACUUM
+        ile geçirir. VACUUM süresince DB kilitli kalır; dosya max_bytes'tan
+        büyükse yapılmaz (elle yapılmalı).
+        """
+        stats = await self.storage_stats()
+        if stats.auto_vacuum == "incremental":
+            return True
+        if stats.size_bytes > max_bytes:
+            logger.warning(
+                "bot.db is %.0f MB without incremental auto_vacuum; run VACUUM manually while the bot is stopped",
+                stats.size_bytes / 1_048_576,
+            )
+            return False
+        conn = self._require_conn()
+        async with self._flush_lock:
+            await conn.commit()
+            await conn.execute("VACUUM main")
+        logger.info("bot.db converted to incremental auto_vacuum")
+        return True
+
+    async def incremental_vacuum(self, *, pages: int) -> None:
+        """Boş sayfalardan en fazla `pages` kadarını dosyadan geri verir."""
+        conn = self._require_conn()
+        async with self._flush_lock:
+            # execute() pragma'yı tek adım çalıştırır (tek sayfa); executescript sonuna kadar.
+            await conn.executescript(f"PRAGMA main.incremental_vacuum({int(pages)});")
+
+    async def storage_stats(self) -> StorageStats:
+        conn = self._require_conn()
+        values: dict[str, int] = {}
+        for pragma in ("page_size", "page_count", "freelist_count", "auto_vacuum"):
+            async with conn.execute(f"PRAGMA main.{pragma}") as cursor:
+                row = await cursor.fetchone()
+            values[pragma] = int(row[0]) if row else 0
+        return StorageStats(
+            page_size=values["page_size"],
+            page_count=values["page_count"],
+            freelist_count=values["freelist_count"],
+            auto_vacuum=AUTO_VACUUM_MODES.get(values["auto_vacuum"], "?"),
+        )
 
     async def close(self) -> None:
+        if self._writer_task:
+            # İptal edilmez: flush ortasında iptal, kuyruktan alınmış batch'i ve
+            # future'larını kaybettirirdi. Döngü elindeki flush'ı bitirip çıkar.
+            self._closing = True
+            self._has_pending.set()
+            self._flush_now.set()
+            await self._writer_task
+            self._writer_task = None
+        if self._conn:
+            await self.flush()
+        readers, self._readers, self._reader_pool = self._readers, [], None
+        for reader in readers:
+            await reader.close()
         if self._conn:
             await self._conn.close()
             self._conn = None
@@ -81,27 +657,181 @@ class Database:
             raise RuntimeError("Database not connected")
         return self._conn
 
+    def _enqueue(self, op: _PendingWrite) -> None:
+        self._pending.append(op)
+        self._has_pending.set()
+        if len(self._pending) >= self._batch_max:
+            self._flush_now.set()
+
+    async def _submit(self, op: _PendingWrite, *, wait: bool) -> Any:
+        """
+        Yazmayı kuyruğa koyar. strict modda hemen flush eder; diğer modlarda
+        wait=True ise çağıran kendi grubunun commit'ini bekler.
+        """
+        self._require_conn()
+        if wait:
+            op.future = asyncio.get_running_loop().create_future()
+        self._enqueue(op)
+        if self.durability == "strict":
+            await self.flush()
+        if op.future is not None:
+            return await op.future
+        return None
+
+    async def _writer_loop(self) -> None:
+        while not self._closing:
+            await self._has_pending.wait()
+            if self._closing:
+                break
+            # group: commit'i bekleyen çağıranlar var; beklemeden yazılır. Gruplama
+            # kendiliğinden olur: bir commit (fsync) sürerken gelen yazmalar bir
+            # sonraki batch'te birleşir. relaxed'te bekleyen yok; pencere dolana
+            # kadar birikir, daha az commit yapılır.
+            linger = self._flush_interval if self.durability == "relaxed" else 0.0
+            if linger > 0:
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), timeout=linger)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def _execute_batch(self, conn: aiosqlite.Connection, batch: list[_PendingWrite]) -> list[Any]:
+        results: list[Any] = [None] * len(batch)
+        i = 0
+        while i < len(batch):
+            op = batch[i]
+            if op.returns_row:
+                async with conn.execute(op.sql, op.params) as cursor:
+                    results[i] = await cursor.fetchone()
+                i += 1
+                continue
+            # Ardışık aynı tip insert'leri tek executemany'de birleştir.
+            j = i
+            while j < len(batch) and batch[j].sql is op.sql and not batch[j].returns_row:
+                j += 1
+            group = batch[i:j]
+            await conn.executemany(op.sql, [b.params for b in group])
+            if any(b.history_row is not None for b in group):
+                # Tek transaction'da tek yazar: AUTOINCREMENT id'ler ardışık, sonuncusu last_insert_rowid.
+                async with conn.execute("SELECT last_insert_rowid()") as cursor:
+                    last = (await cursor.fetchone())[0]
+                for k, b in enumerate(group):
+                    if b.history_row is not None:
+                        b.history_row.id = last - len(group) + 1 + k
+            i = j
+        await conn.commit()
+        return results
+
+    async def flush(self) -> None:
+        """Bekleyen tüm yazmaları tek transaction + tek commit ile diske yazar."""
+        # Çağıran (ör. yerini yenisine bırakan cevap task'ı) iptal edilse de
+        # kuyruktan alınmış batch yazılır ve future'ları sonuçlanır.
+        await asyncio.shield(self._flush())
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._has_pending.clear()
+            self._flush_now.clear()
+            if not batch:
+                return
+
+            conn = self._require_conn()
+            started = time.perf_counter()
+            try:
+                outcomes: list[tuple[Any, BaseException | None]] = [
+                    (r, None) for r in await self._execute_batch(conn, batch)
+                ]
+            except Exception:
+                logger.exception("Database group commit failed (%s rows); retrying one by one", len(batch))
+                self.write_stats.failed_flushes += 1
+                await conn.rollback()
+                # Geri alınan insert'lerin id'leri geçersiz; tekrar denemede yeniden yazılır.
+                for op in batch:
+                    if op.history_row is not None:
+                        op.history_row.id = None
+                # Tek bozuk satır tüm grubu düşürmesin.
+                outcomes = []
+                for op in batch:
+                    try:
+                        outcomes.append(((await self._execute_batch(conn, [op]))[0], None))
+                    except Exception as exc:
+                        await conn.rollback()
+                        if op.future is None:
+                            logger.exception("Dropped write to %s", op.table)
+                        outcomes.append((None, exc))
+
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            stats = self.write_stats
+            stats.flushes += 1
+            stats.rows += len(batch)
+            stats.last_batch = len(batch)
+            stats.max_batch = max(stats.max_batch, len(batch))
+            stats.last_flush_ms = elapsed_ms
+            stats.max_flush_ms = max(stats.max_flush_ms, elapsed_ms)
+            stats.total_flush_ms += elapsed_ms
+
+            for op, (result, exc) in zip(batch, outcomes):
+                if op.future is None or op.future.done():
+                    continue
+                if exc is not None:
+                    op.future.set_exception(exc)
+                else:
+                    op.future.set_result(result)
+
+    async def _flush_table(self, table: str, key: str | None = None) -> None:
+        """
+        Okumadan önce aynı tabloya (key verilirse yalnız aynı anahtara) bekleyen
+        yazmalar varsa önce onları yazar. Başka kullanıcıların yazmaları okumayı
+        commit'e (fsync) bekletmez.
+        """
+        if any(op.table == table and (key is None or op.key is None or op.key == key) for op in self._pending):
+            await self.flush()
+
     async def touch_user(self, *, discord_id: str, username: str, display_name: str) -> int:
-        conn = self._require_conn()
-        await conn.execute(
+        row = await self._submit(
+            _PendingWrite(
+                table="users",
+                sql=TOUCH_USER_SQL,
+                params=(discord_id, username, display_name),
+                returns_row=True,
+                key=discord_id,
+            ),
+            wait=True,
+        )
+        return int(row["message_count"]) if row else 0
+
+    async def get_user(self, *, discord_id: str) -> dict[str, Any] | None:
+        self._require_conn()
+        await self._flush_table("users", discord_id)
+        async with self._reader() as conn, conn.execute(
             """
-            INSERT INTO users(discord_id, username, display_name, first_seen, last_seen, message_count)
-            VALUES(?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)
-            ON CONFLICT(discord_id) DO UPDATE SET
-              username=excluded.username,
-              display_name=excluded.display_name,
-              last_seen=CURRENT_TIMESTAMP,
-              message_count=users.message_count + 1
+            SELECT discord_id, username, display_name, message_count, relationship_score, last_seen
+            FROM users
+            WHERE discord_id = ?
             """,
-            (discord_id, username, display_name),
-        )
-        await conn.commit()
-        async with conn.execute(
-            "SELECT message_count FROM users WHERE discord_id = ?",
             (discord_id,),
         ) as cursor:
             row = await cursor.fetchone()
-        return int(row["message_count"]) if row else 0
+        return dict(row) if row else None
+
+    async def save_user_counters(self, rows: list[tuple[str, str, str, str, int]]) -> None:
+        """
+        (discord_id, username, display_name, last_seen, message_count_delta)
+        satırlarını write-behind kuyruğuna koyar; commit'i beklemez.
+        """
+        self._require_conn()
+        for discord_id, username, display_name, last_seen, delta in rows:
+            self._enqueue(
+                _PendingWrite(
+                    table="users",
+                    sql=SAVE_USER_COUNTERS_SQL,
+                    params=(discord_id, username, display_name, last_seen, last_seen, delta),
+                    key=discord_id,
+                )
+            )
+        if rows and self.durability == "strict":
+            await self.flush()
 
     async def add_conversation(
         self,
@@ -112,32 +842,153 @@ class Database:
         role: str,
         content: str,
     ) -> None:
-        conn = self._require_conn()
-        await conn.execute(
-            """
-            INSERT INTO conversations(discord_id, channel_id, message_id, role, content)
-            VALUES(?, ?, ?, ?, ?)
-            """,
-            (discord_id, channel_id, message_id, role, content),
+        # Buffer'a kuyruk sırasıyla eklenir; okuma commit'i beklemeden görür.
+        row = (
+            self.history.append(discord_id, message_id=message_id, role=role, content=content)
+            if self.history is not None
+            else None
         )
-        await conn.commit()
+        try:
+            await self._submit(
+                _PendingWrite(
+                    table="conversations",
+                    sql=INSERT_CONVERSATION_SQL,
+                    params=(discord_id, channel_id, message_id, role, content),
+                    key=discord_id,
+                    history_row=row,
+                ),
+                wait=self.durability != "relaxed",
+            )
+        except Exception:
+            # Yazılamayan satır buffer'da kalmasın.
+            if self.history is not None:
+                self.history.invalidate(discord_id)
+            raise
 
-    async def get_recent_conversation(self, *, discord_id: str, limit: int) -> list[ConversationRow]:
-        conn = self._require_conn()
-        async with conn.execute(
+    async def get_recent_conversation(
+        self,
+        *,
+        discord_id: str,
+        limit: int,
+        exclude_message_id: str | None = None,
+        after_id: int = 0,
+    ) -> list[ConversationRow]:
+        """Son `limit` tur, eskiden yeniye. after_id verilirse yalnız ondan sonraki satırlar."""
+        self._require_conn()
+        history = self.history
+        if history is not None:
+            cached = history.recent(discord_id, limit=limit, exclude_message_id=exclude_message_id, after_id=after_id)
+            if cached is not None:
+                return [ConversationRow(role=r.role, content=r.content) for r in cached]
+            return await self._load_history(
+                history, discord_id=discord_id, limit=limit, exclude_message_id=exclude_message_id, after_id=after_id
+            )
+
+        await self._flush_table("conversations", discord_id)
+        async with self._reader() as conn, conn.execute(
             """
             SELECT role, content
             FROM conversations
-            WHERE discord_id = ?
+            WHERE discord_id = ? AND id > ? AND (? IS NULL OR message_id IS NULL OR message_id != ?)
             ORDER BY id DESC
             LIMIT ?
             """,
-            (discord_id, limit),
+            (discord_id, after_id, exclude_message_id, exclude_message_id, limit),
         ) as cursor:
             rows = await cursor.fetchall()
         rows = list(reversed(rows))
         return [ConversationRow(role=r["role"], content=r["content"]) for r in rows]
 
+    async def _load_history(
+        self,
+        history: RecentHistoryCache,
+        *,
+        discord_id: str,
+        limit: int,
+        exclude_message_id: str | None,
+        after_id: int = 0,
+    ) -> list[ConversationRow]:
+        """Buffer'ı kullanıcının son `turns` satırıyla doldurur; limit daha büyükse o kadar okur."""
+        token = history.begin_load(discord_id)
+        try:
+            await self._flush_table("conversations", discord_id)
+            async with self._reader() as conn, conn.execute(
+                """
+                SELECT id, message_id, role, content
+                FROM conversations
+                WHERE discord_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (discord_id, max(history.turns, limit + (1 if exclude_message_id else 0))),
+            ) as cursor:
+                rows = await cursor.fetchall()
+        except BaseException:
+            history.abort_load(discord_id)
+            raise
+        loaded = [HistoryRow(r["message_id"], r["role"], r["content"], r["id"]) for r in reversed(rows)]
+        history.finish_load(discord_id, token, loaded[-history.turns :])
+        # after_id'den sonraki satırlar en yeniler; okunan son `limit + 1` satırın içindedir.
+        kept = [
+            r
+            for r in loaded
+            if (exclude_message_id is None or r.message_id is None or r.message_id != exclude_message_id)
+            and r.id > after_id
+        ]
+        return [ConversationRow(role=r.role, content=r.content) for r in kept[-limit:]] if limit > 0 else []
+
+    async def get_conversation_after(
+        self,
+        *,
+        scope: str,
+        scope_id: str,
+        after_id: int,
+        limit: int,
+    ) -> list[ConversationTurn]:
+        """Kapsamda (kullanıcı ya da kanal) after_id'den sonraki turlar, eskiden yeniye."""
+        column = SUMMARY_SCOPES[scope]
+        self._require_conn()
+        # Kanal kapsamında satırlar discord_id'ye göre anahtarlı değil; tümü flush edilir.
+        await self._flush_table("conversations", scope_id if scope == "user" else None)
+        async with self._reader() as conn, conn.execute(
+            f"""
+            SELECT id, discord_id, role, content
+            FROM conversations
+            WHERE {column} = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (scope_id, after_id, limit),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            ConversationTurn(id=int(r["id"]), discord_id=str(r["discord_id"]), role=r["role"], content=r["content"])
+            for r in rows
+        ]
+
+    async def get_summary(self, *, scope: str, scope_id: str) -> ConversationSummary | None:
+        self._require_conn()
+        await self._flush_table("conversation_summaries", f"{scope}:{scope_id}")
+        async with self._reader() as conn, conn.execute(
+            "SELECT summary, covered_until_id FROM conversation_summaries WHERE scope = ? AND scope_id = ?",
+            (scope, scope_id),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        return ConversationSummary(summary=row["summary"], covered_until_id=int(row["covered_until_id"]))
+
+    async def upsert_summary(self, *, scope: str, scope_id: str, summary: str, covered_until_id: int) -> None:
+        await self._submit(
+            _PendingWrite(
+                table="conversation_summaries",
+                sql=UPSERT_SUMMARY_SQL,
+                params=(scope, scope_id, summary, covered_until_id),
+                key=f"{scope}:{scope_id}",
+            ),
+            wait=self.durability != "relaxed",
+        )
+
     async def add_memory(
         self,
         *,
@@ -146,20 +997,124 @@ class Database:
         content: str,
         confidence: float,
         source_message_id: str | None,
+        embedding: tuple[str, bytes] | None = None,
     ) -> None:
-        conn = self._require_conn()
-        await conn.execute(
+        """embedding=(model, float32 vektör baytları) verilirse aynı group commit'te saklanır."""
+        wait = self.durability != "relaxed"
+        await self._submit(
+            _PendingWrite(
+                table="memories",
+                sql=INSERT_MEMORY_SQL,
+                params=(discord_id, memory_type, content, confidence, source_message_id),
+                key=discord_id,
+            ),
+            wait=wait and embedding is None,
+        )
+        if embedding is not None:
+            model, vector = embedding
+            await self._submit(
+                _PendingWrite(
+                    table="memory_embeddings",
+                    sql=INSERT_MEMORY_EMBEDDING_SQL,
+                    params=(model, vector, discord_id, memory_type, content),
+                    key=discord_id,
+                ),
+                wait=wait,
+            )
+
+    async def store_embeddings(self, *, discord_id: str, model: str, vectors: list[tuple[int, bytes]]) -> None:
+        for memory_id, vector in vectors:
+            self._enqueue(
+                _PendingWrite(
+                    table="memory_embeddings",
+                    sql=UPSERT_EMBEDDING_SQL,
+                    params=(memory_id, discord_id, model, vector),
+                    key=discord_id,
+                )
+            )
+        if self.durability == "strict":
+            await self.flush()
+
+    async def list_memories_with_embeddings(self, *, discord_id: str, model: str) -> list[dict[str, Any]]:
+        """Kullanıcının tüm hafızaları; vektörü olmayan/eski modelde olanlarda vector=None."""
+        self._require_conn()
+        await self._flush_table("memories", discord_id)
+        await self._flush_table("memory_embeddings", discord_id)
+        async with self._reader() as conn, conn.execute(
             """
-            INSERT OR IGNORE INTO memories(discord_id, memory_type, content, confidence, source_message_id)
-            VALUES(?, ?, ?, ?, ?)
+            SELECT m.id, m.memory_type, m.content, m.confidence, m.created_at,
+                   CASE WHEN e.model = ? THEN e.vector END AS vector
+            FROM memories m
+            LEFT JOIN memory_embeddings e ON e.memory_id = m.id
+            WHERE m.discord_id = ?
+            ORDER BY m.id
             """,
-            (discord_id, memory_type, content, confidence, source_message_id),
-        )
-        await conn.commit()
+            (model, discord_id),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [dict(r) for r in rows]
 
-    async def list_memories(self, *, discord_id: str, limit: int) -> list[dict[str, Any]]:
+    async def users_pending_consolidation(self, *, stale_before: float, limit: int) -> list[tuple[str, float | None]]:
+        """
+        Son birleştirmeden beri yeni hafızası olan ya da stale_before'dan önce
+        işlenmiş kullanıcılar: (discord_id, consolidated_at) çiftleri.
+        """
+        self._require_conn()
+        async with self._reader() as conn, conn.execute(
+            """
+            SELECT m.discord_id, c.consolidated_at
+            FROM memories m
+            LEFT JOIN memory_consolidation c ON c.discord_id = m.discord_id
+            GROUP BY m.discord_id
+            HAVING c.consolidated_at IS NULL OR MAX(m.id) > c.max_memory_id OR c.consolidated_at < ?
+            ORDER BY c.consolidated_at IS NOT NULL, c.consolidated_at
+            LIMIT ?
+            """,
+            (stale_before, limit),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [(str(r[0]), float(r[1]) if r[1] is not None else None) for r in rows]
+
+    async def apply_memory_consolidation(
+        self,
+        *,
+        discord_id: str,
+        confidences: list[tuple[float, int]],
+        delete_ids: list[int],
+        max_memory_id: int,
+        consolidated_at: float,
+    ) -> None:
+        """
+        Bir kullanıcının birleştirme sonucunu tek transaction'da yazar:
+        (confidence, id) güncellemeleri, silinen hafızalar (FTS trigger'ı ve
+        embedding cascade'i ile) ve ilerleme kaydı.
+        """
         conn = self._require_conn()
-        async with conn.execute(
+        async with self._flush_lock:
+            try:
+                if confidences:
+                    await conn.executemany("UPDATE memories SET confidence = ? WHERE id = ?", confidences)
+                if delete_ids:
+                    await conn.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in delete_ids])
+                await conn.execute(
+                    """
+                    INSERT INTO memory_consolidation(discord_id, max_memory_id, consolidated_at)
+                    VALUES(?, ?, ?)
+                    ON CONFLICT(discord_id) DO UPDATE SET
+                      max_memory_id=MAX(memory_consolidation.max_memory_id, excluded.max_memory_id),
+                      consolidated_at=excluded.consolidated_at
+                    """,
+                    (discord_id, max_memory_id, consolidated_at),
+                )
+                await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+
+    async def list_memories(self, *, discord_id: str, limit: int) -> list[dict[str, Any]]:
+        self._require_conn()
+        await self._flush_table("memories", discord_id)
+        async with self._reader() as conn, conn.execute(
             """
             SELECT id, memory_type, content, confidence, created_at
             FROM memories
@@ -171,3 +1126,74 @@ class Database:
         ) as cursor:
             rows = await cursor.fetchall()
         return [dict(r) for r in rows]
+
+    async def search_conversations(
+        self,
+        *,
+        query: str,
+        discord_id: str | None = None,
+        limit: int = 5,
+        exclude_message_id: str | None = None,
+    ) -> list[TextSearchHit]:
+        """BM25 sıralı tam metin arama. Bekleyen (henüz flush edilmemiş) satırlar dahil değildir."""
+        return await self._search_fts(
+            table="conversations",
+            label_column="role",
+            query=query,
+            discord_id=discord_id,
+            limit=limit,
+            extra_where="AND (t.message_id IS NULL OR t.message_id != ?)" if exclude_message_id else "",
+            extra_params=(exclude_message_id,) if exclude_message_id else (),
+        )
+
+    async def search_memories(self, *, query: str, discord_id: str | None = None, limit: int = 5) -> list[TextSearchHit]:
+        return await self._search_fts(
+            table="memories",
+            label_column="memory_type",
+            query=query,
+            discord_id=discord_id,
+            limit=limit,
+        )
+
+    async def _search_fts(
+        self,
+        *,
+        table: str,
+        label_column: str,
+        query: str,
+        discord_id: str | None,
+        limit: int,
+        extra_where: str = "",
+        extra_params: tuple[Any, ...] = (),
+    ) -> list[TextSearchHit]:
+        match = build_match_query(query)
+        if not match or limit <= 0:
+            return []
+        self._require_conn()
+        user_where = "AND t.discord_id = ?" if discord_id else ""
+        params: tuple[Any, ...] = (match, *((discord_id,) if discord_id else ()), *extra_params, limit)
+        async with self._reader() as conn, conn.execute(
+            f"""
+            SELECT t.id, t.discord_id, t.{label_column} AS label, t.content,
+                   snippet({table}_fts, 0, '**', '**', '…', 12) AS snip,
+                   bm25({table}_fts) AS score
+            FROM {table}_fts
+            JOIN {table} t ON t.id = {table}_fts.rowid
+            WHERE {table}_fts MATCH ? {user_where} {extra_where}
+            ORDER BY score
+            LIMIT ?
+            """,
+            params,
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            TextSearchHit(
+                row_id=int(r["id"]),
+                discord_id=str(r["discord_id"]),
+                label=str(r["label"]),
+                content=str(r["content"]),
+                snippet=str(r["snip"]),
+                score=float(r["score"]),
+            )
+            for r in rows
+        ]
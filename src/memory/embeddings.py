@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+import logging
+import re
+from typing import Any
+import zlib
+
+import numpy as np
+
+from src.memory.database import Database
+from src.text_normalize import fold_text
+
+
+logger = logging.getLogger(__name__)
+
+# Model/boyut değişirse eski vektörler otomatik yeniden hesaplanır.
+EMBEDDING_MODEL = "hash-ngram-v1"
+EMBEDDING_DIM = 256
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """
+    Tamamen yerel, CPU'da çalışan embedding: kelime + karakter n-gram
+    (Türkçe ekleri yakalamak için) özellikleri sabit boyutlu vektöre
+    hash'lenir ve L2 normalize edilir. Model dosyası, GPU veya ağ gerekmez.
+    """
+
+    def __init__(self, *, dim: int = EMBEDDING_DIM, ngram_sizes: tuple[int, ...] = (3, 4)) -> None:
+        self.dim = dim
+        self._ngram_sizes = ngram_sizes
+
+    def _features(self, text: str) -> tuple[list[int], list[float]]:
+        indices: list[int] = []
+        weights: list[float] = []
+
+        def add(feature: str, weight: float) -> None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            indices.append(h % self.dim)
+            # Ayrı bir bit işaret olarak kullanılır; çakışmalar birbirini kısmen götürür.
+            weights.append(weight if (h >> 16) & 1 else -weight)
+
+        for word in _WORD_RE.findall(fold_text(text)):
+            add(f"w:{word}", 1.0)
+            if len(word) < 3:
+                continue
+            padded = f"<{word}>"
+            for n in self._ngram_sizes:
+                for i in range(len(padded) - n + 1):
+                    add(padded[i : i + n], 0.5)
+        return indices, weights
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, weights = self._features(text)
+            if indices:
+                np.add.at(out[row], indices, weights)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+    @staticmethod
+    def to_blob(vector: np.ndarray) -> bytes:
+        return np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+
+
+@dataclass
+class _UserMatrix:
+    matrix: np.ndarray
+    # Benzerliğe eklenen sabit terim: güven + hafif yenilik tercihi.
+    bias: np.ndarray
+    rows: list[dict[str, Any]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + self.bias.nbytes
+
+
+@dataclass
+class _Load:
+    task: asyncio.Task[_UserMatrix]
+    # Yükleme sürerken invalidate edildi: sonuç cache'e konmaz.
+    stale: bool = False
+
+
+class MemoryIndex:
+    """
+    Kullanıcı başına hafıza vektörlerini tek bir float32 matriste tutar ve
+    sorgu ile kosinüs benzerliğine göre top-k döndürür. Matrisler bellek
+    bütçesiyle LRU olarak cache'lenir; yeni hafıza eklenince invalidate edilir.
+    publish verilirse (çok process) invalidate diğer process'lere de iletilir;
+    onlardan gelen bildirimler drop ile yalnız yerel cache'i düşürür.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        embedder: HashingEmbedder | None = None,
+        cache_bytes: int = 64 * 1_048_576,
+        confidence_weight: float = 0.1,
+        recency_weight: float = 0.05,
+        publish: Callable[[str], None] | None = None,
+    ) -> None:
+        self._db = db
+        self._publish = publish
+        self.embedder = embedder or HashingEmbedder()
+        self._cache_bytes = cache_bytes
+        self._confidence_weight = confidence_weight
+        self._recency_weight = recency_weight
+        self._cache: OrderedDict[str, _UserMatrix] = OrderedDict()
+        self._cached_bytes = 0
+        # Kullanıcı başına tek yükleme; aynı anda kaçıranlar aynı sonucu bekler.
+        self._loading: dict[str, _Load] = {}
+
+    def invalidate(self, discord_id: str) -> None:
+        self.drop(discord_id)
+        if self._publish is not None:
+            self._publish(discord_id)
+
+    def drop(self, discord_id: str) -> None:
+        """Yalnız bu process'in cache'inden düşürür."""
+        entry = self._cache.pop(discord_id, None)
+        if entry is not None:
+            self._cached_bytes -= entry.nbytes
+        load = self._loading.pop(discord_id, None)
+        if load is not None:
+            load.stale = True
+
+    async def search(self, *, discord_id: str, query: str, k: int) -> list[tuple[float, dict[str, Any]]]:
+        user = await self._get(discord_id)
+        if not user.rows or k <= 0:
+            return []
+        q = self.embedder.embed(query)
+        scores = top_k_scores(user.matrix, q, k, bias=user.bias)
+        return [(float(score), user.rows[idx]) for idx, score in scores]
+
+    async def _get(self, discord_id: str) -> _UserMatrix:
+        entry = self._cache.get(discord_id)
+        if entry is not None:
+            self._cache.move_to_end(discord_id)
+            return entry
+
+        load = self._loading.get(discord_id)
+        if load is None:
+            load = self._loading[discord_id] = _Load(asyncio.create_task(self._load(discord_id)))
+            load.task.add_done_callback(lambda _, key=discord_id, ld=load: self._forget_load(key, ld))
+        # Bekleyenlerden biri iptal edilse de yükleme diğerleri için sürer.
+        entry = await asyncio.shield(load.task)
+        if load.stale or self._cache.get(discord_id) is entry:
+            return entry
+        old = self._cache.pop(discord_id, None)
+        if old is not None:
+            self._cached_bytes -= old.nbytes
+        self._cache[discord_id] = entry
+        self._cached_bytes += entry.nbytes
+        while self._cached_bytes > self._cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= evicted.nbytes
+        return entry
+
+    def _forget_load(self, discord_id: str, load: _Load) -> None:
+        if self._loading.get(discord_id) is load:
+            del self._loading[discord_id]
+
+    async def _load(self, discord_id: str) -> _UserMatrix:
+        rows = await self._db.list_memories_with_embeddings(discord_id=discord_id, model=EMBEDDING_MODEL)
+        dim = self.embedder.dim
+        blob_size = dim * 4
+
+        missing = [i for i, r in enumerate(rows) if not r["vector"] or len(r["vector"]) != blob_size]
+        if missing:
+            # Eski satırlar (ya da model değişimi): bir kere hesaplanıp saklanır.
+            vectors = await asyncio.to_thread(self.embedder.embed_many, [rows[i]["content"] for i in missing])
+            backfill: list[tuple[int, bytes]] = []
+            for i, vec in zip(missing, vectors):
+                blob = HashingEmbedder.to_blob(vec)
+                rows[i]["vector"] = blob
+                backfill.append((int(rows[i]["id"]), blob))
+            await self._db.store_embeddings(discord_id=discord_id, model=EMBEDDING_MODEL, vectors=backfill)
+
+        n = len(rows)
+        if n:
+            matrix = np.frombuffer(b"".join(r.pop("vector") for r in rows), dtype=np.float32).reshape(n, dim)
+        else:
+            matrix = np.zeros((0, dim), dtype=np.float32)
+        confidence = np.fromiter((float(r["confidence"]) for r in rows), dtype=np.float32, count=n)
+        recency = np.linspace(0.0, 1.0, n, dtype=np.float32) if n > 1 else np.ones(n, dtype=np.float32)
+        bias = self._confidence_weight * confidence + self._recency_weight * recency
+        return _UserMatrix(matrix=matrix, bias=bias, rows=rows)
+
+    def summary(self) -> str:
+        return f"users={len(self._cache)} cached={self._cached_bytes / 1_048_576:.1f}MB"
+
+
+def top_k_scores(
+    matrix: np.ndarray,
+    query: np.ndarray,
+    k: int,
+    *,
+    bias: np.ndarray | None = None,
+) -> list[tuple[int, float]]:
+    """(satır indeksi, skor) listesi, skora göre azalan. Tam sıralama yerine argpartition."""
+    n = matrix.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    scores = matrix @ query
+    if bias is not None:
+        scores += bias
+    if n > k:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(n)
+    top = top[np.argsort(-scores[top])]
+    return [(int(i), float(scores[i])) for i in top]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import time
+
+from src.memory.user_memory import UserMemoryManager
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExtractionStats:
+    submitted: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    users_processed: int = 0
+    memories_saved: int = 0
+    failures: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+    def record_lag(self, lag: float) -> None:
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+
+@dataclass
+class _Job:
+    source_message_id: str | None
+    enqueued_at: float
+
+
+class ExtractionWorker:
+    """
+    Hafıza çıkarma işlerini tek bir kuyruktan yürütür. Aynı kullanıcı için
+    bekleyen iş varsa yenisi ona katlanır (yalnız son mesaj id'si güncellenir).
+    En fazla `concurrency` batch aynı anda çalışır; her batch birden fazla
+    kullanıcıyı tek Gemini çağrısında işler. Kullanıcıya cevap üretilirken
+    (foreground) yeni batch başlatılmaz, en fazla max_defer kadar beklenir.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory: UserMemoryManager,
+        concurrency: int = 1,
+        batch_users: int = 4,
+        linger_ms: int = 2000,
+        max_defer_seconds: float = 30.0,
+    ) -> None:
+        self._memory = memory
+        self._concurrency = max(1, concurrency)
+        self._batch_users = max(1, batch_users)
+        self._linger = max(0, linger_ms) / 1000.0
+        self._max_defer = max_defer_seconds
+        self._pending: OrderedDict[str, _Job] = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._foreground = 0
+        self._inflight = 0
+        self._tasks: list[asyncio.Task[None]] = []
+        self.stats = ExtractionStats()
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self._concurrency)]
+
+    async def close(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pending:
+            logger.info("Dropping %s pending memory extraction jobs on shutdown", len(self._pending))
+            self._pending.clear()
+
+    def submit(self, *, discord_id: str, source_message_id: str | None) -> None:
+        self.stats.submitted += 1
+        job = self._pending.get(discord_id)
+        if job is not None:
+            # İlk kuyruğa giriş zamanı korunur; lag ölçümü ve sıra bozulmaz.
+            job.source_message_id = source_message_id
+            self.stats.coalesced += 1
+            return
+        self._pending[discord_id] = _Job(source_message_id=source_message_id, enqueued_at=time.monotonic())
+        self._wakeup.set()
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        """Kullanıcıya dönük üretim sürerken arka plan batch'lerini bekletir."""
+        self._foreground += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._foreground -= 1
+            if self._foreground == 0:
+                self._idle.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if self._linger:
+                # Aynı anda gelen diğer kullanıcılar da bu batch'e girsin.
+                await asyncio.sleep(self._linger)
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self._max_defer)
+            except asyncio.TimeoutError:
+                pass
+
+            batch = self._take_batch()
+            if not self._pending:
+                self._wakeup.clear()
+            if not batch:
+                continue
+            await self._process(batch)
+
+    def _take_batch(self) -> list[tuple[str, _Job]]:
+        batch: list[tuple[str, _Job]] = []
+        while self._pending and len(batch) < self._batch_users:
+            batch.append(self._pending.popitem(last=False))
+        return batch
+
+    async def _process(self, batch: list[tuple[str, _Job]]) -> None:
+        now = time.monotonic()
+        for _, job in batch:
+            self.stats.record_lag(now - job.enqueued_at)
+        self._inflight += 1
+        try:
+            saved = await self._memory.extract_and_store_many(
+                jobs=[(discord_id, job.source_message_id) for discord_id, job in batch]
+            )
+            self.stats.memories_saved += saved
+        except Exception:
+            self.stats.failures += 1
+            logger.exception("memory extraction batch failed (%s users)", len(batch))
+        finally:
+            self._inflight -= 1
+            self.stats.batches += 1
+            self.stats.users_processed += len(batch)
+
+    def summary(self) -> str:
+        st = self.stats
+        avg_lag = st.total_lag / st.users_processed if st.users_processed else 0.0
+        return (
+            f"depth={self.depth} inflight={self._inflight} batches={st.batches} "
+            f"users={st.users_processed} coalesced={st.coalesced} saved={st.memories_saved} "
+            f"failed={st.failures} lag avg={avg_lag:.1f}s max={st.max_lag:.1f}s"
+        )
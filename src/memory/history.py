@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+import sys
+
+
+# Satır başına sabit ek yük tahmini (nesne + deque slotu + message_id); içerik ayrıca sayılır.
+ROW_OVERHEAD_BYTES = 120
+
+
+class HistoryRow:
+    """Bellekteki tek konuşma turu; milyonlarca satırda dict'siz küçük nesne."""
+
+    __slots__ = ("message_id", "role", "content", "nbytes", "id")
+
+    def __init__(self, message_id: str | None, role: str, content: str, row_id: int | None = None) -> None:
+        self.message_id = message_id
+        # conversations.id; write-behind satırlarda commit'e kadar None.
+        self.id = row_id
+        # role yalnız "user"/"assistant"; tek kopya paylaşılsın.
+        self.role = sys.intern(role)
+        self.content = content
+        self.nbytes = ROW_OVERHEAD_BYTES + sys.getsizeof(content)
+
+
+class _UserHistory:
+    __slots__ = ("rows", "complete", "nbytes")
+
+    def __init__(self, rows: deque[HistoryRow], complete: bool) -> None:
+        self.rows = rows
+        # True: kullanıcının DB'deki tüm satırları buffer'da (maxlen'e hiç ulaşmadı).
+        self.complete = complete
+        self.nbytes = sum(r.nbytes for r in rows)
+
+
+class _LoadState:
+    """Kullanıcı için süren doldurmalar: sayısı ve her yazma/invalidate'te artan epoch."""
+
+    __slots__ = ("loaders", "epoch")
+
+    def __init__(self) -> None:
+        self.loaders = 0
+        self.epoch = 0
+
+
+@dataclass
+class HistoryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RecentHistoryCache:
+    """
+    Kullanıcı başına son `turns` konuşma turunu tutan ring buffer'lar.
+    Yazmalar kuyruğa girerken buffer'a da eklenir; okuma kaçarsa SQLite'tan
+    bir kez doldurulur. Toplam bellek max_bytes'ı aşınca en uzun süredir
+    kullanılmayan kullanıcılar düşer.
+    """
+
+    def __init__(self, *, turns: int = 20, max_bytes: int = 32 * 1_048_576) -> None:
+        self.turns = max(1, turns)
+        self._max_bytes = max_bytes
+        self._users: OrderedDict[str, _UserHistory] = OrderedDict()
+        self._bytes = 0
+        # Doldurma süren kullanıcılar. Yükleyici begin_load'da epoch'u alır; arada
+        # yazma gelirse epoch değişir, yüklenen (eksik) sonuç kurulmaz.
+        self._loading: dict[str, _LoadState] = {}
+        self.stats = HistoryCacheStats()
+
+    def append(self, discord_id: str, *, message_id: str | None, role: str, content: str) -> HistoryRow | None:
+        """Kullanıcı buffer'daysa satırı ekler ve döner (commit sonrası id'si yazılsın diye)."""
+        self._bump(discord_id)
+        entry = self._users.get(discord_id)
+        if entry is None:
+            return None
+        row = HistoryRow(message_id, role, content)
+        if len(entry.rows) == entry.rows.maxlen:
+            dropped = entry.rows[0].nbytes
+            entry.nbytes -= dropped
+            self._bytes -= dropped
+            entry.complete = False
+        entry.rows.append(row)
+        entry.nbytes += row.nbytes
+        self._bytes += row.nbytes
+        self._users.move_to_end(discord_id)
+        self._evict()
+        return row
+
+    def recent(
+        self,
+        discord_id: str,
+        *,
+        limit: int,
+        exclude_message_id: str | None = None,
+        after_id: int = 0,
+    ) -> list[HistoryRow] | None:
+        """
+        Son `limit` tur (eskiden yeniye); after_id verilirse yalnız DB id'si ondan
+        büyük (ya da henüz commit edilmemiş) satırlar. Buffer yetmiyorsa None
+        (DB'ye gidilmeli).
+        """
+        entry = self._users.get(discord_id)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        rows = [
+            r
+            for r in entry.rows
+            if (exclude_message_id is None or r.message_id is None or r.message_id != exclude_message_id)
+            and (r.id is None or r.id > after_id)
+        ]
+        # Buffer'ın en eski satırı after_id'ye kadar iniyorsa aradaki her satır buffer'dadır.
+        oldest = entry.rows[0].id if entry.rows else None
+        reaches = after_id > 0 and oldest is not None and oldest <= after_id
+        if len(rows) < limit and not entry.complete and not reaches:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self._users.move_to_end(discord_id)
+        return rows[-limit:] if limit > 0 else []
+
+    def _bump(self, discord_id: str) -> None:
+        state = self._loading.get(discord_id)
+        if state is not None:
+            state.epoch += 1
+
+    def begin_load(self, discord_id: str) -> int:
+        """Doldurma başlar; dönen değer finish_load/abort_load'a verilir."""
+        state = self._loading.get(discord_id)
+        if state is None:
+            state = self._loading[discord_id] = _LoadState()
+        state.loaders += 1
+        return state.epoch
+
+    def _end_load(self, discord_id: str) -> _LoadState | None:
+        state = self._loading.get(discord_id)
+        if state is not None:
+            state.loaders -= 1
+            if state.loaders <= 0:
+                del self._loading[discord_id]
+        return state
+
+    def finish_load(self, discord_id: str, token: int, rows: list[HistoryRow]) -> None:
+        """
+        begin_load'dan sonra DB'den okunan son `turns` satırı (eskiden yeniye)
+        kurar. Arada aynı kullanıcıya yazma geldiyse sonuç eksik olabilir;
+        kurulmaz, bir sonraki okuma yeniden dener.
+        """
+        state = self._end_load(discord_id)
+        if state is None or state.epoch != token or discord_id in self._users:
+            return
+        entry = _UserHistory(deque(rows, maxlen=self.turns), complete=len(rows) < self.turns)
+        self._users[discord_id] = entry
+        self._bytes += entry.nbytes
+        self._evict()
+
+    def abort_load(self, discord_id: str) -> None:
+        self._end_load(discord_id)
+
+    def invalidate(self, discord_id: str) -> None:
+        entry = self._users.pop(discord_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+        self._bump(discord_id)
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._bytes = 0
+        for state in self._loading.values():
+            state.epoch += 1
+
+    def _evict(self) -> None:
+        while self._bytes > self._max_bytes and len(self._users) > 1:
+            _, entry = self._users.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.stats.evictions += 1
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"users={len(self._users)} turns={self.turns} mem={self._bytes / 1_048_576:.1f}MB "
+            f"hit_rate={st.hit_rate:.0%} evictions={st.evictions}"
+        )
@@ -7,6 +7,7 @@ from pathlib import Path
 import re
 
 from src.ai.gemini_client import GeminiClient
+from src.ai.scheduler import Priority
 
 
 logger = logging.getLogger(__name__)
@@ -43,6 +44,28 @@ def _extract_json_array(text: str) -> list[object]:
     return data if isinstance(data, list) else []
 
 
+def _parse_item(item: object) -> ExtractedMemory | None:
+    if not isinstance(item, dict):
+        return None
+    mtype = str(item.get("type", "")).strip()
+    content = str(item.get("content", "")).strip()
+    try:
+        conf = float(item.get("confidence", 0))
+    except (TypeError, ValueError):
+        conf = 0.0
+
+    if not mtype or not content:
+        return None
+    return ExtractedMemory(memory_type=mtype, content=content, confidence=conf)
+
+
+BATCH_INSTRUCTION = (
+    "Aşağıda birden fazla kullanıcının konuşması var. Her konuşmayı ayrı değerlendir; "
+    "bir kullanıcının bilgisini başka kullanıcıya yazma. Her öğeye konuşmanın etiketini "
+    "\"user\" alanı olarak ekle, örn. {\"user\":\"K1\",\"type\":...}."
+)
+
+
 class MemoryExtractor:
     def __init__(self, *, ai: GeminiClient):
         self._ai = ai
@@ -53,25 +76,38 @@ class MemoryExtractor:
         prompt = f"{self._base_prompt}\n\nKONUŞMA:\n{convo_text}\n"
 
         try:
-            raw = await self._ai.generate_text(prompt=prompt)
+            raw = await self._ai.generate_text(prompt=prompt, priority=Priority.BACKGROUND)
         except Exception:
             logger.exception("Memory extraction failed")
             return []
 
-        items = _extract_json_array(raw)
-        out: list[ExtractedMemory] = []
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            mtype = str(item.get("type", "")).strip()
-            content = str(item.get("content", "")).strip()
-            try:
-                conf = float(item.get("confidence", 0))
-            except (TypeError, ValueError):
-                conf = 0.0
-
-            if not mtype or not content:
-                continue
-
-            out.append(ExtractedMemory(memory_type=mtype, content=content, confidence=conf))
+        return [m for m in map(_parse_item, _extract_json_array(raw)) if m]
+
+    async def extract_batch(self, *, conversations: dict[str, list[str]]) -> dict[str, list[ExtractedMemory]]:
+        """
+        Birden fazla kullanıcının konuşmasını tek Gemini çağrısında işler.
+        Döner: anahtar -> hafızalar. Etiketi eşleşmeyen öğeler atılır.
+        """
+        if len(conversations) <= 1:
+            return {key: await self.extract(conversation=convo) for key, convo in conversations.items()}
+
+        labels = {f"K{i}": key for i, key in enumerate(conversations, start=1)}
+        blocks = [
+            f"KONUŞMA {label}:\n" + "\n".join(conversations[key][-20:])
+            for label, key in labels.items()
+        ]
+        prompt = f"{self._base_prompt}\n\n{BATCH_INSTRUCTION}\n\n" + "\n\n".join(blocks) + "\n"
+
+        try:
+            raw = await self._ai.generate_text(prompt=prompt, priority=Priority.BACKGROUND)
+        except Exception:
+            logger.exception("Batched memory extraction failed")
+            return {}
+
+        out: dict[str, list[ExtractedMemory]] = {key: [] for key in conversations}
+        for item in _extract_json_array(raw):
+            memory = _parse_item(item)
+            key = labels.get(str(item.get("user", "")).strip().upper()) if memory else None  # type: ignore[union-attr]
+            if memory and key:
+                out[key].append(memory)
         return out
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+from src.memory.database import Database
+
+
+logger = logging.getLogger(__name__)
+
+
+def _sql_timestamp(ts: float) -> str:
+    # CURRENT_TIMESTAMP ile aynı biçim (UTC), metin olarak karşılaştırılabilir.
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+@dataclass
+class UserProfile:
+    discord_id: str
+    username: str
+    display_name: str
+    message_count: int
+    relationship_score: int
+    last_seen: float
+    # DB'ye henüz yazılmamış message_count artışı.
+    pending: int = 0
+
+
+@dataclass
+class ProfileCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    flushes: int = 0
+    flushed_rows: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class UserProfileCache:
+    """
+    Sık konuşan kullanıcıların profil satırını bellekte tutar (LRU). Her
+    mesajda touch_user'ın UPSERT + commit beklemesi yerine sayaç bellekte
+    artar; birikmiş farklar flush_interval'de bir ve kapanışta write-behind
+    kuyruğuna yazılır. Çökmede en fazla son pencerenin sayaç artışları
+    kaybolur; konuşma satırları etkilenmez.
+
+    Sharded modda her process yalnız kendi gördüğü artışları sayar: DB'ye
+    delta yazıldığı için toplam doğru kalır, bellekteki message_count diğer
+    process'lerin artışlarını kullanıcı cache'ten düşene kadar görmez.
+    """
+
+    def __init__(self, *, db: Database, max_users: int = 10_000, flush_interval_seconds: float = 30.0) -> None:
+        self._db = db
+        self._max_users = max(1, max_users)
+        self._flush_interval = flush_interval_seconds
+        self._entries: OrderedDict[str, UserProfile] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+        self.stats = ProfileCacheStats()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("User profile flush failed")
+
+    def get(self, discord_id: str) -> UserProfile | None:
+        """Yalnız bellekteki profil; DB'ye gitmez."""
+        return self._entries.get(discord_id)
+
+    async def touch(self, *, discord_id: str, username: str, display_name: str) -> int:
+        """Mesaj sayacını artırır ve yeni değeri döner (Database.touch_user ile aynı sözleşme)."""
+        now = time.time()
+        entry = self._entries.get(discord_id)
+        if entry is not None:
+            self.stats.hits += 1
+            self._entries.move_to_end(discord_id)
+        else:
+            self.stats.misses += 1
+            row = await self._db.get_user(discord_id=discord_id)
+            # Yükleme sırasında aynı kullanıcının başka bir mesajı girmiş olabilir.
+            entry = self._entries.get(discord_id)
+            if entry is None:
+                entry = self._insert(discord_id, row, username=username, display_name=display_name, now=now)
+                if row is None:
+                    # conversations.discord_id users'a foreign key: satır hemen kuyruğa
+                    # girsin ki aynı batch'teki konuşma insert'inden önce yazılsın.
+                    entry.message_count += 1
+                    entry.pending += 1
+                    await self._save([entry])
+                    await self._evict()
+                    return entry.message_count
+                await self._evict()
+
+        entry.username = username
+        entry.display_name = display_name
+        entry.last_seen = now
+        entry.message_count += 1
+        entry.pending += 1
+        return entry.message_count
+
+    def _insert(
+        self,
+        discord_id: str,
+        row: dict[str, Any] | None,
+        *,
+        username: str,
+        display_name: str,
+        now: float,
+    ) -> UserProfile:
+        entry = UserProfile(
+            discord_id=discord_id,
+            username=username,
+            display_name=display_name,
+            message_count=int(row["message_count"]) if row else 0,
+            relationship_score=int(row["relationship_score"]) if row else 50,
+            last_seen=now,
+        )
+        self._entries[discord_id] = entry
+        return entry
+
+    async def _evict(self) -> None:
+        evicted: list[UserProfile] = []
+        while len(self._entries) > self._max_users:
+            _, old = self._entries.popitem(last=False)
+            self.stats.evictions += 1
+            if old.pending:
+                evicted.append(old)
+        if evicted:
+            await self._save(evicted)
+
+    async def _save(self, entries: list[UserProfile]) -> None:
+        rows = [
+            (e.discord_id, e.username, e.display_name, _sql_timestamp(e.last_seen), e.pending)
+            for e in entries
+        ]
+        for e in entries:
+            e.pending = 0
+        try:
+            await self._db.save_user_counters(rows)
+        except Exception:
+            # Bir sonraki flush'ta yeniden denensin.
+            for e, row in zip(entries, rows):
+                e.pending += row[4]
+            raise
+        self.stats.flushes += 1
+        self.stats.flushed_rows += len(rows)
+
+    async def flush(self) -> None:
+        dirty = [e for e in self._entries.values() if e.pending]
+        if dirty:
+            await self._save(dirty)
+
+    def summary(self) -> str:
+        st = self.stats
+        dirty = sum(1 for e in self._entries.values() if e.pending)
+        return (
+            f"users={len(self._entries)}/{self._max_users} hit_rate={st.hit_rate:.0%} "
+            f"dirty={dirty} evictions={st.evictions} flushed_rows={st.flushed_rows}"
+        )
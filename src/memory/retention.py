@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+
+from src.memory.database import Database
+
+
+logger = logging.getLogger(__name__)
+
+# Tek seferlik auto_vacuum geçişi (tam VACUUM) yalnız bu boyutun altında otomatik yapılır.
+VACUUM_CONVERT_MAX_BYTES = 256 * 1_048_576
+
+
+@dataclass
+class RetentionStats:
+    runs: int = 0
+    archived: int = 0
+    failures: int = 0
+
+
+class RetentionWorker:
+    """
+    retention_days'ten eski konuşmaları küçük batch'ler halinde sıkıştırılmış
+    arşiv dosyasına taşır; her batch kendi transaction'ı ve flush kilidiyle
+    çalışır, aralarda bot normal yazmaya devam eder. Boşalan sayfalar
+    incremental_vacuum ile parça parça dosyadan geri verilir.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        archive_path: Path,
+        retention_days: float,
+        batch_rows: int = 500,
+        interval_seconds: float = 3600.0,
+        pause_seconds: float = 0.2,
+        vacuum_pages: int = 512,
+    ) -> None:
+        self._db = db
+        self._archive_path = archive_path
+        self._retention_days = retention_days
+        self._batch_rows = max(1, batch_rows)
+        self._interval = interval_seconds
+        self._pause = pause_seconds
+        self._vacuum_pages = max(1, vacuum_pages)
+        self._incremental = False
+        self._task: asyncio.Task[None] | None = None
+        self.stats = RetentionStats()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        try:
+            await self._db.attach_archive(self._archive_path)
+            self._incremental = await self._db.enable_incremental_vacuum(max_bytes=VACUUM_CONVERT_MAX_BYTES)
+        except Exception:
+            logger.exception("Conversation archive setup failed; retention disabled")
+            return
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                self.stats.failures += 1
+                logger.exception("Conversation retention run failed")
+            await asyncio.sleep(self._interval)
+
+    async def run_once(self) -> int:
+        """Eski satırlar bitene kadar batch batch arşivler; taşınan satır sayısını döner."""
+        self.stats.runs += 1
+        moved = 0
+        while True:
+            count = await self._db.archive_conversations(older_than_days=self._retention_days, limit=self._batch_rows)
+            if not count:
+                break
+            moved += count
+            self.stats.archived += count
+            if self._incremental:
+                await self._db.incremental_vacuum(pages=self._vacuum_pages)
+            await asyncio.sleep(self._pause)
+        if self._incremental:
+            # Batch'ler arası vacuum'un geride bıraktığı boş sayfalar.
+            await self._db.incremental_vacuum(pages=self._vacuum_pages * 4)
+        if moved:
+            logger.info("Archived %s conversation rows older than %s days", moved, self._retention_days)
+        return moved
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"keep={self._retention_days:g}d runs={st.runs} archived={st.archived} "
+            f"failures={st.failures} incremental_vacuum={'on' if self._incremental else 'off'}"
+        )
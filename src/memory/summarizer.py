@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+
+from src.ai.gemini_client import GeminiClient
+from src.ai.scheduler import Priority
+from src.memory.database import Database
+
+
+logger = logging.getLogger(__name__)
+
+
+def _repo_root() -> Path:
+    # src/memory/summarizer.py -> repo root is parents[2]
+    return Path(__file__).resolve().parents[2]
+
+
+def _load_summary_prompt() -> str:
+    return (_repo_root() / "prompts" / "conversation_summary.txt").read_text(encoding="utf-8")
+
+
+def _format_turn(role: str, content: str, *, max_chars: int = 300) -> str:
+    content = content.replace("\n", " ").strip()
+    if len(content) > max_chars:
+        content = content[:max_chars] + "…"
+    return f"{role}: {content}"
+
+
+@dataclass(frozen=True)
+class ConversationContext:
+    user_summary: str | None
+    channel_summary: str | None
+    recent_turns: list[str]
+
+
+class ConversationSummarizer:
+    """
+    Kullanıcı ve kanal başına sürekli güncellenen bir özet tutar. Özetlenmemiş
+    tur sayısı keep_recent + threshold'u aşınca eski turlar arka planda özete
+    katlanır. Özetin kapsamadığı turların hepsi (en fazla keep_recent +
+    threshold) prompt'a olduğu gibi girer; özetle son turlar arasında boşluk
+    kalmaz. Böylece istek başına bağlam maliyeti konuşma uzunluğundan bağımsız kalır.
+    """
+
+    def __init__(
+        self,
+        *,
+        db: Database,
+        ai: GeminiClient,
+        keep_recent: int = 6,
+        threshold: int = 12,
+        max_summary_chars: int = 1500,
+    ) -> None:
+        self._db = db
+        self._ai = ai
+        self._keep_recent = max(0, keep_recent)
+        self._threshold = max(1, threshold)
+        self._max_summary_chars = max_summary_chars
+        self._base_prompt = _load_summary_prompt()
+        # Son kontrolden beri eklenen tur sayısı; eşik dolmadan DB'ye hiç gidilmez.
+        self._new_turns: dict[tuple[str, str], int] = {}
+        self._running: dict[tuple[str, str], asyncio.Task[None]] = {}
+
+    async def context(self, *, discord_id: str, channel_id: str | None, exclude_message_id: str | None) -> ConversationContext:
+        user_summary = await self._db.get_summary(scope="user", scope_id=discord_id)
+        channel_summary = (
+            await self._db.get_summary(scope="channel", scope_id=channel_id) if channel_id else None
+        )
+        # Katlama keep_recent + threshold birikince çalışır; arada son keep_recent'ten
+        # eski ama özete girmemiş turlar da bağlamda kalmalı.
+        rows = await self._db.get_recent_conversation(
+            discord_id=discord_id,
+            limit=self._keep_recent + self._threshold,
+            exclude_message_id=exclude_message_id,
+            after_id=user_summary.covered_until_id if user_summary else 0,
+        )
+        recent = [_format_turn(r.role, r.content) for r in rows]
+        return ConversationContext(
+            user_summary=user_summary.summary if user_summary else None,
+            channel_summary=channel_summary.summary if channel_summary else None,
+            recent_turns=recent,
+        )
+
+    def note_turns(self, *, discord_id: str, channel_id: str | None, count: int = 2) -> None:
+        """Cevap yazıldıktan sonra çağrılır; eşik dolan kapsamlar için arka plan güncellemesi başlatır."""
+        scopes = [("user", discord_id)]
+        if channel_id:
+            scopes.append(("channel", channel_id))
+        for key in scopes:
+            total = self._new_turns.get(key, 0) + count
+            if total < self._threshold or key in self._running:
+                self._new_turns[key] = total
+                continue
+            self._new_turns[key] = 0
+            task = asyncio.create_task(self._update(*key))
+            self._running[key] = task
+            task.add_done_callback(lambda t, k=key: self._on_done(k, t))
+
+    def _on_done(self, key: tuple[str, str], task: asyncio.Task[None]) -> None:
+        self._running.pop(key, None)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc:
+            logger.error("conversation summary update failed for %s: %s", key, exc)
+
+    async def _update(self, scope: str, scope_id: str) -> None:
+        current = await self._db.get_summary(scope=scope, scope_id=scope_id)
+        covered = current.covered_until_id if current else 0
+        # Tek seferde en fazla birkaç eşik kadar tur katlanır; kalan bir sonraki tura.
+        turns = await self._db.get_conversation_after(
+            scope=scope,
+            scope_id=scope_id,
+            after_id=covered,
+            limit=self._keep_recent + self._threshold * 4,
+        )
+        if len(turns) < self._keep_recent + self._threshold:
+            return
+        to_fold = turns[: len(turns) - self._keep_recent]
+
+        lines = [
+            _format_turn(t.role, t.content) if scope == "user" else f"<@{t.discord_id}> {_format_turn(t.role, t.content)}"
+            for t in to_fold
+        ]
+        prompt = (
+            f"{self._base_prompt}\n\n"
+            f"MEVCUT ÖZET:\n{current.summary if current else '(yok)'}\n\n"
+            f"YENİ TURLAR:\n" + "\n".join(lines) + "\n"
+        )
+        summary = (await self._ai.generate_text(prompt=prompt, priority=Priority.BACKGROUND)).strip()
+        if not summary:
+            return
+        await self._db.upsert_summary(
+            scope=scope,
+            scope_id=scope_id,
+            summary=summary[: self._max_summary_chars],
+            covered_until_id=to_fold[-1].id,
+        )
+
+    async def wait_idle(self) -> None:
+        """Süren özet güncellemeleri bitene kadar bekler."""
+        while self._running:
+            await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -4,23 +4,34 @@ import logging
 
 from src.ai.gemini_client import GeminiClient
 from src.memory.database import Database
-from src.memory.memory_extractor import MemoryExtractor
+from src.memory.embeddings import EMBEDDING_MODEL, HashingEmbedder, MemoryIndex
+from src.memory.memory_extractor import ExtractedMemory, MemoryExtractor
 
 
 logger = logging.getLogger(__name__)
 
 
+def _format_memory(row: dict[str, object]) -> str:
+    return f"- ({row['memory_type']}, {float(row['confidence']):.2f}) {row['content']}"  # type: ignore[arg-type]
+
+
 class UserMemoryManager:
-    def __init__(self, *, db: Database, ai: GeminiClient):
+    def __init__(self, *, db: Database, ai: GeminiClient, index: MemoryIndex | None = None):
         self._db = db
         self._extractor = MemoryExtractor(ai=ai)
+        self.index = index
+
+    async def get_prompt_memories(self, *, discord_id: str, limit: int = 5, query: str | None = None) -> list[str]:
+        """query verilirse ve vektör index'i açıksa en alakalı hafızalar, yoksa en yeniler."""
+        if query and self.index:
+            try:
+                hits = await self.index.search(discord_id=discord_id, query=query, k=limit)
+                return [_format_memory(row) for _, row in hits]
+            except Exception:
+                logger.exception("memory vector search failed; falling back to newest")
 
-    async def get_prompt_memories(self, *, discord_id: str, limit: int = 5) -> list[str]:
         rows = await self._db.list_memories(discord_id=discord_id, limit=limit)
-        memories: list[str] = []
-        for r in rows:
-            memories.append(f"- ({r['memory_type']}, {r['confidence']:.2f}) {r['content']}")
-        return memories
+        return [_format_memory(r) for r in rows]
 
     async def extract_and_store(
         self,
@@ -28,24 +39,57 @@ class UserMemoryManager:
         discord_id: str,
         source_message_id: str | None,
     ) -> None:
-        conversation = await self._db.get_recent_conversation(discord_id=discord_id, limit=10)
-        convo_lines = [f"{row.role}: {row.content}" for row in conversation]
-        extracted = await self._extractor.extract(conversation=convo_lines)
-        if not extracted:
-            return
+        await self.extract_and_store_many(jobs=[(discord_id, source_message_id)])
+
+    async def extract_and_store_many(self, *, jobs: list[tuple[str, str | None]]) -> int:
+        """
+        (discord_id, source_message_id) çiftlerini tek extraction çağrısında
+        işler. Döner: kaydedilen hafıza sayısı.
+        """
+        conversations: dict[str, list[str]] = {}
+        for discord_id, _ in jobs:
+            conversation = await self._db.get_recent_conversation(discord_id=discord_id, limit=10)
+            if conversation:
+                conversations[discord_id] = [f"{row.role}: {row.content}" for row in conversation]
+        if not conversations:
+            return 0
 
+        extracted = await self._extractor.extract_batch(conversations=conversations)
         saved = 0
-        for m in extracted:
-            if m.confidence < 0.7:
-                continue
+        for discord_id, source_message_id in jobs:
+            saved += await self._store(
+                discord_id=discord_id,
+                source_message_id=source_message_id,
+                extracted=extracted.get(discord_id, []),
+            )
+        return saved
+
+    async def _store(
+        self,
+        *,
+        discord_id: str,
+        source_message_id: str | None,
+        extracted: list[ExtractedMemory],
+    ) -> int:
+        kept = [m for m in extracted if m.confidence >= 0.7]
+        if not kept:
+            return 0
+
+        vectors = None
+        if self.index:
+            vectors = self.index.embedder.embed_many([m.content for m in kept])
+
+        for i, m in enumerate(kept):
             await self._db.add_memory(
                 discord_id=discord_id,
                 memory_type=m.memory_type,
                 content=m.content,
                 confidence=m.confidence,
                 source_message_id=source_message_id,
+                embedding=(EMBEDDING_MODEL, HashingEmbedder.to_blob(vectors[i])) if vectors is not None else None,
             )
-            saved += 1
 
-        if saved:
-            logger.info("Saved %s memories for %s", saved, discord_id)
+        if self.index:
+            self.index.invalidate(discord_id)
+        logger.info("Saved %s memories for %s", len(kept), discord_id)
+        return len(kept)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def _bucket_bounds(start: float = 0.0005, factor: float = 1.25, limit: float = 120.0) -> tuple[float, ...]:
+    bounds: list[float] = []
+    bound = start
+    while bound < limit:
+        bounds.append(round(bound, 6))
+        bound *= factor
+    return tuple(bounds)
+
+
+# 0.5 ms .. ~120 sn, her kova öncekinin 1.25 katı (~55 kova). Yüzdelikler kova
+# içinde doğrusal interpolasyonla tahmin edilir; hata en fazla bir kova genişliği.
+LATENCY_BUCKETS = _bucket_bounds()
+
+
+class Histogram:
+    """Sabit kovalı histogram: observe() tek bisect + iki toplama, bellek sabit."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        # Son eleman +Inf kovası.
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if not n or seen + n < rank:
+                seen += n
+                continue
+            lower = self.bounds[i - 1] if i > 0 else 0.0
+            upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+            return lower + (upper - lower) * ((rank - seen) / n)
+        return self.bounds[-1]
+
+
+class _StageTimer:
+    __slots__ = ("_hist", "_started")
+
+    def __init__(self, hist: Histogram) -> None:
+        self._hist = hist
+        self._started = 0.0
+
+    def __enter__(self) -> _StageTimer:
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._hist.observe(time.perf_counter() - self._started)
+
+
+class Metrics:
+    """
+    Process içi metrik kaydı. Aşama süreleri `with metrics.time("stage"):`
+    ile ölçülür, sayaçlar `metrics.inc("name")` ile artar. Başka
+    bileşenlerin kendi istatistikleri (cache hit vb.) collector olarak
+    bağlanır ve yalnız okuma anında toplanır; sıcak yolda ek iş yok.
+    """
+
+    def __init__(self) -> None:
+        self._stages: dict[str, Histogram] = {}
+        self._counters: dict[str, float] = {}
+        self._collectors: list[Callable[[], dict[str, float]]] = []
+        self.started_at = time.time()
+
+    def _stage(self, name: str) -> Histogram:
+        hist = self._stages.get(name)
+        if hist is None:
+            hist = self._stages[name] = Histogram()
+        return hist
+
+    def time(self, stage: str) -> _StageTimer:
+        return _StageTimer(self._stage(stage))
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self._stage(stage).observe(seconds)
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def add_collector(self, collector: Callable[[], dict[str, float]]) -> None:
+        self._collectors.append(collector)
+
+    def counters(self) -> dict[str, float]:
+        values = dict(self._counters)
+        for collector in self._collectors:
+            try:
+                values.update(collector())
+            except Exception:
+                logger.exception("metrics collector failed")
+        return values
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self._counters.clear()
+        self.started_at = time.time()
+
+    def render_text(self) -> str:
+        """Owner DM'i için kısa tablo (ms)."""
+        lines = [f"Süre: {time.time() - self.started_at:.0f} sn"]
+        if self._stages:
+            lines.append("stage              n      p50      p95      p99")
+            for name, hist in sorted(self._stages.items()):
+                lines.append(
+                    f"{name:16s} {hist.count:5d} "
+                    f"{hist.quantile(0.5) * 1000:8.1f} {hist.quantile(0.95) * 1000:8.1f} "
+                    f"{hist.quantile(0.99) * 1000:8.1f}"
+                )
+        for name, value in sorted(self.counters().items()):
+            lines.append(f"{name} = {value:g}")
+        return "\n".join(lines)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition formatı (0.0.4)."""
+        out: list[str] = []
+        if self._stages:
+            out.append("# HELP bot_stage_seconds Mesaj işleme aşamalarının süresi.")
+            out.append("# TYPE bot_stage_seconds histogram")
+            for name, hist in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, n in zip(hist.bounds, hist.counts):
+                    cumulative += n
+                    out.append(f'bot_stage_seconds_bucket{{stage="{name}",le="{bound:g}"}} {cumulative}')
+                out.append(f'bot_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {hist.count}')
+                out.append(f'bot_stage_seconds_sum{{stage="{name}"}} {hist.total:.6f}')
+                out.append(f'bot_stage_seconds_count{{stage="{name}"}} {hist.count}')
+        for name, value in sorted(self.counters().items()):
+            metric = f"bot_{name}"
+            out.append(f"# TYPE {metric} {'counter' if name.endswith('_total') else 'gauge'}")
+            out.append(f"{metric} {value:g}")
+        return "\n".join(out) + "\n"
+
+
+# Tüm modüller aynı kaydı kullanır (logging.getLogger gibi); process başına bir tane.
+metrics = Metrics()
+
+
+class MetricsServer:
+    """
+    Yalnız `GET /metrics` cevaplayan küçük bir HTTP sunucusu (asyncio,
+    ek bağımlılık yok). Varsayılan olarak yalnız localhost'a bağlanır.
+    """
+
+    def __init__(self, registry: Metrics, *, host: str = "127.0.0.1", port: int = 9464) -> None:
+        self._registry = registry
+        self._host = host
+        self._port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self._host, self._port)
+        logger.info("Metrics endpoint on http://%s:%s/metrics", self._host, self._port)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Header'lar okunup atılır; gövde beklenmez.
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/metrics", "/"):
+                status, body = "200 OK", self._registry.render_prometheus().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+FLAGS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS feature_flags (
+  name TEXT PRIMARY KEY,
+  value INTEGER NOT NULL,
+  updated_at REAL NOT NULL
+);
+"""
+
+
+class SharedFlagStore:
+    """
+    Process'ler arası paylaşılan bayraklar için küçük bir SQLite tablosu.
+    Aynı host'taki tüm shard process'leri aynı dosyayı kullanır.
+    """
+
+    def __init__(self, path: Path, *, busy_timeout_ms: int = 5000) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(FLAGS_SCHEMA_SQL)
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, bool]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, value FROM feature_flags").fetchall()
+        return {name: bool(value) for name, value in rows}
+
+    def save(self, name: str, value: bool) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO feature_flags(name, value, updated_at) VALUES(?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (name, int(value), time.time()),
+            )
+
+    def seed(self, defaults: dict[str, bool]) -> None:
+        """Tabloda olmayan bayrakları .env varsayılanlarıyla doldurur; var olanlara dokunmaz."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO feature_flags(name, value, updated_at) VALUES(?, ?, ?)",
+                [(name, int(value), time.time()) for name, value in defaults.items()],
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SharedFeatureFlags(dict):  # type: ignore[type-arg]
+    """
+    bot.features yerine geçen dict: okumalar yerel kopyadan (sıcak yol
+    değişmez), yazmalar hem yerel kopyaya hem store'a gider. Diğer
+    process'lerin değişiklikleri sync_interval aralıklarla çekilir.
+    """
+
+    def __init__(self, store: SharedFlagStore, defaults: dict[str, bool], *, sync_interval: float = 2.0) -> None:
+        store.seed(defaults)
+        super().__init__(defaults)
+        self.update(store.load())
+        self._store = store
+        self._sync_interval = sync_interval
+        self._task: asyncio.Task[None] | None = None
+
+    def __setitem__(self, name: str, value: bool) -> None:
+        super().__setitem__(name, value)
+        try:
+            self._store.save(name, bool(value))
+        except sqlite3.Error:
+            logger.exception("Failed to persist shared feature flag %s", name)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._sync_interval)
+            try:
+                latest = await asyncio.to_thread(self._store.load)
+            except sqlite3.Error:
+                logger.exception("Shared feature flag sync failed")
+                continue
+            # dict.update, __setitem__'ı çağırmaz; store'a geri yazılmaz.
+            self.update(latest)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._store.close()
+
+
+INVALIDATIONS_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS invalidations (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  scope TEXT NOT NULL,
+  key TEXT NOT NULL,
+  origin INTEGER NOT NULL,
+  created_at REAL NOT NULL
+);
+"""
+
+
+class SharedInvalidationStore:
+    """
+    Process'ler arası cache invalidation günlüğü; SharedFlagStore ile aynı
+    dosyada ayrı tablo. Satırlar yalnız eklenir, eskiler prune ile silinir.
+    """
+
+    def __init__(self, path: Path, *, busy_timeout_ms: int = 5000) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(INVALIDATIONS_SCHEMA_SQL)
+        self._lock = threading.Lock()
+
+    def last_seq(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()
+        return int(row[0])
+
+    def publish(self, rows: list[tuple[str, str]], *, origin: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO invalidations(scope, key, origin, created_at) VALUES(?, ?, ?, ?)",
+                    [(scope, key, origin, now) for scope, key in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def since(self, seq: int) -> list[tuple[int, str, str, int]]:
+        """seq'ten sonraki (seq, scope, key, origin) satırları."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, scope, key, origin FROM invalidations WHERE seq > ? ORDER BY seq",
+                (seq,),
+            ).fetchall()
+
+    def prune(self, older_than: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM invalidations WHERE created_at < ?", (older_than,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SharedInvalidations:
+    """
+    Bir process'teki invalidate'i diğer process'lerin yerel cache'lerine
+    taşır. publish() yalnız belleğe ekler (sıcak yolda I/O yok); sync
+    döngüsü biriken anahtarları store'a yazar, diğer process'lerin
+    yazdıklarını okuyup kapsamın handler'ını çağırır. Gecikme en fazla
+    yaklaşık sync_interval kadardır.
+    """
+
+    def __init__(
+        self,
+        store: SharedInvalidationStore,
+        *,
+        origin: int,
+        sync_interval: float = 2.0,
+        retention_seconds: float = 3600.0,
+    ) -> None:
+        self._store = store
+        self._origin = origin
+        self._sync_interval = sync_interval
+        self._retention = retention_seconds
+        # Başlamadan önceki invalidation'lar yerel cache boşken anlamsız.
+        self._seq = store.last_seq()
+        self._pending: dict[tuple[str, str], None] = {}
+        self._handlers: dict[str, Callable[[str], None]] = {}
+        self._next_prune = time.time() + retention_seconds
+        self._task: asyncio.Task[None] | None = None
+
+    def subscribe(self, scope: str, handler: Callable[[str], None]) -> None:
+        self._handlers[scope] = handler
+
+    def publish(self, scope: str, key: str) -> None:
+        self._pending[(scope, key)] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._sync_interval)
+            try:
+                await self.sync_once()
+            except sqlite3.Error:
+                logger.exception("Shared invalidation sync failed")
+
+    async def sync_once(self) -> None:
+        pending, self._pending = list(self._pending), {}
+        if pending:
+            try:
+                await asyncio.to_thread(self._store.publish, pending, origin=self._origin)
+            except BaseException:
+                # Bir sonraki turda yeniden yazılsın.
+                for item in pending:
+                    self._pending.setdefault(item, None)
+                raise
+        rows = await asyncio.to_thread(self._store.since, self._seq)
+        for seq, scope, key, origin in rows:
+            self._seq = seq
+            if origin == self._origin:
+                continue
+            handler = self._handlers.get(scope)
+            if handler is not None:
+                handler(key)
+        if time.time() >= self._next_prune:
+            self._next_prune = time.time() + self._retention
+            await asyncio.to_thread(self._store.prune, time.time() - self._retention)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Kapanmadan önce biriken invalidation'lar diğer process'lere ulaşsın.
+        if self._pending:
+            try:
+                await asyncio.to_thread(self._store.publish, list(self._pending), origin=self._origin)
+            except sqlite3.Error:
+                logger.exception("Failed to publish pending invalidations on shutdown")
+            self._pending.clear()
+        self._store.close()
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import unicodedata
+
+
+def fold_text(text: str) -> str:
+    """
+    Karşılaştırma için metni katlar: NFKC, küçük harf ve Türkçe
+    noktalı/noktasız i'lerin tek "i"ye indirgenmesi.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    # casefold() "İ"yi "i̇" yapar; Türkçe i'leri önce tek harfe indir.
+    text = text.replace("İ", "i").replace("I", "i").replace("ı", "i")
+    return text.casefold().replace("\u0307", "")
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+import json
+import logging
+from pathlib import Path
+import re
+import time
+
+import aiosqlite
+
+from src.text_normalize import fold_text
+from src.tools.web_search import SearchResult
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bu kelimeleri içeren sorgular hızlı eskir (skor, kur, fiyat...).
+# Desen normalize_query çıktısına göre yazıldı (ı -> i, küçük harf).
+_VOLATILE_TERMS = re.compile(
+    r"\b(skor\w*|canli|maç\w*|fiyat\w*|döviz|dolar|euro|altin|borsa|bitcoin|btc|hava durumu|son dakika|"
+    r"bugün|live|score|price|weather|today)\b"
+)
+
+CACHE_SCHEMA_SQL = """
+PRAGMA journal_mode=WAL;
+
+CREATE TABLE IF NOT EXISTS search_cache (
+  key TEXT PRIMARY KEY,
+  results TEXT NOT NULL,
+  expires_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache(expires_at);
+"""
+
+
+def normalize_query(query: str) -> str:
+    """
+    Aynı anlamdaki sorguları aynı anahtara indirger: NFKC, küçük harf,
+    Türkçe noktalı/noktasız i katlama, noktalama ve fazla boşluk temizliği.
+    """
+    text = re.sub(r"[^\w\s]", " ", fold_text(query))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+class SearchCache:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int,
+        volatile_ttl_seconds: int,
+        max_entries: int,
+        db_path: Path | None = None,
+    ) -> None:
+        self._ttl = float(ttl_seconds)
+        self._volatile_ttl = float(volatile_ttl_seconds)
+        self._max_entries = max(1, max_entries)
+        self._db_path = db_path
+        self._conn: aiosqlite.Connection | None = None
+        self._memory: OrderedDict[str, tuple[float, list[SearchResult]]] = OrderedDict()
+        self._puts_since_prune = 0
+        self.stats = CacheStats()
+
+    async def open(self) -> None:
+        if not self._db_path or self._conn:
+            return
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = await aiosqlite.connect(str(self._db_path))
+        await self._conn.execute("PRAGMA busy_timeout=5000")
+        await self._conn.executescript(CACHE_SCHEMA_SQL)
+        await self._prune_disk()
+
+    async def close(self) -> None:
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+
+    def ttl_for(self, normalized: str) -> float:
+        return self._volatile_ttl if _VOLATILE_TERMS.search(normalized) else self._ttl
+
+    @staticmethod
+    def _key(normalized: str, limit: int) -> str:
+        return f"{limit}:{normalized}"
+
+    async def get(self, *, query: str, limit: int) -> list[SearchResult] | None:
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        key = self._key(normalized, limit)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, results = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return results
+            del self._memory[key]
+
+        if self._conn:
+            try:
+                async with self._conn.execute(
+                    "SELECT results, expires_at FROM search_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ) as cursor:
+                    row = await cursor.fetchone()
+            except Exception:
+                logger.exception("search cache read failed")
+                row = None
+            if row:
+                results = [SearchResult(**item) for item in json.loads(row[0])]
+                self._remember(key, float(row[1]), results)
+                self.stats.disk_hits += 1
+                return results
+
+        self.stats.misses += 1
+        return None
+
+    async def put(self, *, query: str, limit: int, results: list[SearchResult]) -> None:
+        normalized = normalize_query(query)
+        if not normalized or not results:
+            return
+        key = self._key(normalized, limit)
+        expires_at = time.time() + self.ttl_for(normalized)
+        self._remember(key, expires_at, results)
+
+        if not self._conn:
+            return
+        try:
+            await self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache(key, results, expires_at) VALUES(?, ?, ?)",
+                (key, json.dumps([asdict(r) for r in results], ensure_ascii=False), expires_at),
+            )
+            await self._conn.commit()
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= 100:
+                await self._prune_disk()
+        except Exception:
+            logger.exception("search cache write failed")
+
+    def _remember(self, key: str, expires_at: float, results: list[SearchResult]) -> None:
+        self._memory[key] = (expires_at, results)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def _prune_disk(self) -> None:
+        if not self._conn:
+            return
+        self._puts_since_prune = 0
+        await self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (time.time(),))
+        await self._conn.commit()
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"hit={st.memory_hits}+{st.disk_hits}(disk) miss={st.misses} "
+            f"rate={st.hit_rate:.0%} entries={len(self._memory)} evicted={st.evictions}"
+        )
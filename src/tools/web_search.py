@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 import logging
-from typing import Any
+import time
+from typing import TYPE_CHECKING, Any
 
-import httpx
+from src.http_pool import HttpPool
+
+if TYPE_CHECKING:
+    from src.tools.search_cache import SearchCache
 
 
 logger = logging.getLogger(__name__)
@@ -18,6 +24,48 @@ class SearchResult:
     source: str
 
 
+SEARCH_MODES = ("sequential", "hedged", "race")
+
+SearchFn = Callable[..., Awaitable[list[SearchResult]]]
+
+
+@dataclass
+class ProviderStats:
+    """Provider başına kayan (EWMA) gecikme ve hata oranı."""
+
+    alpha: float = 0.2
+    prior_latency_ms: float = 1500.0
+    failure_penalty_ms: float = 3000.0
+    calls: int = 0
+    failures: int = 0
+    latency_ms: float | None = None
+    error_rate: float = 0.0
+
+    def record(self, *, ok: bool, elapsed_ms: float) -> None:
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+        # Başarısız çağrıların gecikmesi de önemli: 15 s timeout yiyen provider geriye düşmeli.
+        if self.latency_ms is None:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms += self.alpha * (elapsed_ms - self.latency_ms)
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def record_cancelled(self, *, elapsed_ms: float) -> None:
+        # Yarışı kaybeden çağrının süresi gerçek gecikme için alt sınırdır.
+        if self.latency_ms is None:
+            self.latency_ms = elapsed_ms
+        elif elapsed_ms > self.latency_ms:
+            self.latency_ms += self.alpha * (elapsed_ms - self.latency_ms)
+
+    def score(self) -> float:
+        # Beklenen "işe yarar sonuç" süresi; düşük olan önce denenir.
+        # Hızlı hata veren provider'ın ucuz görünmemesi için sabit ceza eklenir.
+        latency = self.latency_ms if self.latency_ms is not None else self.prior_latency_ms
+        return latency / max(0.05, 1.0 - self.error_rate) + self.error_rate * self.failure_penalty_ms
+
+
 class WebSearch:
     def __init__(
         self,
@@ -25,31 +73,120 @@ class WebSearch:
         brave_api_key: str | None,
         serper_api_key: str | None,
         tavily_api_key: str | None,
+        http: HttpPool,
+        mode: str = "hedged",
+        hedge_delay_ms: int = 1500,
+        cache: SearchCache | None = None,
     ) -> None:
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown web search mode: {mode}")
+        self._http = http
         self._brave_api_key = brave_api_key
         self._serper_api_key = serper_api_key
         self._tavily_api_key = tavily_api_key
+        self.mode = mode
+        self._hedge_delay = max(0, hedge_delay_ms) / 1000.0
+        self.cache = cache
+        self.stats: dict[str, ProviderStats] = {}
+
+    def _providers(self) -> list[tuple[str, SearchFn]]:
+        configured: list[tuple[str, SearchFn]] = []
+        if self._brave_api_key:
+            configured.append(("brave", self._brave_search))
+        if self._serper_api_key:
+            configured.append(("serper", self._serper_search))
+        if self._tavily_api_key:
+            configured.append(("tavily", self._tavily_search))
+        for name, _ in configured:
+            self.stats.setdefault(name, ProviderStats())
+        # sorted() stabil: hiç denenmemiş provider'lar varsayılan sırayı korur.
+        return sorted(configured, key=lambda p: self.stats[p[0]].score())
 
     async def search(self, *, query: str, limit: int = 5) -> list[SearchResult]:
         query = (query or "").strip()
         if not query:
             return []
 
-        providers = [
-            ("brave", self._brave_search),
-            ("serper", self._serper_search),
-            ("tavily", self._tavily_search),
-        ]
-
-        for name, fn in providers:
-            try:
-                results = await fn(query=query, limit=limit)
-            except Exception:
-                logger.exception("web_search provider failed: %s", name)
-                continue
-            if results:
-                return results
+        if self.cache:
+            cached = await self.cache.get(query=query, limit=limit)
+            if cached is not None:
+                return cached
 
+        results = await self._search_providers(query=query, limit=limit)
+        if results and self.cache:
+            await self.cache.put(query=query, limit=limit, results=results)
+        return results
+
+    async def _search_providers(self, *, query: str, limit: int) -> list[SearchResult]:
+        providers = self._providers()
+        if not providers:
+            return []
+
+        if self.mode == "sequential":
+            for name, fn in providers:
+                results = await self._call(name, fn, query=query, limit=limit)
+                if results:
+                    return results
+            return []
+
+        hedge_delay = 0.0 if self.mode == "race" else self._hedge_delay
+        return await self._hedged(providers, query=query, limit=limit, hedge_delay=hedge_delay)
+
+    async def _call(self, name: str, fn: SearchFn, *, query: str, limit: int) -> list[SearchResult]:
+        started = time.perf_counter()
+        try:
+            results = await fn(query=query, limit=limit)
+        except asyncio.CancelledError:
+            # Yarışı kaybetti; hata sayılmaz ama gecikme bilgisi kullanılır.
+            self.stats[name].record_cancelled(elapsed_ms=(time.perf_counter() - started) * 1000.0)
+            raise
+        except Exception:
+            logger.exception("web_search provider failed: %s", name)
+            results = []
+        self.stats[name].record(ok=bool(results), elapsed_ms=(time.perf_counter() - started) * 1000.0)
+        return results
+
+    async def _hedged(
+        self,
+        providers: list[tuple[str, SearchFn]],
+        *,
+        query: str,
+        limit: int,
+        hedge_delay: float,
+    ) -> list[SearchResult]:
+        """
+        En iyi provider'ı başlatır; hedge_delay içinde sonuç gelmezse ya da
+        provider boş/başarısız dönerse sıradakini de başlatır. İlk boş olmayan
+        sonuç kazanır, kalanlar iptal edilir. hedge_delay=0 hepsini aynı anda başlatır.
+        """
+        waiting = list(providers)
+        pending: set[asyncio.Task[list[SearchResult]]] = set()
+        launch = True
+        try:
+            while waiting or pending:
+                if launch:
+                    batch = waiting if hedge_delay <= 0 else waiting[:1]
+                    for name, fn in batch:
+                        pending.add(asyncio.create_task(self._call(name, fn, query=query, limit=limit)))
+                    del waiting[: len(batch)]
+                    launch = False
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=hedge_delay if waiting and hedge_delay > 0 else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                # Zaman aşımı (hedge) ya da boş/başarısız sonuç -> sıradakini başlat.
+                launch = True
+                for task in done:
+                    results = task.result()
+                    if results:
+                        return results
+        finally:
+            for task in pending:
+                task.cancel()
+            # İptal edilenler bitene kadar beklenir: bağlantıları havuza döner, istatistikleri yazılır.
+            await asyncio.gather(*pending, return_exceptions=True)
         return []
 
     async def _brave_search(self, *, query: str, limit: int) -> list[SearchResult]:
@@ -58,10 +195,9 @@ class WebSearch:
         url = "https://api.search.brave.com/res/v1/web/search"
         headers = {"X-Subscription-Token": self._brave_api_key}
         params = {"q": query, "count": str(limit)}
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.get(url, headers=headers, params=params)
-            r.raise_for_status()
-            data = r.json()
+        r = await self._http.client("brave").get(url, headers=headers, params=params)
+        r.raise_for_status()
+        data = r.json()
         web = data.get("web", {}) if isinstance(data, dict) else {}
         results = web.get("results", []) if isinstance(web, dict) else []
         out: list[SearchResult] = []
@@ -84,10 +220,9 @@ class WebSearch:
         url = "https://google.serper.dev/search"
         headers = {"X-API-KEY": self._serper_api_key, "Content-Type": "application/json"}
         payload = {"q": query, "num": limit}
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.post(url, headers=headers, json=payload)
-            r.raise_for_status()
-            data = r.json()
+        r = await self._http.client("serper").post(url, headers=headers, json=payload)
+        r.raise_for_status()
+        data = r.json()
         organic = data.get("organic", []) if isinstance(data, dict) else []
         out: list[SearchResult] = []
         for item in organic[:limit]:
@@ -108,10 +243,9 @@ class WebSearch:
             return []
         url = "https://api.tavily.com/search"
         payload = {"api_key": self._tavily_api_key, "query": query, "max_results": limit}
-        async with httpx.AsyncClient(timeout=20) as client:
-            r = await client.post(url, json=payload)
-            r.raise_for_status()
-            data: Any = r.json()
+        r = await self._http.client("tavily").post(url, json=payload)
+        r.raise_for_status()
+        data: Any = r.json()
         results = data.get("results", []) if isinstance(data, dict) else []
         out: list[SearchResult] = []
         for item in results[:limit]:
@@ -126,3 +260,12 @@ class WebSearch:
                 )
             )
         return [r for r in out if r.url]
+
+    def summary(self) -> str:
+        if not self.stats:
+            return f"{self.mode}, provider yok"
+        parts = []
+        for name, st in sorted(self.stats.items(), key=lambda item: item[1].score()):
+            latency = f"{st.latency_ms:.0f}ms" if st.latency_ms is not None else "-"
+            parts.append(f"{name}: calls={st.calls} fail={st.failures} ewma={latency} err={st.error_rate:.2f}")
+        return f"{self.mode}; " + ", ".join(parts)
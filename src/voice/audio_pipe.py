@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+
+
+class AudioPipe:
+    """
+    Event loop'tan parça parça beslenen, discord.py'nin ffmpeg stdin writer
+    thread'inin read() ile tükettiği sınırlı tampon. Kuyruk doluysa besleyen
+    taraf bekler; bellek kullanımı klip uzunluğundan bağımsızdır.
+    """
+
+    def __init__(self, *, max_chunks: int = 16) -> None:
+        self._queue: queue.Queue[bytes | None] = queue.Queue(maxsize=max(1, max_chunks))
+        self._leftover = b""
+        self._eof = False
+        self._abandoned = False
+
+    # --- ffmpeg writer thread tarafı ---
+
+    def read(self, size: int = -1) -> bytes:
+        if self._eof:
+            return b""
+        if not self._leftover:
+            item = self._queue.get()
+            if item is None:
+                self._eof = True
+                return b""
+            self._leftover = item
+        n = len(self._leftover) if size < 0 else size
+        out, self._leftover = self._leftover[:n], self._leftover[n:]
+        return out
+
+    # --- event loop tarafı ---
+
+    async def feed(self, chunk: bytes) -> bool:
+        """Parçayı kuyruğa koyar; okuyan taraf bıraktıysa False döner."""
+        if self._abandoned:
+            return False
+        if chunk:
+            await self._put(chunk)
+        return not self._abandoned
+
+    async def finish(self) -> None:
+        await self._put(None)
+
+    def abandon(self) -> None:
+        """Oynatma bitti/iptal edildi: besleyen tarafı serbest bırak."""
+        self._abandoned = True
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    async def _put(self, item: bytes | None) -> None:
+        try:
+            self._queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        await asyncio.to_thread(self._put_blocking, item)
+
+    def _put_blocking(self, item: bytes | None) -> None:
+        while not self._abandoned:
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
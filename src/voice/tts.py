@@ -1,27 +1,115 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+import logging
 import uuid
 from pathlib import Path
 
-import httpx
+from src.http_pool import HttpPool
+from src.voice.audio_pipe import AudioPipe
+from src.voice.tts_cache import TTSCache, normalize_tts_text
+
+
+logger = logging.getLogger(__name__)
 
 
 class ElevenLabsTTS:
-    def __init__(self, *, api_key: str, voice_id: str):
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        voice_id: str,
+        http: HttpPool,
+        model_id: str | None = None,
+        cache: TTSCache | None = None,
+    ):
+        self._http = http
         self._api_key = api_key
         self._voice_id = voice_id
+        self._model_id = model_id
+        self.cache = cache
 
-    async def synthesize_to_mp3(self, *, text: str, out_dir: Path) -> Path:
-        out_dir.mkdir(parents=True, exist_ok=True)
-        file_path = out_dir / f"tts_{uuid.uuid4().hex}.mp3"
+    def _model_settings(self) -> dict[str, object]:
+        # Sesi etkileyen her şey cache anahtarına girmeli.
+        return {"model_id": self._model_id} if self._model_id else {}
 
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self._voice_id}"
+    def _request(self, text: str) -> tuple[dict[str, str], dict[str, object]]:
         headers = {"xi-api-key": self._api_key, "Content-Type": "application/json"}
-        payload = {"text": text}
+        payload: dict[str, object] = {"text": text, **self._model_settings()}
+        return headers, payload
+
+    def cache_key(self, *, text: str) -> str:
+        return TTSCache.make_key(voice_id=self._voice_id, model_settings=self._model_settings(), text=text)
+
+    def cached_path(self, *, text: str) -> Path | None:
+        if not self.cache:
+            return None
+        return self.cache.get(self.cache_key(text=text))
 
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(url, headers=headers, json=payload)
+    async def synthesize(self, *, text: str) -> bytes:
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self._voice_id}"
+        headers, payload = self._request(text)
+        r = await self._http.client("elevenlabs").post(url, headers=headers, json=payload)
+        r.raise_for_status()
+        return r.content
+
+    async def stream(self, *, text: str, chunk_size: int = 4096) -> AsyncIterator[bytes]:
+        url = f"https://api.elevenlabs.io/v1/text-to-speech/{self._voice_id}/stream"
+        headers, payload = self._request(text)
+        async with self._http.client("elevenlabs").stream("POST", url, headers=headers, json=payload) as r:
             r.raise_for_status()
-            file_path.write_bytes(r.content)
+            async for chunk in r.aiter_bytes(chunk_size):
+                yield chunk
 
+    async def synthesize_to_mp3(self, *, text: str, out_dir: Path) -> Path:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        file_path = out_dir / f"tts_{uuid.uuid4().hex}.mp3"
+        data = await self.synthesize(text=text)
+        await asyncio.to_thread(file_path.write_bytes, data)
         return file_path
+
+    async def synthesize_to_cache(self, *, text: str) -> Path:
+        if not self.cache:
+            raise RuntimeError("TTS cache not configured")
+        text = normalize_tts_text(text)
+        data = await self.synthesize(text=text)
+        return await self.cache.put(self.cache_key(text=text), data)
+
+    async def synthesize_cached(self, *, text: str) -> Path:
+        """Cache'te varsa API'ye gitmeden dosyayı döndürür; yoksa üretip cache'e yazar."""
+        path = self.cached_path(text=text)
+        if path is not None:
+            return path
+        return await self.synthesize_to_cache(text=text)
+
+    async def stream_into(self, *, text: str, pipe: AudioPipe) -> None:
+        """
+        Streaming cevabı parça parça pipe'a aktarır. Cache açıksa aynı parçalar
+        thread'de diske de yazılır ve stream tamamlanınca cache'e eklenir.
+        Her durumda pipe kapatılır ki ffmpeg EOF görsün.
+        """
+        text = normalize_tts_text(text)
+        key = self.cache_key(text=text)
+        partial = self.cache.partial_path(key) if self.cache else None
+        handle = await asyncio.to_thread(partial.open, "wb") if partial else None
+        complete = False
+        try:
+            # Erken dönüşte generator hemen kapansın ki HTTP stream'i bağlantıyı havuza bıraksın.
+            async with contextlib.aclosing(self.stream(text=text)) as chunks:
+                async for chunk in chunks:
+                    if handle:
+                        await asyncio.to_thread(handle.write, chunk)
+                    if not await pipe.feed(chunk):
+                        # Oynatma kesildi; yarım dosyayı cache'e koyma.
+                        return
+            complete = True
+        finally:
+            await pipe.finish()
+            if handle and partial:
+                await asyncio.to_thread(handle.close)
+                if complete and self.cache:
+                    self.cache.commit_partial(key, partial)
+                else:
+                    partial.unlink(missing_ok=True)
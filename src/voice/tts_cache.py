@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import time
+import uuid
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_tts_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+@dataclass
+class TTSCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes_saved: int = 0
+
+
+class TTSCache:
+    """
+    İçerik adresli mp3 cache'i: anahtar (voice_id, model ayarları, normalize metin)
+    hash'idir. Toplam boyut max_bytes'ı aşınca en uzun süre kullanılmayan
+    dosyalar silinir. Kullanım zamanı dosya mtime'ında tutulur, restart'ta korunur.
+    """
+
+    def __init__(self, *, root: Path, max_bytes: int) -> None:
+        self._root = root
+        self._max_bytes = max(0, max_bytes)
+        # key -> (size, last_used)
+        self._index: dict[str, tuple[int, float]] = {}
+        self._total_bytes = 0
+        self._loaded = False
+        self.stats = TTSCacheStats()
+
+    @staticmethod
+    def make_key(*, voice_id: str, model_settings: dict[str, object], text: str) -> str:
+        material = json.dumps(
+            {"voice": voice_id, "model": model_settings, "text": normalize_tts_text(text)},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self._root / f"{key}.mp3"
+
+    def _load_index(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self._root.mkdir(parents=True, exist_ok=True)
+        for path in self._root.glob("*.mp3"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            self._index[path.stem] = (st.st_size, st.st_mtime)
+            self._total_bytes += st.st_size
+
+    def get(self, key: str) -> Path | None:
+        self._load_index()
+        entry = self._index.get(key)
+        path = self._path(key)
+        if entry is None or not path.exists():
+            if entry is not None:
+                self._forget(key)
+            self.stats.misses += 1
+            return None
+
+        now = time.time()
+        self._index[key] = (entry[0], now)
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        self.stats.hits += 1
+        self.stats.bytes_saved += entry[0]
+        return path
+
+    async def put(self, key: str, data: bytes) -> Path:
+        self._load_index()
+        path = self._path(key)
+        await asyncio.to_thread(self._write_atomic, path, data)
+        self._record(key, len(data))
+        return path
+
+    def partial_path(self, key: str) -> Path:
+        """Stream sırasında parça parça yazılacak dosya; bitince commit_partial ile yerine konur."""
+        self._load_index()
+        return self._root / f"{key}.{uuid.uuid4().hex}.part"
+
+    def commit_partial(self, key: str, partial: Path) -> Path:
+        path = self._path(key)
+        os.replace(partial, path)
+        self._record(key, path.stat().st_size)
+        return path
+
+    def _record(self, key: str, size: int) -> None:
+        self._forget(key)
+        self._index[key] = (size, time.time())
+        self._total_bytes += size
+        self._evict(keep=key)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.part")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _forget(self, key: str) -> None:
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[0]
+
+    def _evict(self, *, keep: str) -> None:
+        if self._total_bytes <= self._max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self._max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                self._path(key).unlink(missing_ok=True)
+            except OSError:
+                logger.exception("Failed to evict tts cache file: %s", key)
+                continue
+            self._forget(key)
+            self.stats.evictions += 1
+
+    def summary(self) -> str:
+        self._load_index()
+        st = self.stats
+        return (
+            f"hit={st.hits} miss={st.misses} files={len(self._index)} "
+            f"size={self._total_bytes / 1_048_576:.1f}/{self._max_bytes / 1_048_576:.0f}MB evicted={st.evictions}"
+        )
@@ -6,11 +6,17 @@ from pathlib import Path
 
 import discord
 
+from src.http_pool import HttpPool
+from src.metrics import metrics
+from src.voice.audio_pipe import AudioPipe
 from src.voice.tts import ElevenLabsTTS
+from src.voice.tts_cache import TTSCache
 
 
 logger = logging.getLogger(__name__)
 
+GREETING_TEMPLATE = "Selam patron. {bot_name} hatta."
+
 
 class VoiceManager:
     def __init__(
@@ -19,12 +25,43 @@ class VoiceManager:
         bot: discord.Client,
         elevenlabs_api_key: str | None,
         elevenlabs_voice_id: str | None,
+        http: HttpPool,
+        elevenlabs_model_id: str | None = None,
+        cache: TTSCache | None = None,
+        streaming: bool = False,
     ) -> None:
         self._bot = bot
         self._lock = asyncio.Lock()
+        self._streaming = streaming
         self._tts: ElevenLabsTTS | None = None
         if elevenlabs_api_key and elevenlabs_voice_id:
-            self._tts = ElevenLabsTTS(api_key=elevenlabs_api_key, voice_id=elevenlabs_voice_id)
+            self._tts = ElevenLabsTTS(
+                api_key=elevenlabs_api_key,
+                voice_id=elevenlabs_voice_id,
+                http=http,
+                model_id=elevenlabs_model_id,
+                cache=cache,
+            )
+
+    @property
+    def cache(self) -> TTSCache | None:
+        return self._tts.cache if self._tts else None
+
+    async def warm_cache(self, phrases: list[str]) -> None:
+        """Sabit cümleleri önceden sentezler; sonraki speak() çağrıları diskten çalar."""
+        if not self._tts or not self._tts.cache:
+            return
+        warmed = 0
+        for phrase in phrases:
+            if not phrase.strip():
+                continue
+            try:
+                await self._tts.synthesize_cached(text=phrase[:400])
+                warmed += 1
+            except Exception:
+                logger.exception("TTS cache warm failed: %s", phrase)
+        if warmed:
+            logger.info("TTS cache warmed with %s phrases", warmed)
 
     async def join(self, channel: discord.VoiceChannel) -> discord.VoiceClient:
         vc = channel.guild.voice_client
@@ -53,21 +90,57 @@ class VoiceManager:
             return
 
         async with self._lock:
-            out_dir = Path("data") / "tts"
-            mp3_path = await self._tts.synthesize_to_mp3(text=text, out_dir=out_dir)
+            # Sentez + oynatmanın tamamı; cache'ten çalınan cümleler kısa görünür.
+            with metrics.time("tts"):
+                cached_path = self._tts.cached_path(text=text)
+                if cached_path is not None:
+                    await self._play(vc, discord.FFmpegPCMAudio(str(cached_path)))
+                    return
+
+                if self._streaming:
+                    await self._speak_streaming(vc, text)
+                    return
 
-            loop = asyncio.get_running_loop()
-            done: asyncio.Future[Exception | None] = loop.create_future()
+                if self._tts.cache is not None:
+                    mp3_path = await self._tts.synthesize_to_cache(text=text)
+                    await self._play(vc, discord.FFmpegPCMAudio(str(mp3_path)))
+                    return
 
-            def _after(err: Exception | None) -> None:
-                loop.call_soon_threadsafe(done.set_result, err)
+                mp3_path = await self._tts.synthesize_to_mp3(text=text, out_dir=Path("data") / "tts")
+                try:
+                    await self._play(vc, discord.FFmpegPCMAudio(str(mp3_path)))
+                finally:
+                    try:
+                        mp3_path.unlink(missing_ok=True)
+                    except Exception:
+                        logger.exception("Failed to delete tts file: %s", mp3_path)
 
-            source = discord.FFmpegPCMAudio(str(mp3_path))
-            vc.play(source, after=_after)
-            err = await done
+    async def _speak_streaming(self, vc: discord.VoiceClient, text: str) -> None:
+        # ffmpeg hemen başlar ve stdin'den okur; ilk birkaç KB gelince ses çıkar.
+        assert self._tts is not None
+        pipe = AudioPipe()
+        feeder = asyncio.create_task(self._tts.stream_into(text=text, pipe=pipe))
+        try:
+            await self._play(vc, discord.FFmpegPCMAudio(pipe, pipe=True))  # type: ignore[arg-type]
+        finally:
+            # Oynatma erken bittiyse besleyen taraf kısa sürede çıkar; takılırsa iptal et.
+            pipe.abandon()
             try:
-                mp3_path.unlink(missing_ok=True)
+                await asyncio.wait_for(feeder, timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("TTS stream feeder did not finish; cancelled")
             except Exception:
-                logger.exception("Failed to delete tts file: %s", mp3_path)
-            if err:
-                raise err
+                # Ses zaten çaldı (ya da oynatma hatası yukarı çıkıyor); HTTP hatası yalnız loglanır.
+                logger.exception("TTS stream feeder failed")
+
+    async def _play(self, vc: discord.VoiceClient, source: discord.AudioSource) -> None:
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future[Exception | None] = loop.create_future()
+
+        def _after(err: Exception | None) -> None:
+            loop.call_soon_threadsafe(done.set_result, err)
+
+        vc.play(source, after=_after)
+        err = await done
+        if err:
+            raise err
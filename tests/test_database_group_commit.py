@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.memory.database import Database
+
+
+def _db(path: Path, durability: str) -> Database:
+    # Buffer kapalı: okumalar doğrudan SQLite'tan gelsin.
+    return Database(path=path, durability=durability, history_cache_mb=0)
+
+
+async def _add(db: Database, discord_id: str, n: int) -> None:
+    await db.add_conversation(
+        discord_id=discord_id, channel_id="c", message_id=f"{discord_id}-{n}", role="user", content=f"tur {n}"
+    )
+
+
+def test_group_commit_batches_concurrent_writers(tmp_path: Path) -> None:
+    async def main() -> None:
+        db = _db(tmp_path / "bot.db", "group")
+        await db.connect()
+        try:
+            await db.touch_user(discord_id="u1", username="u1", display_name="u1")
+            before = db.write_stats.flushes
+            await asyncio.gather(*(_add(db, "u1", i) for i in range(50)))
+            # Hepsi aynı anda kuyruğa girdi; her biri ayrı commit beklemedi.
+            assert db.write_stats.flushes - before < 50
+            assert db.write_stats.max_batch > 1
+            rows = await db.get_recent_conversation(discord_id="u1", limit=100)
+            assert [r.content for r in rows] == [f"tur {i}" for i in range(50)]
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+
+def test_group_commit_failed_row_does_not_drop_batch(tmp_path: Path) -> None:
+    async def main() -> None:
+        db = _db(tmp_path / "bot.db", "group")
+        await db.connect()
+        try:
+            await db.touch_user(discord_id="u1", username="u1", display_name="u1")
+            # "ghost" users'ta yok: foreign key hatası yalnız kendi çağıranına döner.
+            results = await asyncio.gather(_add(db, "u1", 0), _add(db, "ghost", 0), _add(db, "u1", 1), return_exceptions=True)
+            assert results[0] is None and results[2] is None
+            assert isinstance(results[1], Exception)
+            rows = await db.get_recent_conversation(discord_id="u1", limit=10)
+            assert [r.content for r in rows] == ["tur 0", "tur 1"]
+        finally:
+            await db.close()
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("durability", ["group", "relaxed"])
+def test_close_flushes_queued_writes(tmp_path: Path, durability: str) -> None:
+    path = tmp_path / "bot.db"
+
+    async def write() -> None:
+        db = _db(path, durability)
+        await db.connect()
+        await db.touch_user(discord_id="u1", username="u1", display_name="u1")
+        # Commit beklenmeden kapanış başlar; kuyruktaki her satır yazılmalı.
+        tasks = [asyncio.create_task(_add(db, "u1", i)) for i in range(100)]
+        await asyncio.sleep(0)
+        await db.close()
+        await asyncio.gather(*tasks)
+
+    async def read() -> list[str]:
+        db = _db(path, durability)
+        await db.connect()
+        try:
+            return [r.content for r in await db.get_recent_conversation(discord_id="u1", limit=200)]
+        finally:
+            await db.close()
+
+    asyncio.run(write())
+    assert asyncio.run(read()) == [f"tur {i}" for i in range(100)]
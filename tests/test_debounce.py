@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.bot import debounce
+from src.bot.debounce import BurstCoalescer
+
+
+def test_cancelled_owner_hands_extraction_to_final_reply() -> None:
+    async def run() -> tuple[list[str] | None, bool]:
+        coalescer = BurstCoalescer(window_ms=10)
+        key = ("u", "c")
+        first_started = asyncio.Event()
+
+        async def first() -> None:
+            await coalescer.collect(key, "a", extract_due=True)
+            first_started.set()
+            await asyncio.sleep(10)  # cevap üretimi; ikinci mesaj iptal eder
+            coalescer.commit(key)
+
+        owner = asyncio.create_task(first())
+        await first_started.wait()
+        texts = await coalescer.collect(key, "b")
+        await asyncio.gather(owner, return_exceptions=True)
+        assert owner.cancelled()
+        return texts, coalescer.commit(key)
+
+    texts, extract_due = asyncio.run(run())
+    assert texts == ["a", "b"]
+    assert extract_due
+
+
+def test_commit_without_trigger_returns_false() -> None:
+    async def run() -> bool:
+        coalescer = BurstCoalescer(window_ms=0)
+        await coalescer.collect(("u", "c"), "a")
+        return coalescer.commit(("u", "c"))
+
+    assert asyncio.run(run()) is False
+
+
+def test_abandoned_bursts_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(debounce.time, "monotonic", lambda: now[0])
+
+    async def run() -> BurstCoalescer:
+        coalescer = BurstCoalescer(window_ms=0, idle_seconds=60)
+        # Sahibi commit etmeden biter (ör. erken dönüş).
+        await asyncio.create_task(coalescer.collect(("u1", "c"), "a"))
+        now[0] += 61
+        await coalescer.collect(("u2", "c"), "b")
+        return coalescer
+
+    coalescer = asyncio.run(run())
+    assert coalescer.stats.expired == 1
+    assert "open=1" in coalescer.summary()
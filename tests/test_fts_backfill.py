@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from pathlib import Path
+
+from src.memory.database import Database
+
+
+def _legacy_db(path: Path, rows: int) -> None:
+    """FTS index'i eklenmeden önce dolmuş bir veritabanı."""
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO users(discord_id) VALUES(?)", [(str(i),) for i in range(5)])
+    conn.executemany(
+        "INSERT INTO conversations(discord_id, channel_id, message_id, role, content) VALUES(?, ?, ?, ?, ?)",
+        [(str(i % 5), "c", str(i), "user", f"merhaba kedi {i}") for i in range(rows)],
+    )
+    for table in ("conversations", "memories"):
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER {table}_fts_{suffix}")
+        conn.execute(f"DROP TABLE {table}_fts")
+    conn.commit()
+    conn.close()
+
+
+def test_concurrent_processes_backfill_each_row_once(tmp_path: Path) -> None:
+    path = tmp_path / "bot.db"
+
+    async def run() -> list[int]:
+        db = Database(path=path, durability="strict", history_cache_mb=0)
+        await db.connect()
+        await db.close()
+        _legacy_db(path, 600)
+        # Sharded modda her process kendi bağlantısıyla aynı anda açılır.
+        dbs = [Database(path=path, durability="strict", history_cache_mb=0) for _ in range(3)]
+        await asyncio.gather(*(d.connect() for d in dbs))
+        try:
+            return list(
+                await asyncio.gather(*(d.backfill_fts(chunk_size=50, pause_seconds=0.001) for d in dbs))
+            )
+        finally:
+            for d in dbs:
+                await d.close()
+
+    totals = asyncio.run(run())
+    assert sum(totals) == 600
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("INSERT INTO conversations_fts(conversations_fts, rank) VALUES('integrity-check', 1)")
+        (matches,) = conn.execute("SELECT COUNT(*) FROM conversations_fts WHERE conversations_fts MATCH 'kedi'").fetchone()
+        meta = conn.execute("SELECT key FROM schema_meta WHERE key LIKE '%fts_backfill%'").fetchall()
+    finally:
+        conn.close()
+    assert matches == 600
+    assert meta == []
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from src.memory.history import HistoryRow, RecentHistoryCache
+
+
+def _rows(*contents: str) -> list[HistoryRow]:
+    return [HistoryRow(f"m{i}", "user", c) for i, c in enumerate(contents)]
+
+
+def _contents(cache: RecentHistoryCache, discord_id: str, limit: int = 10) -> list[str] | None:
+    rows = cache.recent(discord_id, limit=limit)
+    return None if rows is None else [r.content for r in rows]
+
+
+def test_miss_then_load_then_append() -> None:
+    cache = RecentHistoryCache(turns=5)
+    assert cache.recent("u", limit=3) is None
+    token = cache.begin_load("u")
+    cache.finish_load("u", token, _rows("a", "b"))
+    # DB'de turns'ten az satır var: buffer tam, limit'ten az dönmesi yeterli.
+    assert _contents(cache, "u") == ["a", "b"]
+    cache.append("u", message_id="m2", role="assistant", content="c")
+    assert _contents(cache, "u") == ["a", "b", "c"]
+
+
+def test_ring_buffer_drops_oldest_and_becomes_incomplete() -> None:
+    cache = RecentHistoryCache(turns=3)
+    token = cache.begin_load("u")
+    cache.finish_load("u", token, _rows("a", "b"))
+    cache.append("u", message_id="x", role="user", content="c")
+    cache.append("u", message_id="y", role="user", content="d")
+    assert _contents(cache, "u", limit=3) == ["b", "c", "d"]
+    # En eski satır düştü; daha fazlası istenirse DB'ye gidilmeli.
+    assert cache.recent("u", limit=4) is None
+
+
+def test_write_during_load_discards_stale_result() -> None:
+    cache = RecentHistoryCache(turns=5)
+    token = cache.begin_load("u")
+    cache.append("u", message_id="new", role="user", content="yeni")
+    cache.finish_load("u", token, _rows("a"))
+    assert cache.recent("u", limit=1) is None
+
+
+def test_second_loader_does_not_hide_earlier_write() -> None:
+    cache = RecentHistoryCache(turns=5)
+    stale = cache.begin_load("u")
+    cache.append("u", message_id="new", role="user", content="yeni")
+    fresh = cache.begin_load("u")
+    # İlk yükleyici yazmadan önce okumuştu; ikinci begin_load onu temize çıkarmamalı.
+    cache.finish_load("u", stale, _rows("a"))
+    assert cache.recent("u", limit=1) is None
+    cache.finish_load("u", fresh, _rows("a", "yeni"))
+    assert _contents(cache, "u") == ["a", "yeni"]
+
+
+def test_invalidate_during_load_discards_result() -> None:
+    cache = RecentHistoryCache(turns=5)
+    token = cache.begin_load("u")
+    cache.invalidate("u")
+    cache.finish_load("u", token, _rows("a"))
+    assert cache.recent("u", limit=1) is None
+
+
+def test_abort_load_clears_state() -> None:
+    cache = RecentHistoryCache(turns=5)
+    cache.begin_load("u")
+    cache.abort_load("u")
+    token = cache.begin_load("u")
+    cache.finish_load("u", token, _rows("a"))
+    assert _contents(cache, "u") == ["a"]
+
+
+def test_evicts_least_recently_used_over_budget() -> None:
+    row_bytes = HistoryRow(None, "user", "x" * 100).nbytes
+    cache = RecentHistoryCache(turns=5, max_bytes=row_bytes * 2)
+    for user in ("a", "b", "c"):
+        token = cache.begin_load(user)
+        cache.finish_load(user, token, [HistoryRow(None, "user", "x" * 100)])
+    assert cache.recent("a", limit=1) is None
+    assert cache.recent("c", limit=1) is not None
+    assert cache.stats.evictions == 1
+
+
+def test_after_id_filters_buffer_without_db() -> None:
+    cache = RecentHistoryCache(turns=4)
+    token = cache.begin_load("u")
+    cache.finish_load("u", token, [HistoryRow(f"m{i}", "user", f"t{i}", row_id=i) for i in range(10, 14)])
+    pending = cache.append("u", message_id="m14", role="user", content="t14")
+    assert pending is not None and pending.id is None
+    # Buffer 11..13'ü ve commit bekleyen satırı tutuyor; 11'den sonrası tamamen içinde.
+    rows = cache.recent("u", limit=10, after_id=11)
+    assert rows is not None and [r.content for r in rows] == ["t12", "t13", "t14"]
+    # 5'ten sonrasının bir kısmı buffer'dan düştü: DB'ye gidilmeli.
+    assert cache.recent("u", limit=10, after_id=5) is None
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.http_pool import HttpPool
+
+
+def _pool() -> HttpPool:
+    return HttpPool(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+
+
+def test_client_is_reused_until_closed() -> None:
+    async def run() -> None:
+        pool = _pool()
+        pool.open()
+        first = pool.client("brave")
+        assert pool.client("brave") is first
+        await pool.aclose()
+        assert first.is_closed
+        with pytest.raises(RuntimeError):
+            pool.client("brave")
+
+    asyncio.run(run())
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from bench.injection_filter import BENIGN, EVASIONS
+from src.ai.injection_filter import InjectionFilter
+
+
+@pytest.fixture(scope="module")
+def injection_filter() -> InjectionFilter:
+    return InjectionFilter()
+
+
+@pytest.mark.parametrize("text", BENIGN)
+def test_benign_corpus_has_no_false_positives(injection_filter: InjectionFilter, text: str) -> None:
+    assert injection_filter.match(text) is None
+
+
+@pytest.mark.parametrize("text", EVASIONS)
+def test_evasions_are_blocked(injection_filter: InjectionFilter, text: str) -> None:
+    assert injection_filter.match(text) is not None
+
+
+def test_filter_keeps_user_text_intact(injection_filter: InjectionFilter) -> None:
+    # ZWJ emoji dizisi yalnız eşleştirme formundan silinir.
+    res = injection_filter.filter("aile 👨‍👩‍👧  fotoğrafı")
+    assert res.allowed and res.text_or_reason == "aile 👨‍👩‍👧 fotoğrafı"
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from src.ai.prompt_builder import PromptSection, build_prompt, estimate_tokens, fit_sections
+
+
+def test_recent_turns_keep_newest_under_tight_budget() -> None:
+    turns = [f"user: tur {i} " + "x" * 60 for i in range(10)]
+    section = PromptSection("RECENT_TURNS", tuple(turns), priority=2, newest_last=True)
+    budget = estimate_tokens("[RECENT_TURNS]\n\n") + 3 * (estimate_tokens(turns[0]) + 1)
+    kept = fit_sections([section], budget)["RECENT_TURNS"]
+    # En yeni üç tur kalır, kronolojik sırada.
+    assert kept == turns[-3:]
+
+
+def test_ordinary_sections_keep_leading_lines() -> None:
+    lines = [f"- hafıza {i} " + "x" * 60 for i in range(10)]
+    section = PromptSection("MEMORIES", tuple(lines), priority=1)
+    budget = estimate_tokens("[MEMORIES]\n\n") + 2 * (estimate_tokens(lines[0]) + 1)
+    assert fit_sections([section], budget)["MEMORIES"] == lines[:2]
+
+
+def test_build_prompt_drops_oldest_turns_first() -> None:
+    args = dict(bot_name="Bot", owner_id=1, user_display_name="u", user_message="selam", is_owner=False)
+    turns = [f"user: tur {i} " + "y" * 200 for i in range(40)]
+    base = estimate_tokens(build_prompt(**args))
+    prompt = build_prompt(**args, recent_turns=turns, token_budget=base + 400)
+    assert turns[-1] in prompt
+    assert turns[0] not in prompt
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from src.bot import rate_limiter as rl
+from src.bot.rate_limiter import RateLimit, RateLimiter, SQLiteRateStore, gcra_next
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(rl.time, "monotonic", fake)
+    return fake
+
+
+def test_gcra_allows_burst_then_one_per_interval() -> None:
+    limit = RateLimit(max_calls=3, window_seconds=6.0)
+    tat = None
+    for _ in range(3):
+        tat = gcra_next(tat, 100.0, limit)
+        assert tat is not None
+    assert gcra_next(tat, 100.0, limit) is None
+    # Bir aralık (2 sn) sonra tam bir istek daha açılır.
+    assert gcra_next(tat, 101.9, limit) is None
+    assert gcra_next(tat, 102.0, limit) is not None
+
+
+def test_gcra_idle_key_starts_fresh() -> None:
+    limit = RateLimit(max_calls=2, window_seconds=10.0)
+    assert gcra_next(50.0, 500.0, limit) == pytest.approx(505.0)
+
+
+def test_rejected_request_does_not_consume_other_limits(clock: FakeClock) -> None:
+    limiter = RateLimiter(max_calls=5, window_seconds=10.0, guild=RateLimit(1, 10.0))
+    assert limiter.allow("a", guild_id="g")
+    assert not limiter.allow("b", guild_id="g")
+    assert limiter.rejected == 1
+    # Sunucu limitine takılan istek "b"nin kullanıcı sayacına yazılmadı.
+    assert limiter.allow("b")
+    assert limiter.allow("b")
+    assert limiter.allow("b")
+    assert limiter.allow("b")
+    assert limiter.allow("b")
+    assert not limiter.allow("b")
+
+
+def test_sweep_drops_idle_keys(clock: FakeClock) -> None:
+    limiter = RateLimiter(max_calls=2, window_seconds=10.0, sweep_interval_seconds=60.0)
+    assert limiter.allow("a")
+    assert limiter.allow("b", guild_id="g")
+    assert len(limiter) == 2
+    clock.now += 30.0
+    assert limiter.sweep() == 2
+    assert len(limiter) == 0
+
+
+def test_shared_store_enforces_limit_across_instances(tmp_path: Path) -> None:
+    path = tmp_path / "rate.db"
+    first, second = SQLiteRateStore(path), SQLiteRateStore(path)
+    checks = [("u:a", RateLimit(max_calls=2, window_seconds=10.0))]
+    try:
+        assert first.hit(checks, 100.0)
+        assert second.hit(checks, 100.0)
+        assert not first.hit(checks, 100.0)
+        assert not second.hit(checks, 100.0)
+        assert first.hit(checks, 105.0)
+    finally:
+        first.close()
+        second.close()
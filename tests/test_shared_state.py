@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from src.memory.database import Database
+from src.memory.embeddings import MemoryIndex
+from src.shared_state import SharedInvalidations, SharedInvalidationStore
+
+
+def test_invalidation_reaches_other_process_only(tmp_path: Path) -> None:
+    path = tmp_path / "shared.db"
+
+    async def run() -> tuple[list[str], list[str]]:
+        a = SharedInvalidations(SharedInvalidationStore(path), origin=0)
+        b = SharedInvalidations(SharedInvalidationStore(path), origin=1)
+        seen_a: list[str] = []
+        seen_b: list[str] = []
+        a.subscribe("memory_index", seen_a.append)
+        b.subscribe("memory_index", seen_b.append)
+        a.publish("memory_index", "42")
+        a.publish("memory_index", "42")
+        await a.sync_once()
+        await b.sync_once()
+        await a.sync_once()
+        await a.close()
+        await b.close()
+        return seen_a, seen_b
+
+    seen_a, seen_b = asyncio.run(run())
+    assert seen_a == []
+    assert seen_b == ["42"]
+
+
+def test_memory_index_invalidate_publishes_but_drop_does_not(tmp_path: Path) -> None:
+    published: list[str] = []
+    index = MemoryIndex(db=Database(path=tmp_path / "bot.db"), publish=published.append)
+    index.invalidate("1")
+    index.drop("2")
+    assert published == ["1"]